@@ -0,0 +1,191 @@
+"""端到端抓取基准测试
+
+在本地回放服务器（fixture_server.py）上运行爬虫，不访问jos.org.cn。每个场景在独立的子进程中运行，
+报告页/秒、文章/秒、每篇文章的解析耗时和峰值内存（RSS）。
+
+场景：
+    parse     bs4 / lxml 提取器解析结果页片段的耗时，并校验两者结果一致
+    pipeline  JosSpiderPipeline 的写入吞吐量
+    http      HTTP直连模式下的完整抓取（爬虫 + 下载器 + 管道）
+    selenium  Selenium模式下的完整抓取（爬虫 + SeleniumMiddleware + 管道），需要Chrome，使用 --selenium 开启
+    selenium_full  同上，但不屏蔽子资源并使用 'normal' 页面加载策略，与 selenium 对比精简浏览器配置节省的
+              页面加载时间和传输量
+
+用法:
+    python benchmarks/bench_crawl.py --pages 50 --per-page 20 --latency 0.05
+    python benchmarks/bench_crawl.py --selenium --pool-size 2
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_exports import make_articles
+from fixture_server import FixtureServer, FixtureSite
+
+
+def peak_rss_mb() -> float:
+    """当前进程及其已结束子进程（浏览器）的峰值RSS（MB，Linux下ru_maxrss单位为KB）"""
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return (self_rss + children_rss) / 1024
+
+
+def bench_parse(args) -> dict:
+    from jos_spider.extractors import get_extractor
+
+    site = FixtureSite(args.pages, args.per_page)
+    fragments = [site.fragment(page) for page in range(1, args.pages + 1)]
+    result = {}
+    outputs = {}
+    for name in ('bs4', 'lxml'):
+        extractor = get_extractor(name)
+        start = time.perf_counter()
+        outputs[name] = [extractor.extract(fragment) for fragment in fragments]
+        elapsed = time.perf_counter() - start
+        articles = sum(len(articles) for articles in outputs[name])
+        result[f'{name} 解析(ms/篇)'] = elapsed * 1000 / articles
+        result[f'{name} 页/秒'] = len(fragments) / elapsed
+    result['结果一致'] = outputs['bs4'] == outputs['lxml']
+    return result
+
+
+def bench_pipeline(args) -> dict:
+    from jos_spider.pipelines import JosSpiderPipeline
+
+    articles = make_articles(args.pages * args.per_page)
+    with tempfile.TemporaryDirectory() as workdir:
+        pipeline = JosSpiderPipeline(output_name=os.path.join(workdir, 'jos_articles'))
+        start = time.perf_counter()
+        pipeline.open_spider(None)
+        for article in articles:
+            pipeline.process_item(article, None)
+        pipeline.close_spider(None)
+        elapsed = time.perf_counter() - start
+    return {'文章/秒': len(articles) / elapsed}
+
+
+# 不使用精简浏览器配置时的设置
+FULL_BROWSER_SETTINGS = {
+    'SELENIUM_PAGE_LOAD_STRATEGY': 'normal',
+    'SELENIUM_BLOCK_RESOURCES': False,
+}
+
+
+def bench_crawl(args, mode: str, extra_settings: dict = None) -> dict:
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+    from jos_spider.spiders.jos import JosSpider
+
+    site = FixtureSite(args.pages, args.per_page, args.latency, asset_kb=args.asset_kb)
+    server = FixtureServer(site).start()
+    with tempfile.TemporaryDirectory() as workdir:
+        settings = get_project_settings()
+        settings.setdict({
+            'SEARCH_MODE': mode,
+            'HTTP_FALLBACK_TO_SELENIUM': False,
+            'BROWSER_POOL_SIZE': args.pool_size,
+            'OUTPUT_NAME': os.path.join(workdir, 'jos_articles'),
+            'CHECKPOINT_FILE': os.path.join(workdir, 'jos_checkpoints.json'),
+            'DEDUP_STORE_PATH': os.path.join(workdir, 'jos_fingerprints.sqlite'),
+            'METRICS_FILE': os.path.join(workdir, 'jos_metrics.prom'),
+            'ROBOTS_TXT_OBEY': False,
+            'DOWNLOAD_DELAY': 0,
+            # 测量爬虫自身的吞吐量，不限制请求速率
+            'ADAPTIVE_RATE_ENABLED': False,
+            # 默认只测试结果页翻页；--detail-pages 时详情页下载槽同样不设延迟
+            'DETAIL_PAGES': args.detail_pages,
+            'SEARCH_PARTITION_PAGE_BUDGET': args.partition_budget,
+            'PARSE_WORKERS': args.parse_workers,
+            'DOWNLOAD_SLOTS': {'jos-detail': {'concurrency': 8, 'delay': 0}},
+            'LOG_LEVEL': os.environ.get('BENCH_LOG_LEVEL', 'WARNING'),
+            **(extra_settings or {}),
+        }, priority='cmdline')
+        process = CrawlerProcess(settings)
+        crawler = process.create_crawler(JosSpider)
+        start = time.perf_counter()
+        process.crawl(crawler, start_url=server.search_url)
+        process.start()
+        elapsed = time.perf_counter() - start
+    server.stop()
+
+    stats = crawler.stats.get_stats()
+    articles = stats.get('item_scraped_count', 0)
+    result = {
+        '文章数': articles,
+        '耗时(s)': elapsed,
+        '页/秒': args.pages / elapsed,
+        '文章/秒': articles / elapsed,
+        '结束原因': stats.get('finish_reason'),
+    }
+    page_loads = stats.get('jos/page_loads', 0)
+    if page_loads:
+        # 浏览器加载搜索页（打开页面到DOM就绪）的平均耗时和传输量
+        load_time = sum(
+            stats.get(f'jos/stage/{stage}/sum', 0) for stage in ('middleware_get', 'middleware_render', 'page_load')
+        )
+        result['页面加载(ms)'] = load_time * 1000 / page_loads
+        result['传输(KB/页)'] = stats.get('jos/page_bytes', 0) / 1024 / page_loads
+        result['请求数/页'] = stats.get('jos/page_requests', 0) / page_loads
+    return result
+
+
+def run_scenario(name, args, queue):
+    if name == 'parse':
+        result = bench_parse(args)
+    elif name == 'pipeline':
+        result = bench_pipeline(args)
+    elif name == 'selenium_full':
+        result = bench_crawl(args, 'selenium', FULL_BROWSER_SETTINGS)
+    else:
+        result = bench_crawl(args, name)
+    result['峰值RSS(MB)'] = peak_rss_mb()
+    queue.put(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='端到端抓取基准测试')
+    parser.add_argument('--pages', type=int, default=20, help='结果总页数')
+    parser.add_argument('--per-page', type=int, default=20, help='每页文章数')
+    parser.add_argument('--latency', type=float, default=0.05, help='回放服务器每个结果页的响应延迟（秒）')
+    parser.add_argument('--pool-size', type=int, default=1, help='Selenium模式下的浏览器池大小')
+    parser.add_argument('--asset-kb', type=int, default=100, help='回放页面中每个子资源的大小（KB）')
+    parser.add_argument('--detail-pages', action='store_true', help='完整抓取场景同时抓取文章详情页')
+    parser.add_argument('--partition-budget', type=int, default=0, help='按年份分区的页数预算，为0时不分区')
+    parser.add_argument('--parse-workers', type=int, default=2, help='Selenium模式下的提取线程数，为0时不使用流水线解析')
+    parser.add_argument('--selenium', action='store_true', help='同时测试Selenium模式（需要Chrome）')
+    parser.add_argument('--only', choices=['parse', 'pipeline', 'http', 'selenium', 'selenium_full'],
+                        help='只运行指定场景')
+    args = parser.parse_args()
+
+    scenarios = ['parse', 'pipeline', 'http'] + (['selenium', 'selenium_full'] if args.selenium else [])
+    if args.only:
+        scenarios = [args.only]
+
+    print(f'结果页: {args.pages} 页 x {args.per_page} 篇，响应延迟 {args.latency}s')
+    # 每个场景使用独立的进程，峰值内存互不影响，Twisted reactor也只需启动一次
+    context = multiprocessing.get_context('spawn')
+    for name in scenarios:
+        queue = context.Queue()
+        process = context.Process(target=run_scenario, args=(name, args, queue))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            print(f'[{name}] 运行失败，退出码 {process.exitcode}')
+            continue
+        result = queue.get()
+        metrics = ', '.join(
+            f'{key}={value:.3f}' if isinstance(value, float) else f'{key}={value}'
+            for key, value in result.items()
+        )
+        print(f'[{name}] {metrics}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""导出格式基准测试
+
+对比 JSON / JSONL / XLSX / Parquet / SQLite 五种输出的写入耗时、文件大小和加载到pandas的耗时。
+
+用法:
+    python benchmarks/bench_exports.py --articles 20000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jos_spider.pipelines import JosSpiderPipeline, ParquetExportPipeline, SQLiteExportPipeline, clean_article
+
+
+def make_articles(count: int) -> list:
+    """生成用于测试的文章数据"""
+    return [
+        {
+            'title': f'面向软件工程的第{i}种形式化验证方法研究',
+            'authors': [f'作者{i % 997}', f'作者{(i * 7) % 991}', f'作者{(i * 13) % 983}'],
+            'publish_time': f'{1990 + i % 35}, {i % 36}({i % 12 + 1}):{i % 100 + 1}-{i % 100 + 12}.',
+            'keywords': [f'关键词{i % 503}', f'关键词{(i * 3) % 499}', '软件工程'],
+            'abstract': '软件工程支撑环境的集成化问题是构造环境的中心环节,它涉及到概念、方法、技术和工具等方面。' * 4,
+        }
+        for i in range(count)
+    ]
+
+
+def run_pipeline(pipeline, articles):
+    start = time.perf_counter()
+    pipeline.open_spider(None)
+    for article in articles:
+        pipeline.process_item(article, None)
+    pipeline.close_spider(None)
+    return time.perf_counter() - start
+
+
+def write_json(path, articles):
+    # 原先 close_spider 中的JSON导出方式
+    start = time.perf_counter()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([clean_article(article) for article in articles], f, ensure_ascii=False, indent=2)
+    return time.perf_counter() - start
+
+
+def load_sqlite(path):
+    with sqlite3.connect(path) as conn:
+        return pd.read_sql_query('''
+            SELECT a.id, a.title, a.publish_time, a.abstract,
+                   (SELECT group_concat(name, ',') FROM article_authors aa JOIN authors au ON au.id = aa.author_id
+                    WHERE aa.article_id = a.id) AS authors,
+                   (SELECT group_concat(word, ',') FROM article_keywords ak JOIN keywords k ON k.id = ak.keyword_id
+                    WHERE ak.article_id = a.id) AS keywords
+            FROM articles a
+        ''', conn)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导出格式基准测试')
+    parser.add_argument('--articles', type=int, default=20000, help='测试的文章数量')
+    args = parser.parse_args()
+
+    articles = make_articles(args.articles)
+    with tempfile.TemporaryDirectory() as workdir:
+        base = os.path.join(workdir, 'jos_articles')
+        rows = []
+
+        write_time = write_json(base + '.json', articles)
+        _, load_time = timed(pd.read_json, base + '.json')
+        rows.append(('json', write_time, os.path.getsize(base + '.json'), load_time))
+
+        write_time = run_pipeline(JosSpiderPipeline(output_name=base), articles)
+        _, load_time = timed(pd.read_json, base + '.jsonl', lines=True)
+        rows.append(('jsonl', write_time, os.path.getsize(base + '.jsonl'), load_time))
+        _, load_time = timed(pd.read_excel, base + '.xlsx', engine='openpyxl')
+        rows.append(('xlsx', None, os.path.getsize(base + '.xlsx'), load_time))
+
+        write_time = run_pipeline(ParquetExportPipeline(base + '.parquet'), articles)
+        _, load_time = timed(pd.read_parquet, base + '.parquet')
+        rows.append(('parquet', write_time, os.path.getsize(base + '.parquet'), load_time))
+
+        write_time = run_pipeline(SQLiteExportPipeline(base + '.sqlite'), articles)
+        _, load_time = timed(load_sqlite, base + '.sqlite')
+        rows.append(('sqlite', write_time, os.path.getsize(base + '.sqlite'), load_time))
+
+    print(f'文章数量: {args.articles}（jsonl与xlsx由同一个管道写入，写入耗时合并计入jsonl）')
+    print(f'{"格式":<10}{"写入(s)":>10}{"大小(MB)":>12}{"加载(s)":>10}')
+    for name, write_time, size, load_time in rows:
+        write_text = f'{write_time:.2f}' if write_time is not None else '-'
+        print(f'{name:<10}{write_text:>10}{size / 1024 / 1024:>12.2f}{load_time:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
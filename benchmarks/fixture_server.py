@@ -0,0 +1,345 @@
+"""jos.org.cn 高级搜索页的本地回放服务器
+
+提供与线上一致的搜索表单（article_search_form、Key1/Key2、SearchData/SubmitArticleSearch）、
+文章列表（EtTableArticleList，按 StartYear/EndYear 筛选发表年份）和分页（.t-pages、a.active、a.next），以及带引文元数据的文章详情页，按可配置的延迟返回结果页，
+用于在不访问线上网站的情况下运行爬虫和基准测试。页面还引用了样式表、字体和图片（大小由 --asset-kb 指定），
+用于对比精简浏览器配置（屏蔽子资源、eager加载策略）的效果。
+
+结果页来源：
+    - --pages-dir 目录中录制的文章列表片段（page-1.html、page-2.html ...）
+    - 否则根据 --corpus 指定的JSONL文章数据（或生成的测试数据）渲染
+
+用法:
+    python benchmarks/fixture_server.py --port 8000 --total-pages 50 --latency 0.2
+    scrapy crawl jos -a start_url=http://127.0.0.1:8000/jos/article/advanced_search
+"""
+import argparse
+import html
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bench_exports import make_articles
+
+SEARCH_PATH = '/jos/article/advanced_search'
+DETAIL_PATH = '/jos/article/abstract/'
+
+# 页面引用的子资源
+STATIC_ASSETS = {
+    '/static/site.css': 'text/css',
+    '/static/banner.png': 'image/png',
+    '/static/font.woff2': 'font/woff2',
+}
+
+SEARCH_PAGE = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>高级检索 - 软件学报</title>
+<link rel="stylesheet" href="/static/site.css">
+<script>
+function SubmitArticleSearch(page) {{
+    var form = document.getElementById('article_search_form');
+    form.currentpage.value = page;
+    var request = new XMLHttpRequest();
+    request.open('POST', form.action + '?fragment=1');
+    request.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded');
+    request.onload = function () {{
+        document.getElementById('EtTableArticleList').innerHTML = request.responseText;
+    }};
+    request.send(new URLSearchParams(new FormData(form)).toString());
+}}
+function SearchData(page) {{
+    SubmitArticleSearch(page);
+}}
+</script>
+</head>
+<body>
+<img src="/static/banner.png" alt="软件学报">
+<h1>软件学报 高级检索</h1>
+<p>本页面为jos.org.cn高级检索页的本地回放版本，用于离线运行爬虫和基准测试。支持按标题、作者、关键词、摘要等字段组合检索，检索结果分页显示。</p>
+<form id="article_search_form" action="{action}" method="post" onsubmit="return false;">
+    <input type="text" id="Key1" name="Key1" value="">
+    <input type="text" id="Key2" name="Key2" value="">
+    <input type="text" id="StartYear" name="StartYear" value="">
+    <input type="text" id="EndYear" name="EndYear" value="">
+    <input type="hidden" name="currentpage" value="1">
+    <button type="button" class="search-btn" onclick="SearchData(1);">查 询</button>
+</form>
+<div id="EtTableArticleList">{results}</div>
+</body>
+</html>
+'''
+
+
+def render_article(article: dict, article_id: int) -> str:
+    """按线上页面的结构渲染一篇文章"""
+    authors = ''.join(
+        f'<a href="/jos/article/search?author={html.escape(name)}">{html.escape(name)}</a> '
+        for name in article.get('authors', [])
+    )
+    keywords = ''
+    if article.get('keywords'):
+        keywords = (f'<div class="search_ext_article_keyword">关键词: '
+                    f'<a>{html.escape(",".join(article["keywords"]))}</a></div>')
+    return (
+        '<li>'
+        f'<div class="search_ext_article_title"><a href="/jos/article/abstract/{article_id}" target="_blank">'
+        f'{html.escape(article.get("title", ""))}</a></div>'
+        f'<div class="search_ext_article_author">{authors}</div>'
+        f'<div class="search_ext_article_position">{html.escape(article.get("publish_time", ""))} '
+        f'DOI:10.13328/j.cnki.jos.{article_id:06d}</div>'
+        f'{keywords}'
+        f'<div class="search_ext_article_abstract"><p>摘要:{html.escape(article.get("abstract", ""))}</p></div>'
+        '</li>'
+    )
+
+
+DETAIL_PAGE = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title} - 软件学报</title>
+<meta name="citation_title" content="{title}">
+{authors}
+<meta name="citation_journal_title" content="软件学报">
+<meta name="citation_publication_date" content="{date}">
+<meta name="citation_volume" content="{volume}">
+<meta name="citation_issue" content="{issue}">
+<meta name="citation_firstpage" content="{first_page}">
+<meta name="citation_lastpage" content="{last_page}">
+<meta name="citation_doi" content="10.13328/j.cnki.jos.{article_id:06d}">
+<meta name="citation_pdf_url" content="/jos/article/pdf/{article_id}">
+<link rel="stylesheet" href="/static/site.css">
+</head>
+<body>
+<h1>{title}</h1>
+<p class="abstract">摘要:{abstract}</p>
+</body>
+</html>
+'''
+
+
+def render_detail(article: dict, article_id: int) -> str:
+    """渲染文章详情页，作者单位等引文元数据放在页面头部"""
+    authors = '\n'.join(
+        f'<meta name="citation_author" content="{html.escape(name)}">\n'
+        f'<meta name="citation_author_institution" content="第{index % 3 + 1}研究所">'
+        for index, name in enumerate(article.get('authors', []))
+    )
+    return DETAIL_PAGE.format(
+        title=html.escape(article.get('title', '')),
+        authors=authors,
+        date=f'{1990 + article_id % 30}-01-01',
+        volume=article_id % 30 + 1,
+        issue=article_id % 12 + 1,
+        first_page=article_id,
+        last_page=article_id + 11,
+        article_id=article_id,
+        abstract=html.escape(article.get('abstract', '')),
+    )
+
+
+def render_pagination(page: int, total_pages: int) -> str:
+    """渲染分页栏，最后一页的“下一页”没有href"""
+    links = []
+    for number in range(max(1, page - 4), min(total_pages, page + 4) + 1):
+        css = ' class="active"' if number == page else ''
+        links.append(f'<a{css} href="javascript:SubmitArticleSearch({number});">{number}</a>')
+    if page < total_pages:
+        links.append(f'<a class="next" href="javascript:SubmitArticleSearch({page + 1});">下一页</a>')
+    else:
+        links.append('<a class="next">下一页</a>')
+    return f'<div class="t-pages"><span>共 {total_pages} 页</span>{"".join(links)}</div>'
+
+
+class FixtureSite:
+    """回放的搜索结果数据"""
+
+    def __init__(self, total_pages: int = 20, per_page: int = 20, latency: float = 0.0,
+                 corpus: str = None, pages_dir: str = None, asset_kb: int = 100, error_rate: float = 0.0):
+        self.total_pages = total_pages
+        self.per_page = per_page
+        self.latency = latency
+        # 结果页和详情页随机返回 503（带 Retry-After）的比例，用于模拟网站限流
+        self.error_rate = error_rate
+        self.pages_dir = pages_dir
+        self.asset_kb = asset_kb
+        if corpus:
+            with open(corpus, 'r', encoding='utf-8') as f:
+                self.articles = [json.loads(line) for line in f if line.strip()]
+        else:
+            self.articles = make_articles(total_pages * per_page)
+
+    def matching(self, start_year: int = None, end_year: int = None) -> list:
+        """发表年份在 [start_year, end_year] 内的文章编号（从0开始），未指定年份范围时为全部文章"""
+        indexes = range(self.total_pages * self.per_page)
+        if not start_year and not end_year:
+            return list(indexes)
+        matched = []
+        for index in indexes:
+            year = re.match(r'\s*(\d{4})', self.articles[index % len(self.articles)].get('publish_time') or '')
+            year = int(year.group(1)) if year else None
+            if year and (not start_year or year >= start_year) and (not end_year or year <= end_year):
+                matched.append(index)
+        return matched
+
+    def fragment(self, page: int, start_year: int = None, end_year: int = None) -> str:
+        """第 page 页的文章列表片段（EtTableArticleList 的内容），按发表年份范围筛选"""
+        if self.pages_dir:
+            page = max(1, min(page, self.total_pages))
+            with open(os.path.join(self.pages_dir, f'page-{page}.html'), 'r', encoding='utf-8') as f:
+                return f.read()
+        indexes = self.matching(start_year, end_year)
+        total_pages = max(1, -(-len(indexes) // self.per_page))
+        page = max(1, min(page, total_pages))
+        start = (page - 1) * self.per_page
+        items = ''.join(
+            render_article(self.articles[index % len(self.articles)], index + 1)
+            for index in indexes[start:start + self.per_page]
+        )
+        return f'<ul class="search_ext_article_list">{items}</ul>{render_pagination(page, total_pages)}'
+
+    def detail(self, article_id: int) -> str:
+        """文章详情页（文章编号与结果页中的链接一致，从1开始）"""
+        return render_detail(self.articles[(article_id - 1) % len(self.articles)], article_id)
+
+    def throttled(self) -> bool:
+        """本次请求是否模拟限流"""
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+    def search_page(self, results: str = '') -> str:
+        return SEARCH_PAGE.format(action=SEARCH_PATH, results=results)
+
+    def asset(self, path: str) -> bytes:
+        """子资源内容（样式表中引用字体，其余为填充数据）"""
+        if path.endswith('.css'):
+            head = "@font-face { font-family: site; src: url('/static/font.woff2'); }\nbody { font-family: site; }\n"
+            return (head + '/*' + ' ' * max(0, self.asset_kb * 1024 - len(head) - 4) + '*/').encode('utf-8')
+        return b'\0' * (self.asset_kb * 1024)
+
+
+def make_handler(site: FixtureSite):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_bytes(self, data: bytes, content_type: str, status: int = 200):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def send_html(self, body: str, status: int = 200):
+            self.send_bytes(body.encode('utf-8'), 'text/html; charset=utf-8', status)
+
+        def send_throttled(self):
+            body = '<html><body>Service Unavailable</body></html>'.encode('utf-8')
+            self.send_response(503)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == SEARCH_PATH:
+                self.send_html(site.search_page())
+            elif path in STATIC_ASSETS:
+                self.send_bytes(site.asset(path), STATIC_ASSETS[path])
+            elif path.startswith(DETAIL_PATH) and path[len(DETAIL_PATH):].isdigit():
+                if site.latency:
+                    time.sleep(site.latency)
+                if site.throttled():
+                    self.send_throttled()
+                    return
+                self.send_html(site.detail(int(path[len(DETAIL_PATH):])))
+            else:
+                self.send_html('<html><body>Not Found</body></html>', status=404)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != SEARCH_PATH:
+                self.send_html('<html><body>Not Found</body></html>', status=404)
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            form = parse_qs(self.rfile.read(length).decode('utf-8'))
+            page = int((form.get('currentpage') or ['1'])[0] or 1)
+            # 高级搜索的发表年份范围
+            start_year = int((form.get('StartYear') or ['0'])[0] or 0) or None
+            end_year = int((form.get('EndYear') or ['0'])[0] or 0) or None
+
+            # 模拟网站的响应时间
+            if site.latency:
+                time.sleep(site.latency)
+            if site.throttled():
+                self.send_throttled()
+                return
+
+            fragment = site.fragment(page, start_year, end_year)
+            if 'fragment' in parse_qs(url.query):
+                # 页面内 SubmitArticleSearch 的异步请求只返回文章列表片段
+                self.send_html(fragment)
+            else:
+                # 直接提交表单时返回完整的结果页
+                self.send_html(site.search_page(fragment))
+
+    return FixtureHandler
+
+
+class FixtureServer:
+    """在后台线程中运行的回放服务器"""
+
+    def __init__(self, site: FixtureSite, host: str = '127.0.0.1', port: int = 0):
+        self.site = site
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(site))
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def search_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}{SEARCH_PATH}'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='jos.org.cn 高级搜索页的本地回放服务器')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--total-pages', type=int, default=20, help='结果总页数')
+    parser.add_argument('--per-page', type=int, default=20, help='每页文章数')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个结果页的响应延迟（秒）')
+    parser.add_argument('--corpus', help='用于渲染结果页的JSONL文章数据（如 jos_articles.jsonl）')
+    parser.add_argument('--pages-dir', help='录制的文章列表片段目录（page-<n>.html）')
+    parser.add_argument('--asset-kb', type=int, default=100, help='每个子资源（样式表、字体、图片）的大小（KB）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='结果页和详情页随机返回503的比例（模拟限流）')
+    args = parser.parse_args()
+
+    site = FixtureSite(args.total_pages, args.per_page, args.latency, args.corpus, args.pages_dir, args.asset_kb,
+                       args.error_rate)
+    server = FixtureServer(site, args.host, args.port)
+    print(f'回放服务器已启动: {server.search_url}')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
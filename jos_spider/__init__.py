@@ -1,2 +1,6 @@
 # JOS Spider Package
-# This package contains the spider implementation for crawling jos.org.cn
\ No newline at end of file
+# This package contains the spider implementation for crawling jos.org.cn
+import time
+
+# 包首次导入的时间（Scrapy加载项目设置时），用于统计启动耗时
+IMPORTED_AT = time.monotonic()
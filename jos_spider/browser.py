@@ -0,0 +1,608 @@
+from typing import Optional, Sequence, Tuple, Dict
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from scrapy import signals
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet import threads
+# selenium.webdriver 按需加载子模块，这里只导入轻量的部分；
+# webdriver.Chrome、Service 和 webdriver-manager 在首次启动浏览器时才导入（HTTP直连模式下不会导入）
+from selenium import webdriver
+from selenium.common.exceptions import JavascriptException, SessionNotCreatedException
+from jos_spider.metrics import call_in_reactor
+
+logger = logging.getLogger(__name__)
+
+# 默认的浏览器User-Agent
+DEFAULT_BROWSER_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# 反自动化检测脚本，在每个新文档加载前注入
+STEALTH_SCRIPT = '''
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+    window.chrome = {
+        runtime: {}
+    };
+'''
+
+
+# 精简浏览器配置下默认屏蔽的资源（图片、样式表、字体和第三方统计脚本），抓取文章列表只需要DOM
+DEFAULT_BLOCKED_URL_PATTERNS = (
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp',
+    '*.css',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*google-analytics.com*', '*googletagmanager.com*', '*hm.baidu.com*', '*cnzz.com*', '*51.la*',
+)
+
+# 各页面加载策略下可以认为页面已就绪的 document.readyState
+# 'eager'/'none' 策略下不等待图片、样式表等子资源加载完成
+READY_STATES = {
+    'normal': ('complete',),
+    'eager': ('interactive', 'complete'),
+    'none': ('interactive', 'complete'),
+}
+
+# 读取当前页面的资源加载统计（Resource Timing），被屏蔽的请求不计入
+PAGE_TRANSFER_SCRIPT = r'''
+    var navigation = performance.getEntriesByType('navigation');
+    var entries = navigation.concat(performance.getEntriesByType('resource'));
+    var bytes = 0;
+    entries.forEach(function (entry) {
+        bytes += entry.transferSize || 0;
+    });
+    return {
+        bytes: bytes,
+        requests: entries.length,
+        dom_content_loaded_ms: navigation.length ? Math.round(navigation[0].domContentLoadedEventEnd) : null
+    };
+'''
+
+
+def read_cached_driver_path(cache_file: str) -> Optional[str]:
+    """读取缓存的chromedriver路径，缓存不存在或路径已失效时返回None"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            path = f.read().strip()
+    except OSError:
+        return None
+    return path if path and os.path.isfile(path) else None
+
+
+def resolve_driver_path(driver_path: Optional[str] = None, cache_file: Optional[str] = None,
+                        offline: bool = False, refresh: bool = False) -> str:
+    """解析chromedriver路径
+
+    依次使用：指定的路径、缓存文件中记录的路径、（离线模式下）PATH中的chromedriver；
+    都不可用时由webdriver-manager联网解析，并把结果写入缓存文件，之后的运行不再联网。
+
+    Args:
+        driver_path: 指定的chromedriver路径（SELENIUM_DRIVER_EXECUTABLE_PATH）
+        cache_file: 缓存解析结果的文件（CHROMEDRIVER_CACHE_FILE），为空时不缓存
+        offline: 离线模式，不使用webdriver-manager
+        refresh: 忽略缓存重新解析（如缓存的chromedriver与已升级的Chrome版本不匹配）
+
+    Returns:
+        chromedriver路径
+    """
+    if driver_path:
+        return driver_path
+    if cache_file and not refresh:
+        cached = read_cached_driver_path(cache_file)
+        if cached:
+            return cached
+    if offline:
+        found = shutil.which('chromedriver')
+        if found:
+            return found
+        raise RuntimeError('离线模式下未找到chromedriver，请设置 SELENIUM_DRIVER_EXECUTABLE_PATH，或先联网运行一次以缓存chromedriver路径')
+
+    from webdriver_manager.chrome import ChromeDriverManager
+    started = time.perf_counter()
+    path = ChromeDriverManager().install()
+    logger.info(f'webdriver-manager 解析chromedriver耗时 {time.perf_counter() - started:.2f} 秒: {path}')
+    if cache_file:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            f.write(path)
+    return path
+
+
+def build_chrome_options(headless: bool = True, page_load_strategy: str = 'normal',
+                         capture_network: bool = False) -> webdriver.ChromeOptions:
+    """构造带反自动化检测参数的Chrome启动选项
+
+    Args:
+        headless: 是否使用无头模式
+        page_load_strategy: 页面加载策略（'normal'、'eager' 或 'none'）
+        capture_network: 是否开启性能日志（CDP Network事件），用于捕获搜索结果接口的响应
+
+    Returns:
+        Chrome启动选项
+    """
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.page_load_strategy = page_load_strategy
+    if capture_network:
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    if headless:
+        chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_argument('--disable-extensions')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--start-maximized')
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+
+    # 添加自定义 User-Agent
+    chrome_options.add_argument(f'--user-agent={DEFAULT_BROWSER_USER_AGENT}')
+    return chrome_options
+
+
+def create_chrome_driver(headless: bool = True, page_load_strategy: str = 'normal',
+                         blocked_urls: Optional[Sequence[str]] = None,
+                         capture_network: bool = False, driver_path: Optional[str] = None) -> 'webdriver.Chrome':
+    """启动一个Chrome浏览器实例并注入反自动化检测脚本
+
+    Args:
+        headless: 是否使用无头模式
+        page_load_strategy: 页面加载策略（'normal'、'eager' 或 'none'）
+        blocked_urls: 通过CDP屏蔽的URL模式（支持 * 通配符），为空时不屏蔽
+        capture_network: 是否开启性能日志，用于捕获搜索结果接口的响应
+        driver_path: chromedriver路径，为空时由 resolve_driver_path 解析
+
+    Returns:
+        WebDriver实例
+    """
+    from selenium.webdriver.chrome.service import Service
+    service = Service(driver_path or resolve_driver_path())
+    driver = webdriver.Chrome(
+        service=service,
+        options=build_chrome_options(headless, page_load_strategy, capture_network)
+    )
+
+    # 添加更多的反自动化检测绕过
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': STEALTH_SCRIPT})
+
+    if blocked_urls:
+        # 在网络层屏蔽图片、样式表、字体和统计脚本，请求不会发出
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(blocked_urls)})
+    return driver
+
+
+def page_transfer_stats(driver) -> Optional[Dict]:
+    """读取当前页面的资源加载统计
+
+    Args:
+        driver: 浏览器实例
+
+    Returns:
+        包含 bytes（传输字节数）、requests（请求数）、dom_content_loaded_ms 的字典，读取失败时返回None
+    """
+    try:
+        return driver.execute_script(PAGE_TRANSFER_SCRIPT)
+    except JavascriptException:
+        return None
+
+
+def report_page_transfer(driver, metrics, logger):
+    """记录页面加载的传输量（jos/page_loads、jos/page_bytes、jos/page_requests），用于对比浏览器配置的效果
+
+    Args:
+        driver: 已加载页面的浏览器实例
+        metrics: StageMetrics实例
+        logger: 日志对象
+    """
+    transfer = page_transfer_stats(driver)
+    if not transfer:
+        return
+    metrics.inc_value('page_loads')
+    metrics.inc_value('page_bytes', transfer['bytes'])
+    metrics.inc_value('page_requests', transfer['requests'])
+    logger.info(f'页面传输 {transfer["bytes"] / 1024:.1f}KB，{transfer["requests"]} 个请求，'
+                f'DOMContentLoaded {transfer["dom_content_loaded_ms"]}ms')
+
+
+# 在文章列表容器所在区域安装MutationObserver，列表每次变化时递增版本号并通知等待者
+# 返回当前版本号；页面中没有文章列表容器时返回null
+LIST_OBSERVER_SCRIPT = r'''
+    var target = document.getElementById('EtTableArticleList');
+    if (!target) {
+        return null;
+    }
+    if (window.__josListObserved !== target) {
+        window.__josListVersion = window.__josListVersion || 0;
+        window.__josListListeners = window.__josListListeners || [];
+        if (window.__josListObserver) {
+            window.__josListObserver.disconnect();
+        }
+        window.__josListObserver = new MutationObserver(function () {
+            window.__josListVersion += 1;
+            window.__josListListeners.slice().forEach(function (listener) {
+                listener();
+            });
+        });
+        // 观察容器的父节点，以便容器整体被替换时也能检测到
+        window.__josListObserver.observe(target.parentNode || document.body, {
+            childList: true,
+            subtree: true,
+            characterData: true
+        });
+        window.__josListObserved = target;
+    }
+    return window.__josListVersion;
+'''
+
+# 异步等待列表版本号超过给定值，并在变化停止 settleMs 毫秒后返回新的版本号
+# 页面已整体刷新（观察器丢失）时返回null
+WAIT_LIST_CHANGE_SCRIPT = r'''
+    var version = arguments[0];
+    var settleMs = arguments[1];
+    var done = arguments[arguments.length - 1];
+    if (window.__josListVersion === undefined) {
+        done(null);
+        return;
+    }
+    var timer = null;
+    function listener() {
+        clearTimeout(timer);
+        timer = setTimeout(function () {
+            var index = window.__josListListeners.indexOf(listener);
+            if (index >= 0) {
+                window.__josListListeners.splice(index, 1);
+            }
+            done(window.__josListVersion);
+        }, settleMs);
+    }
+    window.__josListListeners.push(listener);
+    if (window.__josListVersion > version) {
+        listener();
+    }
+'''
+
+
+def install_list_observer(driver) -> Optional[int]:
+    """在当前页面安装文章列表变化观察器
+
+    Args:
+        driver: 浏览器实例
+
+    Returns:
+        当前的列表版本号，页面中没有文章列表容器时返回None
+    """
+    return driver.execute_script(LIST_OBSERVER_SCRIPT)
+
+
+def wait_for_list_change(driver, version: int, settle_ms: int = 100) -> Optional[int]:
+    """等待文章列表发生变化（由页面内的MutationObserver通知，无需轮询列表内容）
+
+    最长等待时间由浏览器的脚本超时时间（SELENIUM_SCRIPT_TIMEOUT）决定，超时抛出TimeoutException。
+
+    Args:
+        driver: 浏览器实例
+        version: 变化前的列表版本号（install_list_observer 的返回值）
+        settle_ms: 列表停止变化多少毫秒后认为更新完成
+
+    Returns:
+        变化后的列表版本号；观察器不可用（如页面已整体刷新）时返回None
+    """
+    try:
+        return driver.execute_async_script(WAIT_LIST_CHANGE_SCRIPT, version, settle_ms)
+    except JavascriptException:
+        # 等待过程中页面被整体刷新，观察器随之丢失
+        return None
+
+
+# 当前页面的JS堆大小（字节），无法读取进程内存时用于估计浏览器的内存占用
+JS_HEAP_SCRIPT = 'return window.performance && performance.memory ? performance.memory.usedJSHeapSize : null;'
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """进程及其所有子孙进程的常驻内存之和（字节，共享内存会被重复计算）
+
+    读取 /proc，无法读取（如非Linux系统）时返回None。
+    """
+    children: Dict[int, list] = {}
+    try:
+        entries = [int(entry) for entry in os.listdir('/proc') if entry.isdigit()]
+    except OSError:
+        return None
+    for entry in entries:
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                # 进程名可能包含空格，从最后一个右括号之后开始按空格切分；ppid 为第4个字段
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            # 进程已退出
+            continue
+        children.setdefault(ppid, []).append(entry)
+
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    found = False
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f'/proc/{current}/statm', 'r') as f:
+                total += int(f.read().split()[1]) * page_size
+            found = True
+        except (OSError, ValueError, IndexError):
+            pass
+        stack.extend(children.get(current, []))
+    return total if found else None
+
+
+def browser_memory(driver) -> Optional[int]:
+    """浏览器占用的内存（字节）：chromedriver及其启动的浏览器、渲染进程的常驻内存之和，
+    无法读取进程内存时使用当前页面的JS堆大小，都无法读取时返回None
+    """
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    if process is not None:
+        memory = process_tree_rss(process.pid)
+        if memory is not None:
+            return memory
+    try:
+        return driver.execute_script(JS_HEAP_SCRIPT)
+    except JavascriptException:
+        return None
+
+
+class BrowserHealth:
+    """一个浏览器实例的运行状况，用于判断是否需要回收"""
+
+    # 前几页的平均翻页耗时作为基准
+    WARMUP_PAGES = 5
+
+    def __init__(self):
+        # 已处理的页数（翻页次数）
+        self.pages = 0
+        # 上次检查内存时的页数，以及检查到的内存占用（字节）
+        self.memory_checked_at = 0
+        self.memory: Optional[int] = None
+        self.warmup = []
+        self.baseline: Optional[float] = None
+        # 翻页耗时的指数加权平均（秒）
+        self.latency: Optional[float] = None
+
+    def record_page(self, latency: float):
+        self.pages += 1
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        if self.baseline is None:
+            self.warmup.append(latency)
+            if len(self.warmup) >= self.WARMUP_PAGES:
+                self.baseline = sum(self.warmup) / len(self.warmup)
+
+
+class BrowserManager:
+    """爬虫与中间件共享的浏览器管理器
+
+    同一次运行中只启动一个浏览器，并且在首次使用时才启动（HTTP直连模式下不会启动浏览器）。
+    使用共享浏览器的操作放在 in_use() 中，关闭时等待这些操作结束（最多 close_timeout 秒）再关闭浏览器。
+    """
+
+    def __init__(self, headless: bool = True, page_load_strategy: str = 'normal',
+                 blocked_urls: Optional[Sequence[str]] = None, capture_network: bool = False,
+                 driver_path: Optional[str] = None, driver_cache_file: Optional[str] = None, offline: bool = False,
+                 page_load_timeout: Optional[int] = None, script_timeout: Optional[int] = None,
+                 recycle_pages: int = 0, recycle_memory_mb: int = 0, recycle_latency_factor: float = 0,
+                 memory_check_pages: int = 20, close_timeout: float = 30):
+        if page_load_strategy not in READY_STATES:
+            raise ValueError(f'未知的页面加载策略: {page_load_strategy}，可选值: {", ".join(READY_STATES)}')
+        self.headless = headless
+        self.page_load_strategy = page_load_strategy
+        self.blocked_urls = list(blocked_urls or [])
+        self.capture_network = capture_network
+        # chromedriver路径的来源（见 resolve_driver_path），首次启动浏览器时才解析
+        self.driver_path = driver_path
+        self.driver_cache_file = driver_cache_file
+        self.offline = offline
+        self._resolved_driver_path: Optional[str] = None
+        self.page_load_timeout = page_load_timeout
+        self.script_timeout = script_timeout
+        # 回收条件：已处理页数、内存占用（MB）、翻页耗时相对前几页的倍数，为0时不检查
+        self.recycle_pages = recycle_pages
+        self.recycle_memory_mb = recycle_memory_mb
+        self.recycle_latency_factor = recycle_latency_factor
+        self.memory_check_pages = max(1, memory_check_pages)
+        self.close_timeout = close_timeout
+        # 浏览器实例 -> 运行状况
+        self.health: Dict = {}
+        self.stats = None
+        self._driver = None
+        self._lock = threading.Lock()
+        # 正在使用共享浏览器的操作数，归零时通知 close()
+        self._active = 0
+        self._idle = threading.Condition(self._lock)
+        self._closed = False
+        # 启动共享浏览器需要数秒，单独加锁，期间不阻塞 _lock（运行状况、回收）
+        self._start_lock = threading.Lock()
+        # 浏览器池中的多个线程可能同时启动浏览器，chromedriver路径只解析一次
+        self._resolve_lock = threading.Lock()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        # 同一个crawler只创建一个管理器，中间件和爬虫拿到的是同一个实例
+        manager = getattr(crawler, 'browser_manager', None)
+        if manager is None:
+            settings = crawler.settings
+            blocked_urls = None
+            if settings.getbool('SELENIUM_BLOCK_RESOURCES', True):
+                blocked_urls = settings.getlist('SELENIUM_BLOCKED_URL_PATTERNS') or DEFAULT_BLOCKED_URL_PATTERNS
+            manager = cls(
+                headless=settings.getbool('SELENIUM_HEADLESS', True),
+                page_load_strategy=settings.get('SELENIUM_PAGE_LOAD_STRATEGY', 'eager'),
+                blocked_urls=blocked_urls,
+                # 网络捕获提取模式需要浏览器的性能日志
+                capture_network=settings.get('ARTICLE_EXTRACTOR', 'lxml') == 'network',
+                driver_path=settings.get('SELENIUM_DRIVER_EXECUTABLE_PATH') or None,
+                driver_cache_file=settings.get('CHROMEDRIVER_CACHE_FILE') or None,
+                offline=settings.getbool('OFFLINE_MODE'),
+                page_load_timeout=settings.getint('SELENIUM_PAGE_LOAD_TIMEOUT') or None,
+                script_timeout=settings.getint('SELENIUM_SCRIPT_TIMEOUT') or None,
+                recycle_pages=settings.getint('BROWSER_RECYCLE_PAGES', 0),
+                recycle_memory_mb=settings.getint('BROWSER_RECYCLE_MEMORY_MB', 0),
+                recycle_latency_factor=settings.getfloat('BROWSER_RECYCLE_LATENCY_FACTOR', 0),
+                memory_check_pages=settings.getint('BROWSER_MEMORY_CHECK_PAGES', 20),
+                close_timeout=settings.getfloat('BROWSER_CLOSE_TIMEOUT', 30)
+            )
+            crawler.browser_manager = manager
+            crawler.signals.connect(manager.spider_opened, signals.spider_opened)
+            crawler.signals.connect(manager.spider_closed, signals.spider_closed)
+        return manager
+
+    def spider_opened(self, spider):
+        # 爬虫创建时统计收集器尚未就绪，抓取开始后再关联
+        self.stats = spider.crawler.stats
+
+    @property
+    def started(self) -> bool:
+        return self._driver is not None
+
+    @property
+    def ready_states(self) -> Tuple[str, ...]:
+        """当前页面加载策略下视为页面已就绪的 document.readyState"""
+        return READY_STATES[self.page_load_strategy]
+
+    @property
+    def driver(self) -> 'webdriver.Chrome':
+        """共享的浏览器实例，首次访问时启动"""
+        with self._lock:
+            if self._driver is not None:
+                return self._driver
+        with self._start_lock:
+            with self._lock:
+                if self._driver is not None:
+                    return self._driver
+            driver = self.new_driver()
+            with self._lock:
+                if not self._closed:
+                    self._driver = driver
+                    return driver
+        # 启动期间管理器已关闭
+        driver.quit()
+        raise RuntimeError('浏览器管理器已关闭')
+
+    @contextmanager
+    def in_use(self):
+        """标记一段使用共享浏览器的操作，close() 等待其结束后再关闭浏览器"""
+        with self._lock:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._idle.notify_all()
+
+    def resolve_driver_path(self, refresh: bool = False) -> str:
+        """解析并记住chromedriver路径"""
+        with self._resolve_lock:
+            if self._resolved_driver_path is None or refresh:
+                self._resolved_driver_path = resolve_driver_path(
+                    self.driver_path, self.driver_cache_file, self.offline, refresh
+                )
+            return self._resolved_driver_path
+
+    def new_driver(self) -> 'webdriver.Chrome':
+        """启动一个额外的浏览器实例（用于浏览器池），由调用方负责关闭"""
+        options = (self.headless, self.page_load_strategy, self.blocked_urls, self.capture_network)
+        try:
+            driver = create_chrome_driver(*options, driver_path=self.resolve_driver_path())
+        except SessionNotCreatedException:
+            if self.driver_path or self.offline or not self.driver_cache_file:
+                raise
+            # 缓存的chromedriver可能与已升级的Chrome版本不匹配，重新解析一次
+            logger.warning('使用缓存的chromedriver启动浏览器失败，重新解析chromedriver')
+            driver = create_chrome_driver(*options, driver_path=self.resolve_driver_path(refresh=True))
+        if self.page_load_timeout:
+            driver.set_page_load_timeout(self.page_load_timeout)
+        if self.script_timeout:
+            driver.set_script_timeout(self.script_timeout)
+        return driver
+
+    def driver_health(self, driver) -> BrowserHealth:
+        """浏览器实例的运行状况"""
+        with self._lock:
+            return self.health.setdefault(driver, BrowserHealth())
+
+    def record_page(self, driver, latency: float):
+        """记录浏览器完成一次翻页及其耗时"""
+        self.driver_health(driver).record_page(latency)
+
+    def recycle_reason(self, driver) -> Optional[str]:
+        """判断浏览器是否需要回收
+        
+        长时间运行的浏览器经过大量AJAX翻页后内存持续增长、响应变慢，超时和点击重试随之增多。
+        满足任一条件时需要回收：已处理 recycle_pages 页；内存占用超过 recycle_memory_mb
+        （每 memory_check_pages 页检查一次）；翻页耗时的加权平均超过前几页平均值的 recycle_latency_factor 倍。
+        
+        Args:
+            driver: 浏览器实例
+        
+        Returns:
+            需要回收的原因，不需要回收时返回None
+        """
+        health = self.driver_health(driver)
+        if self.recycle_pages and health.pages >= self.recycle_pages:
+            return f'已处理 {health.pages} 页'
+        if (self.recycle_latency_factor and health.baseline
+                and health.latency > health.baseline * self.recycle_latency_factor):
+            return f'翻页耗时 {health.latency:.2f} 秒，超过前 {BrowserHealth.WARMUP_PAGES} 页平均值的 {self.recycle_latency_factor:g} 倍'
+        if self.recycle_memory_mb and health.pages - health.memory_checked_at >= self.memory_check_pages:
+            health.memory_checked_at = health.pages
+            health.memory = browser_memory(driver)
+            if health.memory is not None:
+                memory_mb = health.memory / 1024 / 1024
+                if self.stats is not None:
+                    call_in_reactor(self.stats.set_value, 'jos/browser/memory_mb', round(memory_mb, 1))
+                    call_in_reactor(self.stats.max_value, 'jos/browser/max_memory_mb', round(memory_mb, 1))
+                if memory_mb > self.recycle_memory_mb:
+                    return f'内存占用 {memory_mb:.0f}MB'
+        return None
+
+    def recycle(self, driver) -> 'webdriver.Chrome':
+        """关闭浏览器并启动一个新的实例（回收的是共享浏览器时同时替换共享实例）
+        
+        Args:
+            driver: 要回收的浏览器实例
+        
+        Returns:
+            新的浏览器实例，需要重新加载搜索页
+        """
+        with self._lock:
+            self.health.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f'关闭浏览器时出错: {str(e)}')
+        new_driver = self.new_driver()
+        with self._lock:
+            if self._driver is driver:
+                self._driver = new_driver
+        if self.stats is not None:
+            call_in_reactor(self.stats.inc_value, 'jos/browser/recycles')
+        return new_driver
+
+    async def spider_closed(self):
+        # 等待chromedriver退出可能需要数秒，在线程池中关闭浏览器，不阻塞reactor
+        await maybe_deferred_to_future(threads.deferToThread(self.close))
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            # 等待中间件、爬虫线程中正在进行的浏览器操作结束，避免关闭后它们收到WebDriver异常
+            if not self._idle.wait_for(lambda: self._active == 0, self.close_timeout):
+                logger.warning(f'等待浏览器操作结束超时（{self.close_timeout:g} 秒），直接关闭浏览器')
+            driver, self._driver = self._driver, None
+            self.health.clear()
+        if driver is not None:
+            driver.quit()
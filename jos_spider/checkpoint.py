@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Optional, Dict
+
+
+def make_query_key(query: Dict) -> str:
+    """根据搜索条件生成检查点的键
+
+    Args:
+        query: 搜索条件，如 {'key1': '软件工程', 'key2': ''}
+
+    Returns:
+        与字段顺序无关的字符串键
+    """
+    return json.dumps(query, ensure_ascii=False, sort_keys=True)
+
+
+class CheckpointStore:
+    """按搜索条件持久化抓取进度的检查点文件
+
+    每个搜索条件记录：
+        last_page: 从第一页起连续完成输出的最后一页
+        completed: last_page 之后已完成的页码（浏览器池、HTTP直连模式下页面完成顺序不固定）
+        total_pages: 总页数
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.checkpoints = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.checkpoints = json.load(f)
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(settings.get('CHECKPOINT_FILE', 'jos_checkpoints.json'))
+
+    def get(self, query: Dict) -> Optional[Dict]:
+        """获取搜索条件对应的检查点，不存在时返回None"""
+        with self.lock:
+            checkpoint = self.checkpoints.get(make_query_key(query))
+            return dict(checkpoint) if checkpoint else None
+
+    def reset(self, query: Dict):
+        """清除搜索条件对应的检查点（重新开始抓取时调用）"""
+        with self.lock:
+            if self.checkpoints.pop(make_query_key(query), None) is not None:
+                self.save()
+
+    def finished_pages(self, query: Dict) -> set:
+        """获取搜索条件下已完成输出的所有页码"""
+        checkpoint = self.get(query)
+        if not checkpoint:
+            return set()
+        return set(range(1, checkpoint['last_page'] + 1)) | set(checkpoint.get('completed', []))
+
+    def mark_page_done(self, query: Dict, page: int, total_pages: Optional[int] = None):
+        """记录一页已完成输出，并立即写入检查点文件
+
+        Args:
+            query: 搜索条件
+            page: 已完成的页码
+            total_pages: 总页数（未知时为None）
+        """
+        with self.lock:
+            key = make_query_key(query)
+            checkpoint = self.checkpoints.setdefault(
+                key, {'query': query, 'last_page': 0, 'completed': [], 'total_pages': None}
+            )
+            completed = set(checkpoint['completed'])
+            completed.add(page)
+            # 把连续完成的页码合并进 last_page
+            last_page = checkpoint['last_page']
+            while last_page + 1 in completed:
+                last_page += 1
+                completed.discard(last_page)
+            checkpoint['last_page'] = last_page
+            checkpoint['completed'] = sorted(p for p in completed if p > last_page)
+            if total_pages:
+                checkpoint['total_pages'] = total_pages
+            checkpoint['updated_at'] = datetime.now().isoformat(timespec='seconds')
+            self.save()
+
+    def save(self):
+        # 先写临时文件再替换，避免进程中途退出时检查点文件损坏
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.checkpoints, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
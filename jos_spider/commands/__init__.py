@@ -0,0 +1 @@
+# 项目命令，由 settings.py 中的 COMMANDS_MODULE 注册；命令名为模块名
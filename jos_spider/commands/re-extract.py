@@ -0,0 +1,85 @@
+import json
+import time
+from urllib.parse import urljoin
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+from jos_spider.dedup import article_fingerprint
+from jos_spider.extractors import EXTRACTORS, describe_payload, extract_result_payload, get_extractor
+from jos_spider.pipelines import clean_article
+from jos_spider.snapshots import SnapshotCache
+
+
+class Command(ScrapyCommand):
+    """用当前的提取器重新提取结果页缓存中的页面（不启动浏览器，不访问网络）
+
+    用法:
+        scrapy re-extract
+        scrapy re-extract -o articles.jsonl --extractor bs4 --query 软件工程
+    """
+
+    requires_project = True
+    requires_crawler_process = False
+
+    def syntax(self) -> str:
+        return '[options]'
+
+    def short_desc(self) -> str:
+        return '从结果页缓存重新提取文章数据（不启动浏览器，不访问网络）'
+
+    def add_options(self, parser):
+        super().add_options(parser)
+        parser.add_argument('-o', '--output', metavar='FILE',
+                            help='输出的JSONL文件（默认为 <OUTPUT_NAME>_reextracted.jsonl）')
+        parser.add_argument('--cache', metavar='FILE', help='结果页缓存文件（默认为 SNAPSHOT_CACHE_PATH）')
+        parser.add_argument('--extractor', metavar='NAME',
+                            help=f'文章提取器（{", ".join(EXTRACTORS)}，默认为 ARTICLE_EXTRACTOR）')
+        parser.add_argument('--query', metavar='LABEL', help='只重新提取该检索条件的页面')
+
+    def run(self, args, opts):
+        settings = self.settings
+        name = opts.extractor or settings.get('ARTICLE_EXTRACTOR', 'lxml')
+        # 'js'、'network' 只用于浏览器中，缓存的片段和接口响应在Python中解析
+        if name not in EXTRACTORS:
+            name = 'lxml'
+        try:
+            extractor = get_extractor(name)
+        except ValueError as e:
+            raise UsageError(str(e))
+        output = opts.output or settings.get('OUTPUT_NAME', 'jos_articles') + '_reextracted.jsonl'
+
+        # 不传 max_age：重新提取时使用缓存中的所有页面
+        cache = SnapshotCache(opts.cache or settings.get('SNAPSHOT_CACHE_PATH', 'jos_snapshots.sqlite'))
+        started = time.perf_counter()
+        pages = articles = failed = duplicates = 0
+        fingerprints = set()
+        try:
+            with open(output, 'w', encoding='utf-8') as f:
+                for snapshot in cache.snapshots(opts.query):
+                    pages += 1
+                    result = extract_result_payload(snapshot.payload, extractor)
+                    if result is None:
+                        failed += 1
+                        print(f'[{snapshot.label}] 第 {snapshot.page} 页未找到文章列表: {describe_payload(snapshot.payload)}')
+                        continue
+                    for article in result['articles']:
+                        if article.get('url'):
+                            article['url'] = urljoin(snapshot.url, article['url'])
+                        article['query'] = snapshot.label
+                        article = clean_article(article)
+                        # 多个检索条件命中的同一篇文章只输出一次（与抓取时一致）
+                        fingerprint = article_fingerprint(article)
+                        if fingerprint in fingerprints:
+                            duplicates += 1
+                            continue
+                        fingerprints.add(fingerprint)
+                        f.write(json.dumps(article, ensure_ascii=False) + '\n')
+                        articles += 1
+        finally:
+            cache.close()
+
+        elapsed = time.perf_counter() - started
+        print(f'重新提取 {pages} 页（{failed} 页失败），输出 {articles} 篇文章（去除重复 {duplicates} 篇）到 {output}，'
+              f'耗时 {elapsed:.2f} 秒（{pages / elapsed if elapsed else 0:.0f} 页/秒）')
+        if pages == 0:
+            print('结果页缓存为空，请先在启用 SNAPSHOT_CACHE_ENABLED 的情况下运行 scrapy crawl jos')
+            self.exitcode = 1
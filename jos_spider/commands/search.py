@@ -0,0 +1,96 @@
+import json
+import os
+import time
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+from jos_spider.index import ArticleIndex
+from jos_spider.pipelines import clean_article
+
+
+def parse_years(value: str):
+    """解析年份范围：2015、2015-2020、2015-（不限截止年份）或 -2020（不限起始年份）"""
+    start, sep, end = value.partition('-')
+    try:
+        start_year = int(start) if start.strip() else None
+        end_year = (int(end) if end.strip() else None) if sep else start_year
+    except ValueError:
+        raise UsageError(f'无法解析年份范围: {value}')
+    return start_year, end_year
+
+
+class Command(ScrapyCommand):
+    """在本地索引中查询抓取到的文章
+
+    用法:
+        scrapy search --author 杨芙清
+        scrapy search --text 形式化验证 --year 2015-2020 --limit 50
+        scrapy search --build jos_articles.jsonl     # 为已有的输出文件建立索引
+    """
+
+    requires_project = True
+    requires_crawler_process = False
+
+    def syntax(self) -> str:
+        return '[options]'
+
+    def short_desc(self) -> str:
+        return '在本地索引中按作者、关键词、全文和年卷期查询文章'
+
+    def add_options(self, parser):
+        super().add_options(parser)
+        parser.add_argument('--author', help='作者姓名')
+        parser.add_argument('--keyword', help='关键词')
+        parser.add_argument('--text', help='标题或摘要中包含的文本')
+        parser.add_argument('--year', help='发表年份或年份范围，如 2015、2015-2020')
+        parser.add_argument('--volume', type=int, help='卷')
+        parser.add_argument('--issue', type=int, help='期')
+        parser.add_argument('--limit', type=int, default=20, help='最多显示的文章数（默认20）')
+        parser.add_argument('--json', action='store_true', help='以JSONL格式输出完整的文章数据')
+        parser.add_argument('--index', metavar='FILE', help='索引文件（默认为 INDEX_PATH）')
+        parser.add_argument('--build', metavar='FILE', help='把JSON/JSONL输出文件中的文章写入索引')
+
+    def run(self, args, opts):
+        path = opts.index or self.settings.get('INDEX_PATH')
+        if not path:
+            raise UsageError('未设置 INDEX_PATH，请使用 --index 指定索引文件')
+        if not opts.build and not os.path.exists(path):
+            raise UsageError(f'索引文件不存在: {path}，请先抓取或使用 --build 建立索引')
+        index = ArticleIndex(path, commit_batch=1000)
+        try:
+            if opts.build:
+                self.build(index, opts.build)
+            if any(value is not None for value in (opts.author, opts.keyword, opts.text, opts.year,
+                                                     opts.volume, opts.issue)):
+                self.search(index, opts)
+        finally:
+            index.close()
+
+    def build(self, index: ArticleIndex, source: str):
+        started = time.perf_counter()
+        with open(source, 'r', encoding='utf-8') as f:
+            if source.endswith('.jsonl'):
+                articles = (json.loads(line) for line in f if line.strip())
+            else:
+                articles = json.load(f)
+            count = 0
+            for article in articles:
+                index.add(clean_article(article))
+                count += 1
+        index.commit()
+        print(f'已写入 {count} 篇文章，索引共 {len(index)} 篇，耗时 {time.perf_counter() - started:.2f} 秒')
+
+    def search(self, index: ArticleIndex, opts):
+        started = time.perf_counter()
+        total, articles = index.search(
+            author=opts.author, keyword=opts.keyword, text=opts.text,
+            years=parse_years(opts.year) if opts.year else None,
+            volume=opts.volume, issue=opts.issue, limit=opts.limit
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        for article in articles:
+            if opts.json:
+                print(json.dumps(article, ensure_ascii=False))
+            else:
+                print(f'{article.get("publish_time", "")}  {article.get("title", "")}  '
+                      f'{", ".join(article.get("authors", []))}')
+        print(f'共 {total} 篇，显示 {len(articles)} 篇，查询耗时 {elapsed:.1f} 毫秒')
@@ -0,0 +1,52 @@
+import json
+from scrapy.commands import ScrapyCommand
+from scrapy.exceptions import UsageError
+from jos_spider.coordination import WorkQueue
+
+
+class Command(ScrapyCommand):
+    """查看协同抓取任务队列的进度，或导出各进程汇总的文章
+
+    用法:
+        scrapy work-queue status
+        scrapy work-queue export -o jos_articles_merged.jsonl
+    """
+
+    requires_project = True
+    requires_crawler_process = False
+
+    def syntax(self) -> str:
+        return 'status|export [options]'
+
+    def short_desc(self) -> str:
+        return '查看协同抓取任务队列的进度，或导出各进程汇总的文章'
+
+    def add_options(self, parser):
+        super().add_options(parser)
+        parser.add_argument('-o', '--output', metavar='FILE',
+                            help='导出的JSONL文件（默认为 <OUTPUT_NAME>_merged.jsonl）')
+        parser.add_argument('--path', metavar='FILE', help='任务队列文件（默认为 COORDINATOR_PATH）')
+
+    def run(self, args, opts):
+        if len(args) != 1 or args[0] not in ('status', 'export'):
+            raise UsageError()
+        path = opts.path or self.settings.get('COORDINATOR_PATH')
+        if not path:
+            raise UsageError('未设置 COORDINATOR_PATH，请使用 --path 指定任务队列文件')
+        queue = WorkQueue(path)
+        try:
+            if args[0] == 'status':
+                counts = queue.status()
+                print('任务: ' + '，'.join(f'{status} {counts.get(status, 0)}'
+                                         for status in ('pending', 'leased', 'done', 'failed')))
+                print(f'已汇总文章: {counts["articles"]}')
+                return
+            output = opts.output or self.settings.get('OUTPUT_NAME', 'jos_articles') + '_merged.jsonl'
+            count = 0
+            with open(output, 'w', encoding='utf-8') as f:
+                for article in queue.articles():
+                    f.write(json.dumps(article, ensure_ascii=False) + '\n')
+                    count += 1
+            print(f'导出 {count} 篇文章到 {output}')
+        finally:
+            queue.close()
@@ -0,0 +1,328 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+from scrapy import signals
+from twisted.internet import task
+from jos_spider.metrics import call_in_reactor
+
+logger = logging.getLogger(__name__)
+
+
+class Lease(NamedTuple):
+    """一个检索条件的一段连续页码的租约"""
+    id: int
+    query_key: str
+    start_page: int
+    end_page: int
+    # 之前持有该租约的进程已完成的页码
+    done_pages: List[int]
+
+    @property
+    def pages(self) -> List[int]:
+        """尚未完成的页码（升序）"""
+        done = set(self.done_pages)
+        return [page for page in range(self.start_page, self.end_page + 1) if page not in done]
+
+
+class WorkQueue:
+    """多个抓取进程（可以在不同机器上，共享同一个文件）共用的任务队列（SQLite）
+
+    任务是某个检索条件的一段连续页码：每个检索条件先登记第1页，抓取第1页得到总页数后按
+    lease_pages 页一段登记其余页码。进程领取任务时获得有效期为 lease_seconds 秒的租约，
+    抓取期间定期续期，进程退出或失联后租约过期，由其他进程重新领取；同一任务最多领取 max_attempts 次。
+    各进程输出的文章按指纹汇总到 articles 表，多个进程抓取到的同一篇文章只保留一条。
+
+    换用其他存储（如网络服务）时实现相同的方法即可。
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 300, lease_pages: int = 10, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.lease_pages = max(1, lease_pages)
+        self.max_attempts = max(1, max_attempts)
+        self.lock = threading.Lock()
+        # 自行管理事务，领取任务时使用 BEGIN IMMEDIATE 与其他进程互斥
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS leases (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query_key TEXT NOT NULL,
+                label TEXT NOT NULL,
+                start_page INTEGER NOT NULL,
+                end_page INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                expires_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                done_pages TEXT NOT NULL DEFAULT '[]',
+                UNIQUE (query_key, start_page)
+            );
+            CREATE INDEX IF NOT EXISTS idx_leases_status ON leases (status, query_key);
+            CREATE TABLE IF NOT EXISTS articles (
+                fingerprint TEXT PRIMARY KEY,
+                query TEXT,
+                worker TEXT NOT NULL,
+                collected_at REAL NOT NULL,
+                data TEXT NOT NULL
+            ) WITHOUT ROWID;
+        ''')
+
+    @classmethod
+    def from_settings(cls, settings) -> 'WorkQueue':
+        return cls(
+            settings.get('COORDINATOR_PATH'),
+            lease_seconds=settings.getfloat('COORDINATOR_LEASE_SECONDS', 300),
+            lease_pages=settings.getint('COORDINATOR_LEASE_PAGES', 10),
+            max_attempts=settings.getint('COORDINATOR_MAX_ATTEMPTS', 3)
+        )
+
+    @contextmanager
+    def transaction(self):
+        """写事务（立即获取数据库写锁，其他进程的写操作等待至多30秒）"""
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+
+    def add_query(self, query_key: str, label: str):
+        """登记检索条件的第1页（已登记时忽略）"""
+        with self.transaction() as conn:
+            conn.execute('INSERT OR IGNORE INTO leases (query_key, label, start_page, end_page) VALUES (?, ?, 1, 1)',
+                         (query_key, label))
+
+    def add_pages(self, query_key: str, label: str, total_pages: int):
+        """按 lease_pages 页一段登记检索条件第2页及以后的页码（已登记的段忽略）"""
+        ranges = [(query_key, label, start, min(total_pages, start + self.lease_pages - 1))
+                  for start in range(2, total_pages + 1, self.lease_pages)]
+        with self.transaction() as conn:
+            conn.executemany(
+                'INSERT OR IGNORE INTO leases (query_key, label, start_page, end_page) VALUES (?, ?, ?, ?)', ranges
+            )
+
+    def acquire(self, worker: str, query_keys: Sequence[str], limit: int = 1) -> List[Lease]:
+        """领取待处理或租约已过期的任务
+
+        Args:
+            worker: 进程标识
+            query_keys: 本进程可以抓取的检索条件
+            limit: 最多领取的任务数
+
+        Returns:
+            领取到的租约，没有可领取的任务时为空列表
+        """
+        if not query_keys:
+            return []
+        now = time.time()
+        placeholders = ','.join('?' * len(query_keys))
+        with self.transaction() as conn:
+            # 租约过期且已达到最大领取次数的任务不再重试
+            conn.execute(
+                f"UPDATE leases SET status = 'failed', worker = NULL WHERE status = 'leased' AND expires_at < ? "
+                f"AND attempts >= ? AND query_key IN ({placeholders})",
+                (now, self.max_attempts, *query_keys)
+            )
+            rows = conn.execute(
+                f"SELECT id, query_key, start_page, end_page, done_pages FROM leases "
+                f"WHERE (status = 'pending' OR (status = 'leased' AND expires_at < ?)) AND query_key IN ({placeholders}) "
+                f"ORDER BY start_page, id LIMIT ?",
+                (now, *query_keys, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE leases SET status = 'leased', worker = ?, expires_at = ?, attempts = attempts + 1 WHERE id = ?",
+                [(worker, now + self.lease_seconds, row[0]) for row in rows]
+            )
+        return [Lease(row[0], row[1], row[2], row[3], json.loads(row[4])) for row in rows]
+
+    def heartbeat(self, worker: str, lease_ids: Sequence[int]):
+        """为本进程持有的租约续期"""
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE leases SET expires_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                [(time.time() + self.lease_seconds, lease_id, worker) for lease_id in lease_ids]
+            )
+
+    def page_done(self, worker: str, lease_id: int, page: int):
+        """记录租约中的一页已完成（租约被其他进程重新领取后跳过该页）"""
+        with self.transaction() as conn:
+            row = conn.execute('SELECT done_pages FROM leases WHERE id = ?', (lease_id,)).fetchone()
+            if row is None:
+                return
+            done_pages = sorted(set(json.loads(row[0])) | {page})
+            conn.execute('UPDATE leases SET done_pages = ? WHERE id = ?', (json.dumps(done_pages), lease_id))
+
+    def complete(self, worker: str, lease_id: int):
+        """任务的所有页面都已完成"""
+        with self.transaction() as conn:
+            conn.execute("UPDATE leases SET status = 'done', worker = NULL WHERE id = ? AND worker = ?",
+                         (lease_id, worker))
+
+    def release(self, worker: str, lease_id: int):
+        """归还未完成的任务，达到最大领取次数时标记为失败"""
+        with self.transaction() as conn:
+            conn.execute(
+                "UPDATE leases SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "worker = NULL, expires_at = NULL WHERE id = ? AND worker = ? AND status = 'leased'",
+                (self.max_attempts, lease_id, worker)
+            )
+
+    def remaining(self, query_keys: Sequence[str]) -> Dict[str, int]:
+        """检索条件中尚未结束的任务数
+
+        Returns:
+            {'available': 可以立即领取的任务数, 'leased': 其他进程持有的有效租约数}
+        """
+        if not query_keys:
+            return {'available': 0, 'leased': 0}
+        now = time.time()
+        placeholders = ','.join('?' * len(query_keys))
+        with self.lock:
+            available, leased = self.conn.execute(
+                f"SELECT "
+                f"COALESCE(SUM(status = 'pending' OR (status = 'leased' AND expires_at < ? AND attempts < ?)), 0), "
+                f"COALESCE(SUM(status = 'leased' AND expires_at >= ?), 0) "
+                f"FROM leases WHERE query_key IN ({placeholders})",
+                (now, self.max_attempts, now, *query_keys)
+            ).fetchone()
+        return {'available': available, 'leased': leased}
+
+    def status(self) -> Dict[str, int]:
+        """各状态的任务数，以及汇总的文章数"""
+        with self.lock:
+            counts = dict(self.conn.execute('SELECT status, COUNT(*) FROM leases GROUP BY status').fetchall())
+            counts['articles'] = self.conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+        return counts
+
+    def add_article(self, fingerprint: str, query: Optional[str], worker: str, article: Dict) -> bool:
+        """汇总一篇文章
+
+        Returns:
+            该文章此前是否不存在（即是否为新文章）
+        """
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO articles (fingerprint, query, worker, collected_at, data) VALUES (?, ?, ?, ?, ?)',
+                (fingerprint, query, worker, time.time(), json.dumps(article, ensure_ascii=False))
+            )
+            return cursor.rowcount > 0
+
+    def articles(self) -> Iterator[Dict]:
+        """按汇总顺序读取所有文章"""
+        with self.lock:
+            rows = self.conn.execute('SELECT data FROM articles ORDER BY collected_at').fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+class Coordinator:
+    """本进程在任务队列中的租约管理
+
+    记录本进程持有的租约，定期续期；一页完成时写入队列，租约的所有页面完成时结束该租约；
+    爬虫关闭时归还未完成的租约。同一个crawler中的爬虫和管道共享同一个实例。
+    """
+
+    def __init__(self, queue: WorkQueue, worker: str, heartbeat_interval: float):
+        self.queue = queue
+        self.worker = worker
+        self.heartbeat_interval = heartbeat_interval
+        # 租约ID -> (租约, 尚未完成的页码)
+        self.held: Dict[int, tuple] = {}
+        self.lock = threading.Lock()
+        self.stats = None
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler) -> 'Coordinator':
+        coordinator = getattr(crawler, 'coordinator', None)
+        if coordinator is None:
+            settings = crawler.settings
+            queue = WorkQueue.from_settings(settings)
+            worker = settings.get('COORDINATOR_WORKER_ID') or f'{socket.gethostname()}-{os.getpid()}'
+            coordinator = cls(queue, worker, max(1.0, queue.lease_seconds / 3))
+            crawler.coordinator = coordinator
+            crawler.signals.connect(coordinator.spider_opened, signal=signals.spider_opened)
+            crawler.signals.connect(coordinator.spider_closed, signal=signals.spider_closed)
+        return coordinator
+
+    def spider_opened(self, spider):
+        # 爬虫创建时统计收集器尚未就绪，抓取开始后再关联
+        self.stats = spider.crawler.stats
+        self.task = task.LoopingCall(self.heartbeat)
+        self.task.start(self.heartbeat_interval, now=False)
+
+    def spider_closed(self, spider, reason):
+        if self.task and self.task.running:
+            self.task.stop()
+        self.release_all()
+        self.queue.close()
+
+    def inc_value(self, key: str, count: int = 1):
+        if self.stats is not None:
+            call_in_reactor(self.stats.inc_value, f'jos/coordinator/{key}', count)
+
+    def heartbeat(self):
+        with self.lock:
+            lease_ids = list(self.held)
+        if not lease_ids:
+            return
+        try:
+            self.queue.heartbeat(self.worker, lease_ids)
+        except sqlite3.Error as e:
+            # 续期失败时等待下一次续期，不中断定时任务
+            logger.warning(f'租约续期失败: {str(e)}')
+
+    def acquire(self, query_keys: Sequence[str], limit: int = 1) -> List[Lease]:
+        """领取任务，没有可领取的任务时返回空列表"""
+        leases = []
+        for lease in self.queue.acquire(self.worker, query_keys, limit):
+            if not lease.pages:
+                # 之前持有该租约的进程已完成所有页面，只是未来得及结束租约
+                self.queue.complete(self.worker, lease.id)
+                continue
+            with self.lock:
+                self.held[lease.id] = (lease, set(lease.pages))
+            leases.append(lease)
+        self.inc_value('leases_acquired', len(leases))
+        return leases
+
+    def page_done(self, query_key: str, page: int):
+        """记录一页已完成，所在租约的所有页面都完成时结束该租约"""
+        with self.lock:
+            for lease_id, (lease, pending) in self.held.items():
+                if lease.query_key == query_key and page in pending:
+                    pending.discard(page)
+                    finished = not pending
+                    if finished:
+                        del self.held[lease_id]
+                    break
+            else:
+                return
+        self.queue.page_done(self.worker, lease_id, page)
+        if finished:
+            self.queue.complete(self.worker, lease_id)
+            self.inc_value('leases_completed')
+
+    def release_all(self):
+        """归还所有未完成的租约（爬虫空闲或关闭时调用）"""
+        with self.lock:
+            lease_ids = list(self.held)
+            self.held.clear()
+        for lease_id in lease_ids:
+            self.queue.release(self.worker, lease_id)
+        self.inc_value('leases_released', len(lease_ids))
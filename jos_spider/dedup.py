@@ -0,0 +1,131 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import unicodedata
+from datetime import datetime
+from scrapy import signals
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """规范化文本：全角转半角、统一大小写并去除所有空白"""
+    return _WHITESPACE.sub('', unicodedata.normalize('NFKC', text or '').casefold())
+
+
+def article_fingerprint(article) -> str:
+    """根据规范化后的标题、作者和发布时间计算文章指纹
+
+    Args:
+        article: 文章数据（包含 title/authors/publish_time 字段）
+
+    Returns:
+        文章指纹（SHA-1十六进制字符串）
+    """
+    parts = [
+        normalize_text(article.get('title', '')),
+        '|'.join(normalize_text(author) for author in article.get('authors', [])),
+        normalize_text(article.get('publish_time', '')),
+    ]
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+class FingerprintStore:
+    """跨运行持久化的文章指纹库（SQLite）
+
+    同一个crawler中的爬虫和去重管道共享同一个实例。
+    """
+
+    def __init__(self, path: str, commit_batch: int = 50):
+        self.path = path
+        self.commit_batch = commit_batch
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                fingerprint TEXT PRIMARY KEY,
+                first_seen TEXT NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        self.conn.commit()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        store = getattr(crawler, 'fingerprint_store', None)
+        if store is None:
+            store = cls(
+                crawler.settings.get('DEDUP_STORE_PATH', 'jos_fingerprints.sqlite'),
+                commit_batch=crawler.settings.getint('OUTPUT_FLUSH_BATCH', 50)
+            )
+            crawler.fingerprint_store = store
+            crawler.signals.connect(store.close, signals.spider_closed)
+        return store
+
+    def __contains__(self, fingerprint: str) -> bool:
+        with self.lock:
+            return self.conn.execute(
+                'SELECT 1 FROM fingerprints WHERE fingerprint = ?', (fingerprint,)
+            ).fetchone() is not None
+
+    def add(self, fingerprint: str) -> bool:
+        """添加指纹
+
+        Args:
+            fingerprint: 文章指纹
+
+        Returns:
+            指纹此前是否不存在（即是否为新文章）
+        """
+        with self.lock:
+            cursor = self.conn.execute(
+                'INSERT OR IGNORE INTO fingerprints (fingerprint, first_seen) VALUES (?, ?)',
+                (fingerprint, datetime.now().isoformat(timespec='seconds'))
+            )
+            self.pending += 1
+            if self.pending >= self.commit_batch:
+                self.conn.commit()
+                self.pending = 0
+            return cursor.rowcount > 0
+
+    def count_new(self, articles) -> int:
+        """统计一组文章中尚未出现过的文章数量（不写入指纹库）"""
+        return sum(1 for article in articles if article_fingerprint(article) not in self)
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.commit()
+                self.conn.close()
+                self.conn = None
+
+
+class MemoryFingerprintStore:
+    """只在本次运行内有效的文章指纹集合
+
+    未启用跨运行去重时，批量检索的多个检索条件命中的同一篇文章只输出一次。
+    """
+
+    def __init__(self):
+        self.fingerprints = set()
+        self.lock = threading.Lock()
+
+    def __contains__(self, fingerprint: str) -> bool:
+        with self.lock:
+            return fingerprint in self.fingerprints
+
+    def add(self, fingerprint: str) -> bool:
+        """添加指纹，返回指纹此前是否不存在（即是否为新文章）"""
+        with self.lock:
+            if fingerprint in self.fingerprints:
+                return False
+            self.fingerprints.add(fingerprint)
+            return True
+
+    def count_new(self, articles) -> int:
+        """统计一组文章中尚未出现过的文章数量（不写入指纹集合）"""
+        return sum(1 for article in articles if article_fingerprint(article) not in self)
+
+    def close(self):
+        pass
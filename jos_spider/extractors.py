@@ -0,0 +1,554 @@
+import json
+import logging
+import re
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, List, Dict, NamedTuple, Tuple
+from bs4 import BeautifulSoup
+from cssselect import HTMLTranslator
+from lxml import etree, html as lxml_html
+
+
+class ArticleExtractor:
+    """文章列表提取器基类
+
+    输入可以是完整的搜索结果页，也可以只是 `EtTableArticleList` 片段，
+    输出为 title/authors/publish_time/keywords/abstract/url 字段组成的文章数据列表（url为详情页链接的原始href）。
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger(__name__)
+
+    def extract(self, html: str) -> Optional[List[Dict]]:
+        """从HTML中提取文章数据
+
+        Args:
+            html: 搜索结果页或文章列表片段的HTML内容
+
+        Returns:
+            文章数据列表，如果未找到文章列表容器则返回None
+        """
+        raise NotImplementedError
+
+
+class BeautifulSoupExtractor(ArticleExtractor):
+    """基于BeautifulSoup（html.parser）的提取器"""
+
+    def extract(self, html: str) -> Optional[List[Dict]]:
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # 获取文章列表容器
+        article_list_container = soup.select_one('.search_ext_article_list')
+        if not article_list_container:
+            return None
+
+        results = []
+        for article in article_list_container.select('li'):
+            try:
+                # 提取文章信息
+                title_elem = article.select_one('.search_ext_article_title a')
+                title = title_elem.get_text(strip=True) if title_elem else ''
+                url = title_elem.get('href', '').strip() if title_elem else ''
+
+                # 提取作者列表
+                authors = [author.get_text(strip=True)
+                           for author in article.select('.search_ext_article_author a')]
+
+                # 提取发布时间（不包含DOI）
+                publish_time_elem = article.select_one('.search_ext_article_position')
+                publish_time = publish_time_elem.get_text().split('DOI:')[0].strip() if publish_time_elem else ''
+
+                # 提取关键词
+                keyword_elem = article.select_one('.search_ext_article_keyword a')
+                keywords = keyword_elem.get_text().split(',') if keyword_elem else []
+                keywords = [k.strip() for k in keywords]
+
+                # 提取摘要
+                abstract_elem = article.select_one('.search_ext_article_abstract p')
+                abstract = abstract_elem.get_text().replace('摘要:', '').strip() if abstract_elem else ''
+
+                # 创建文章数据项
+                results.append({
+                    'title': title,
+                    'authors': authors,
+                    'publish_time': publish_time,
+                    'keywords': keywords,
+                    'abstract': abstract,
+                    'url': url
+                })
+            except Exception as e:
+                self.logger.error(f'解析文章时出错: {str(e)}')
+                continue
+        return results
+
+
+def _compile_css(css: str, prefix: str = 'descendant::') -> etree.XPath:
+    """将CSS选择器预编译为相对当前元素查找的XPath"""
+    return etree.XPath(HTMLTranslator().css_to_xpath(css, prefix=prefix))
+
+
+def _compile_scoped_css(ancestor: str, target: str) -> etree.XPath:
+    """预编译 "ancestor target" 形式的选择器，查找当前元素中的 target
+
+    与BeautifulSoup的select()和浏览器的querySelectorAll()一致，ancestor 可以是当前元素之外的祖先元素
+    （如作者列表中嵌套的 li 也能匹配其中的作者链接）。
+    """
+    translator = HTMLTranslator()
+    return etree.XPath(f'descendant::{translator.css_to_xpath(target, prefix="")}'
+                       f'[ancestor::{translator.css_to_xpath(ancestor, prefix="")}]')
+
+
+# 注释以及脚本、样式的内容（html.parser不解析其中的标签）
+_SKIPPED_MARKUP = re.compile(r'<!--.*?(?:-->|$)|<(script|style)\b.*?(?:</\1\s*>|$)', re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r'<(/?)([a-zA-Z][^\s/>]*)(?:"[^"]*"|\'[^\']*\'|[^\'">])*?(/?)>')
+_VOID_TAGS = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param',
+                        'source', 'track', 'wbr'))
+# 可以出现在 <p> 中的元素，其他元素的开始标签会使libxml2闭合 <p>
+_PHRASING_TAGS = frozenset(('a', 'abbr', 'b', 'bdi', 'bdo', 'big', 'cite', 'code', 'data', 'dfn', 'em', 'font',
+                            'i', 'kbd', 'label', 'mark', 'q', 's', 'samp', 'small', 'span', 'strike', 'strong',
+                            'sub', 'sup', 'template', 'time', 'tt', 'u', 'var')) | _VOID_TAGS
+# 开始标签会使libxml2闭合的同名或同类元素（不跨越 stop 中的元素）
+_IMPLIED_END = {
+    'li': ({'li'}, {'ul', 'ol', 'menu'}),
+    'dt': ({'dt', 'dd'}, {'dl'}),
+    'dd': ({'dt', 'dd'}, {'dl'}),
+    'option': ({'option'}, {'select', 'datalist'}),
+    'tr': ({'tr', 'td', 'th'}, {'table'}),
+    'td': ({'td', 'th'}, {'tr', 'table'}),
+    'th': ({'td', 'th'}, {'tr', 'table'}),
+    'a': ({'a'}, set()),
+}
+
+
+def _is_well_nested(html: str) -> bool:
+    """HTML中的标签是否都已正确闭合和嵌套
+
+    满足时libxml2与html.parser构建的文档树相同；否则libxml2会按HTML规则自动闭合元素
+    （如未闭合的 <li>、<p>），html.parser则把后面的内容嵌套进未闭合的元素，两者的提取结果不同。
+    """
+    stack = []
+    for match in _TAG.finditer(_SKIPPED_MARKUP.sub('', html)):
+        closing, tag, self_closing = match.group(1), match.group(2).lower(), match.group(3)
+        if tag in _VOID_TAGS:
+            continue
+        if closing:
+            if not stack or stack[-1] != tag:
+                return False
+            stack.pop()
+            continue
+        if self_closing:
+            return False
+        if 'p' in stack and tag not in _PHRASING_TAGS:
+            return False
+        if tag in _IMPLIED_END:
+            closes, stop = _IMPLIED_END[tag]
+            for open_tag in reversed(stack):
+                if open_tag in stop:
+                    break
+                if open_tag in closes:
+                    return False
+        stack.append(tag)
+    return not stack
+
+
+class LxmlExtractor(ArticleExtractor):
+    """基于lxml的提取器，使用预编译的选择器，结果与BeautifulSoupExtractor一致
+
+    标签未正确闭合或嵌套时libxml2与html.parser构建的文档树不同，这类页面交给BeautifulSoupExtractor提取。
+    """
+
+    ARTICLE_LIST = _compile_css('.search_ext_article_list', prefix='descendant-or-self::')
+    ARTICLE = _compile_css('li')
+    TITLE = _compile_scoped_css('.search_ext_article_title', 'a')
+    AUTHORS = _compile_scoped_css('.search_ext_article_author', 'a')
+    POSITION = _compile_css('.search_ext_article_position')
+    KEYWORD = _compile_scoped_css('.search_ext_article_keyword', 'a')
+    ABSTRACT = _compile_scoped_css('.search_ext_article_abstract', 'p')
+
+    # 与BeautifulSoup的get_text()一致：不包含注释、脚本、样式和模板中的文本
+    TEXT = etree.XPath('descendant::text()[not(ancestor::script or ancestor::style or ancestor::template)]')
+
+    @classmethod
+    def _text(cls, elem) -> str:
+        # 等价于BeautifulSoup的get_text()
+        return ''.join(cls.TEXT(elem))
+
+    @classmethod
+    def _stripped_text(cls, elem) -> str:
+        # 等价于BeautifulSoup的get_text(strip=True)：逐个文本节点去除空白后拼接
+        return ''.join(text.strip() for text in cls.TEXT(elem))
+
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        super().__init__(logger)
+        self.reference = BeautifulSoupExtractor(self.logger)
+
+    def extract(self, html: str) -> Optional[List[Dict]]:
+        if not html or not html.strip():
+            return None
+        if not _is_well_nested(html):
+            return self.reference.extract(html)
+        root = lxml_html.fromstring(html)
+
+        # 获取文章列表容器
+        containers = self.ARTICLE_LIST(root)
+        if not containers:
+            return None
+
+        results = []
+        for article in self.ARTICLE(containers[0]):
+            try:
+                title_elems = self.TITLE(article)
+                title = self._stripped_text(title_elems[0]) if title_elems else ''
+                url = (title_elems[0].get('href') or '').strip() if title_elems else ''
+
+                authors = [self._stripped_text(author) for author in self.AUTHORS(article)]
+
+                position_elems = self.POSITION(article)
+                publish_time = self._text(position_elems[0]).split('DOI:')[0].strip() if position_elems else ''
+
+                keyword_elems = self.KEYWORD(article)
+                keywords = self._text(keyword_elems[0]).split(',') if keyword_elems else []
+                keywords = [k.strip() for k in keywords]
+
+                abstract_elems = self.ABSTRACT(article)
+                abstract = self._text(abstract_elems[0]).replace('摘要:', '').strip() if abstract_elems else ''
+
+                results.append({
+                    'title': title,
+                    'authors': authors,
+                    'publish_time': publish_time,
+                    'keywords': keywords,
+                    'abstract': abstract,
+                    'url': url
+                })
+            except Exception as e:
+                self.logger.error(f'解析文章时出错: {str(e)}')
+                continue
+        return results
+
+
+_ACTIVE_PAGE = _compile_css("a.active[href*='SubmitArticleSearch']", prefix='descendant-or-self::')
+_PAGE_INFO = _compile_css('.t-pages span', prefix='descendant-or-self::')
+_TOTAL_PAGES = re.compile(r'共\s*(\d+)\s*页')
+
+
+def extract_page_numbers(html: str) -> Tuple[Optional[int], Optional[int]]:
+    """从结果页或文章列表片段中解析当前页码和总页数
+
+    Returns:
+        (当前页码, 总页数)，无法获取的值为None
+    """
+    root = lxml_html.fromstring(html)
+    current_page = None
+    active = _ACTIVE_PAGE(root)
+    if active:
+        text = LxmlExtractor._stripped_text(active[0])
+        current_page = int(text) if text.isdigit() else None
+    total_pages = None
+    for info in _PAGE_INFO(root):
+        match = _TOTAL_PAGES.search(LxmlExtractor._text(info))
+        if match:
+            total_pages = int(match.group(1))
+            break
+    return current_page, total_pages
+
+
+class SearchForm(NamedTuple):
+    """搜索页中的表单"""
+    # 提交地址（绝对地址）
+    url: str
+    method: str
+    # 按浏览器提交表单的规则取出的字段默认值（不包含按钮），保持页面中的顺序
+    fields: List[Tuple[str, str]]
+
+
+_FORM_BY_ID = etree.XPath('//form[@id=$form_id]')
+
+
+def extract_form(html: str, url: str, form_id: str) -> Optional[SearchForm]:
+    """解析页面中指定ID的表单
+
+    Args:
+        html: 页面HTML
+        url: 页面地址，用于把表单的action转换为绝对地址
+        form_id: 表单ID
+
+    Returns:
+        表单的提交地址、方法和字段，页面中没有该表单时返回None
+    """
+    if not html or not html.strip():
+        return None
+    forms = _FORM_BY_ID(lxml_html.fromstring(html, base_url=url), form_id=form_id)
+    if not forms:
+        return None
+    form = forms[0]
+    return SearchForm(form.action or url, form.method or 'GET', list(form.form_values()))
+
+
+def extract_result_payload(payload: str, extractor: ArticleExtractor) -> Optional[Dict]:
+    """解析搜索结果接口（SearchData/SubmitArticleSearch 发出的XHR请求）的响应
+
+    搜索页脚本把响应直接写入 #EtTableArticleList，即响应是文章列表HTML片段；
+    其他格式（如JSON）不做猜测，返回None，由调用方记录响应的结构（见 describe_payload）。
+
+    Args:
+        payload: 响应内容
+        extractor: 解析HTML片段使用的提取器
+
+    Returns:
+        包含 articles/current_page/total_pages 的字典，如果响应中没有文章列表则返回None
+    """
+    if not payload or not payload.strip():
+        return None
+    articles = extractor.extract(payload)
+    if articles is None:
+        return None
+    current_page, total_pages = extract_page_numbers(payload)
+    return {'articles': articles, 'current_page': current_page, 'total_pages': total_pages}
+
+
+def describe_payload(payload: str, limit: int = 80) -> str:
+    """概括无法解析的响应的结构，用于日志
+
+    Args:
+        payload: 响应内容
+        limit: 最多保留的字符数
+
+    Returns:
+        JSON对象的顶层键、JSON数组的长度，或文本的开头部分
+    """
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        text = ' '.join((payload or '').split())
+        return f'文本({len(payload or "")}字符): {text[:limit]}'
+    if isinstance(data, dict):
+        keys = ', '.join(list(data)[:10])
+        return f'JSON对象，顶层键: {keys[:limit]}'
+    if isinstance(data, list):
+        first = type(data[0]).__name__ if data else '-'
+        return f'JSON数组，长度 {len(data)}，元素类型 {first}'
+    return f'JSON {type(data).__name__}'
+
+
+# 在浏览器内一次性提取当前结果页的脚本，提取规则与BeautifulSoupExtractor一致
+# 返回JSON字符串：{"articles": [...], "current_page": n, "total_pages": m}；未找到文章列表容器时返回null
+PAGE_EXTRACT_SCRIPT = r'''
+    var container = document.querySelector('.search_ext_article_list');
+    if (!container) {
+        return null;
+    }
+    // 与get_text()一致：拼接文本节点（不含注释、脚本和样式）
+    function texts(elem) {
+        var result = [];
+        var walker = document.createTreeWalker(elem, NodeFilter.SHOW_TEXT, {
+            acceptNode: function (node) {
+                var parent = node.parentNode;
+                while (parent && parent !== elem.parentNode) {
+                    // 与LxmlExtractor.TEXT一致：不包含脚本、样式和模板中的文本
+                    if (parent.tagName === 'SCRIPT' || parent.tagName === 'STYLE' || parent.tagName === 'TEMPLATE') {
+                        return NodeFilter.FILTER_REJECT;
+                    }
+                    parent = parent.parentNode;
+                }
+                return NodeFilter.FILTER_ACCEPT;
+            }
+        });
+        while (walker.nextNode()) {
+            result.push(walker.currentNode.nodeValue);
+        }
+        return result;
+    }
+    function text(elem) {
+        return elem ? texts(elem).join('') : '';
+    }
+    // 与get_text(strip=True)一致：逐个文本节点去除空白后拼接
+    function strippedText(elem) {
+        return elem ? texts(elem).map(function (t) { return t.trim(); }).join('') : '';
+    }
+    var articles = [];
+    container.querySelectorAll('li').forEach(function (article) {
+        var keywordElem = article.querySelector('.search_ext_article_keyword a');
+        var titleElem = article.querySelector('.search_ext_article_title a');
+        articles.push({
+            title: strippedText(article.querySelector('.search_ext_article_title a')),
+            authors: Array.prototype.map.call(
+                article.querySelectorAll('.search_ext_article_author a'), strippedText),
+            publish_time: text(article.querySelector('.search_ext_article_position')).split('DOI:')[0].trim(),
+            keywords: keywordElem ? text(keywordElem).split(',').map(function (k) { return k.trim(); }) : [],
+            abstract: text(article.querySelector('.search_ext_article_abstract p')).split('摘要:').join('').trim(),
+            url: titleElem ? (titleElem.getAttribute('href') || '').trim() : ''
+        });
+    });
+    var active = document.querySelector("a.active[href*='SubmitArticleSearch']");
+    var pageInfo = document.querySelector('.t-pages span');
+    var totalMatch = pageInfo ? /共\s*(\d+)\s*页/.exec(pageInfo.textContent) : null;
+    return JSON.stringify({
+        articles: articles,
+        current_page: active ? parseInt(active.textContent, 10) || null : null,
+        total_pages: totalMatch ? parseInt(totalMatch[1], 10) : null
+    });
+'''
+
+# 读取当前页码的脚本
+CURRENT_PAGE_SCRIPT = r'''
+    var active = document.querySelector("a.active[href*='SubmitArticleSearch']");
+    return active ? parseInt(active.textContent, 10) || null : null;
+'''
+
+
+def extract_page_in_browser(driver) -> Optional[Dict]:
+    """通过一次 execute_script 调用提取当前结果页的全部文章及页码信息
+
+    Args:
+        driver: 已加载搜索结果的浏览器实例
+
+    Returns:
+        包含 articles/current_page/total_pages 的字典，如果未找到文章列表容器则返回None
+    """
+    payload = driver.execute_script(PAGE_EXTRACT_SCRIPT)
+    if not payload:
+        return None
+    return json.loads(payload)
+
+
+# 详情页中的引文元数据（<meta name="citation_*">）与文章字段的对应关系
+DETAIL_META_FIELDS = {
+    'doi': 'citation_doi',
+    'pdf_url': 'citation_pdf_url',
+    'journal': 'citation_journal_title',
+    'publication_date': 'citation_publication_date',
+    'volume': 'citation_volume',
+    'issue': 'citation_issue',
+}
+_META_CONTENT = etree.XPath('//meta[@name=$name]/@content')
+_DOI = re.compile(r'DOI\s*[:：]\s*(10\.\d{4,9}/[^\s<>"]+)', re.IGNORECASE)
+
+
+def extract_article_details(html: str) -> Dict:
+    """从文章详情页中提取列表页没有的字段
+
+    优先读取页面头部的引文元数据（citation_doi、citation_pdf_url、citation_author_institution 等），
+    页面中没有 citation_doi 时从正文的“DOI:”文本中查找。
+
+    Args:
+        html: 详情页的HTML内容
+
+    Returns:
+        doi/pdf_url/affiliations/journal/publication_date/volume/issue/pages 中页面提供的字段
+    """
+    if not html or not html.strip():
+        return {}
+    root = lxml_html.fromstring(html)
+
+    def meta(name: str) -> List[str]:
+        return [value.strip() for value in _META_CONTENT(root, name=name) if value.strip()]
+
+    details = {}
+    for field, name in DETAIL_META_FIELDS.items():
+        values = meta(name)
+        if values:
+            details[field] = values[0]
+
+    # 作者单位按出现顺序去重（多位作者可能属于同一单位）
+    affiliations = list(dict.fromkeys(meta('citation_author_institution')))
+    if affiliations:
+        details['affiliations'] = affiliations
+
+    first_page, last_page = meta('citation_firstpage'), meta('citation_lastpage')
+    if first_page:
+        details['pages'] = f'{first_page[0]}-{last_page[0]}' if last_page else first_page[0]
+
+    if 'doi' not in details:
+        match = _DOI.search(LxmlExtractor._text(root))
+        if match:
+            details['doi'] = match.group(1).rstrip('.,;')
+    return details
+
+
+# 可通过 ARTICLE_EXTRACTOR 设置选择的提取器
+EXTRACTORS = {
+    'bs4': BeautifulSoupExtractor,
+    'lxml': LxmlExtractor,
+}
+
+
+def get_extractor(name: str, logger: Optional[logging.Logger] = None) -> ArticleExtractor:
+    """根据名称创建提取器
+
+    Args:
+        name: 提取器名称，见 EXTRACTORS
+        logger: 记录解析错误使用的日志对象
+
+    Returns:
+        提取器实例
+    """
+    if name not in EXTRACTORS:
+        raise ValueError(f'未知的文章提取器: {name}，可选值: {", ".join(EXTRACTORS)}')
+    return EXTRACTORS[name](logger)
+
+
+class OrderedExtractionPool:
+    """按提交顺序输出结果的文章提取线程池
+
+    浏览器线程把结果页的文章列表片段交给线程池后即可开始翻页，提取与等待翻页同时进行；
+    提取结果按提交顺序取出，尚未取出的页面达到 max_pending 页时，提交会等待最早的页面提取完成（背压），
+    避免翻页远快于提取时积压过多页面。workers 为0时在提交时直接提取。
+    """
+
+    def __init__(self, extract: Callable[[str], Optional[List[Dict]]], workers: int = 2, max_pending: int = 4):
+        self.extract = extract
+        self.max_pending = max(1, max_pending)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='jos-extract') if workers > 0 else None
+        # (页面标识, 提取结果) 按提交顺序排列
+        self.pending = deque()
+
+    @property
+    def pipelined(self) -> bool:
+        """是否在线程池中提取（否则在提交时直接提取）"""
+        return self.executor is not None
+
+    def submit(self, key: Any, html: Optional[str] = None,
+               articles: Optional[List[Dict]] = None) -> List[Tuple[Any, Optional[List[Dict]]]]:
+        """提交一页的文章列表片段
+
+        Args:
+            key: 页面标识（如页码），与提取结果一起返回
+            html: 文章列表片段的HTML
+            articles: 已提取的文章数据（如浏览器内提取、网络捕获模式），不再提取
+
+        Returns:
+            已按提交顺序完成提取的 (页面标识, 文章数据列表)，文章数据为None表示未找到文章列表容器
+        """
+        if articles is None and self.executor is not None:
+            future = self.executor.submit(self.extract, html)
+        else:
+            future = Future()
+            future.set_result(articles if articles is not None else self.extract(html))
+        self.pending.append((key, future))
+
+        ready = []
+        while self.pending and (self.pending[0][1].done() or len(self.pending) > self.max_pending):
+            key, future = self.pending.popleft()
+            ready.append((key, future.result()))
+        return ready
+
+    def drain(self) -> List[Tuple[Any, Optional[List[Dict]]]]:
+        """等待所有已提交的页面提取完成，按提交顺序返回"""
+        ready = []
+        while self.pending:
+            key, future = self.pending.popleft()
+            ready.append((key, future.result()))
+        return ready
+
+    def close(self):
+        """丢弃尚未开始提取的页面并关闭线程池"""
+        self.pending.clear()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> 'OrderedExtractionPool':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,208 @@
+import json
+import re
+import sqlite3
+import threading
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from jos_spider.dedup import article_fingerprint, normalize_text
+
+# 中日韩统一表意文字（含扩展A区和兼容区）的连续片段
+_CJK_CHARS = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_CJK_RUN = re.compile(f'[{_CJK_CHARS}]+')
+# 发布时间，如 "1991, 2(2):1-8." 或 "2023,34(5): 2001-2020"
+_PUBLISH_TIME = re.compile(r'(\d{4})\s*[,，]\s*(\d+)?\s*(?:[(（]\s*(\d+)\s*[)）])?\s*(?:[:：]\s*([\d\-–]+))?')
+
+
+class Citation(NamedTuple):
+    """从发布时间中解析出的年、卷、期、页码"""
+    year: Optional[int]
+    volume: Optional[int]
+    issue: Optional[int]
+    pages: Optional[str]
+
+
+def parse_publish_time(text: str) -> Citation:
+    """解析发布时间中的年、卷、期、页码
+
+    Args:
+        text: 发布时间，如 "1991, 2(2):1-8."
+
+    Returns:
+        无法解析的部分为None
+    """
+    match = _PUBLISH_TIME.search(unicodedata.normalize('NFKC', text or ''))
+    if not match:
+        return Citation(None, None, None, None)
+    year, volume, issue, pages = match.groups()
+    return Citation(
+        int(year),
+        int(volume) if volume else None,
+        int(issue) if issue else None,
+        pages.replace('–', '-') if pages else None
+    )
+
+
+def text_terms(text: str) -> Set[str]:
+    """全文索引的词项：中文按相邻两字切分（只有一个字的片段保留单字）
+
+    英文和数字不建立索引：按整词索引时查询 model 找不到 models，查询时只按全文确认，可以匹配单词的一部分。
+    """
+    terms = set()
+    for run in _CJK_RUN.findall(unicodedata.normalize('NFKC', text or '')):
+        if len(run) > 1:
+            terms.update(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            terms.add(run)
+    return terms
+
+
+class ArticleIndex:
+    """抓取结果的本地索引（SQLite）
+
+    作者、关键词建立倒排索引（规范化后精确匹配），标题和摘要建立中文二元切分的全文索引，
+    并从发布时间中解析年、卷、期。全文检索先用倒排索引取出包含查询中所有中文二元词项的文章，
+    再检查规范化后的标题、摘要是否包含整个查询文本（英文按子串匹配）。同一篇文章（按指纹）再次写入时更新索引。
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY,
+            fingerprint TEXT NOT NULL UNIQUE,
+            year INTEGER,
+            volume INTEGER,
+            issue INTEGER,
+            pages TEXT,
+            search_text TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            field TEXT NOT NULL,
+            term TEXT NOT NULL,
+            article_id INTEGER NOT NULL,
+            PRIMARY KEY (field, term, article_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_articles_citation ON articles(year, volume, issue);
+        CREATE INDEX IF NOT EXISTS idx_postings_article ON postings(article_id);
+    '''
+
+    def __init__(self, path: str, commit_batch: int = 50):
+        self.path = path
+        self.commit_batch = commit_batch
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # 抓取过程中写入索引时可以同时查询
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(self.SCHEMA)
+
+    def add(self, article: Dict) -> int:
+        """写入或更新一篇文章的索引
+
+        Args:
+            article: 清理后的文章数据
+
+        Returns:
+            文章在索引中的ID
+        """
+        citation = parse_publish_time(article.get('publish_time', ''))
+        search_text = normalize_text(article.get('title', '')) + '\n' + normalize_text(article.get('abstract', ''))
+        postings = {('author', normalize_text(name)) for name in article.get('authors', [])}
+        postings |= {('keyword', normalize_text(word)) for word in article.get('keywords', [])}
+        text = article.get('title', '') + '\n' + article.get('abstract', '')
+        postings |= {('text', term) for term in text_terms(text)}
+        row = (citation.year, citation.volume, citation.issue, citation.pages, search_text,
+               json.dumps(article, ensure_ascii=False))
+        fingerprint = article_fingerprint(article)
+        with self.lock:
+            existing = self.conn.execute('SELECT id FROM articles WHERE fingerprint = ?', (fingerprint,)).fetchone()
+            if existing:
+                article_id = existing[0]
+                self.conn.execute(
+                    'UPDATE articles SET year = ?, volume = ?, issue = ?, pages = ?, search_text = ?, data = ? '
+                    'WHERE id = ?', (*row, article_id)
+                )
+                self.conn.execute('DELETE FROM postings WHERE article_id = ?', (article_id,))
+            else:
+                article_id = self.conn.execute(
+                    'INSERT INTO articles (fingerprint, year, volume, issue, pages, search_text, data) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)', (fingerprint, *row)
+                ).lastrowid
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO postings (field, term, article_id) VALUES (?, ?, ?)',
+                [(field, term, article_id) for field, term in postings if term]
+            )
+            self.pending += 1
+            if self.pending >= self.commit_batch:
+                self.conn.commit()
+                self.pending = 0
+        return article_id
+
+    def search(self, author: str = None, keyword: str = None, text: str = None,
+               years: Tuple[Optional[int], Optional[int]] = None, volume: int = None, issue: int = None,
+               limit: int = 20) -> Tuple[int, List[Dict]]:
+        """查询文章（各条件同时满足）
+
+        Args:
+            author: 作者姓名
+            keyword: 关键词
+            text: 标题或摘要中包含的文本
+            years: 发表年份范围 (起始年份, 截止年份)，包含两端，为None的一端不限制
+            volume: 卷
+            issue: 期
+            limit: 最多返回的文章数
+
+        Returns:
+            (满足条件的文章总数, 按年、卷、期倒序排列的前 limit 篇文章)
+        """
+        subqueries = []
+        params = []
+        for field, value in (('author', author), ('keyword', keyword)):
+            if value:
+                subqueries.append('SELECT article_id FROM postings WHERE field = ? AND term = ?')
+                params += [field, normalize_text(value)]
+        conditions = []
+        if text:
+            # 长片段中的单字没有单独索引，单字和英文查询只按全文确认
+            terms = sorted(term for term in text_terms(text) if len(term) > 1)
+            if terms:
+                subqueries.append(
+                    f"SELECT article_id FROM postings WHERE field = 'text' AND term IN ({','.join('?' * len(terms))}) "
+                    f"GROUP BY article_id HAVING COUNT(*) = ?"
+                )
+                params += [*terms, len(terms)]
+            # 二元词项都出现不代表包含整个查询文本，逐篇确认
+            conditions.append('instr(search_text, ?) > 0')
+        if subqueries:
+            conditions.insert(0, f'id IN ({" INTERSECT ".join(subqueries)})')
+        if text:
+            params.append(normalize_text(text))
+        start_year, end_year = years or (None, None)
+        for condition, value in (('year >= ?', start_year), ('year <= ?', end_year),
+                                 ('volume = ?', volume), ('issue = ?', issue)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+        with self.lock:
+            total = self.conn.execute(f'SELECT COUNT(*) FROM articles{where}', params).fetchone()[0]
+            rows = self.conn.execute(
+                f'SELECT data FROM articles{where} ORDER BY year DESC, volume DESC, issue DESC, id LIMIT ?',
+                [*params, limit]
+            ).fetchall()
+        return total, [json.loads(data) for (data,) in rows]
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+
+    def commit(self):
+        with self.lock:
+            self.conn.commit()
+            self.pending = 0
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.commit()
+                self.conn.close()
+                self.conn = None
@@ -0,0 +1,282 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Tuple
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+from twisted.python import threadable
+import jos_spider
+
+# 耗时直方图的桶上界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# 启动耗时的统计项：进程启动 / 加载项目设置 至爬虫开始运行，以及进程启动至输出第一篇文章
+STARTUP_STATS = (
+    ('process', 'jos/startup/process_seconds'),
+    ('project', 'jos/startup/project_seconds'),
+    ('first_item', 'jos/startup/first_item_seconds'),
+)
+
+
+def process_uptime() -> Optional[float]:
+    """当前进程已运行的秒数（读取 /proc，无法读取时返回None）"""
+    try:
+        with open('/proc/self/stat', 'r') as f:
+            # 进程名可能包含空格，从最后一个右括号之后开始按空格切分；starttime 为第22个字段
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime', 'r') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def call_in_reactor(func: Callable, *args, **kwargs):
+    """在reactor线程中调用 func（不等待结果）
+
+    Scrapy的统计收集器等对象不是线程安全的，浏览器线程和reactor线程池中的写入通过 callFromThread 交给reactor线程执行；
+    已在reactor线程中，或reactor未运行（命令行工具、测试）时直接调用。
+    """
+    if threadable.ioThread is None or threadable.isInIOThread():
+        func(*args, **kwargs)
+        return
+    # 在函数内导入reactor，避免加载模块时提前安装默认的reactor
+    from twisted.internet import reactor
+    reactor.callFromThread(func, *args, **kwargs)
+
+
+class StageMetrics:
+    """各阶段耗时直方图和重试计数
+
+    数据同时写入Scrapy统计（jos/stage/<阶段>/...、jos/retries/<类型>），抓取结束时随统计信息输出；
+    同一个crawler中的爬虫、中间件和管道共享同一个实例。stats为None时只在内存中记录。
+    可以在浏览器线程中调用，统计的写入在reactor线程中执行。
+    """
+
+    def __init__(self, stats=None, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.stats = stats
+        self.buckets = tuple(sorted(buckets))
+        self.lock = threading.Lock()
+        # 阶段 -> {'buckets': [各桶的累计次数], 'count': 次数, 'sum': 总耗时}
+        self.histograms: Dict[str, Dict] = {}
+        self.retries: Dict[str, int] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        metrics = getattr(crawler, 'stage_metrics', None)
+        if metrics is None:
+            metrics = cls()
+            crawler.stage_metrics = metrics
+            # 爬虫创建时统计收集器尚未就绪，抓取开始后再关联
+            crawler.signals.connect(metrics.spider_opened, signal=signals.spider_opened)
+            crawler.signals.connect(metrics.item_scraped, signal=signals.item_scraped)
+        return metrics
+
+    def spider_opened(self, spider):
+        self.stats = spider.crawler.stats
+        self.record_startup(spider)
+
+    def record_startup(self, spider):
+        """记录启动耗时（jos/startup/*）：进程启动、加载项目设置至爬虫开始运行"""
+        project = time.monotonic() - jos_spider.IMPORTED_AT
+        self.stats.set_value('jos/startup/project_seconds', round(project, 3))
+        process = process_uptime()
+        if process is not None:
+            self.stats.set_value('jos/startup/process_seconds', round(process, 3))
+            spider.logger.info(f'启动耗时 {process:.2f} 秒（进程启动至爬虫开始运行），其中加载项目设置之后 {project:.2f} 秒')
+        else:
+            spider.logger.info(f'启动耗时 {project:.2f} 秒（加载项目设置至爬虫开始运行）')
+
+    def item_scraped(self, item, spider):
+        if self.stats is not None and self.stats.get_value('jos/startup/first_item_seconds') is None:
+            elapsed = process_uptime()
+            if elapsed is None:
+                elapsed = time.monotonic() - jos_spider.IMPORTED_AT
+            self.stats.set_value('jos/startup/first_item_seconds', round(elapsed, 3))
+
+    def observe(self, stage: str, seconds: float):
+        """记录一次阶段耗时
+
+        Args:
+            stage: 阶段名称
+            seconds: 耗时（秒）
+        """
+        with self.lock:
+            histogram = self.histograms.setdefault(
+                stage, {'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0}
+            )
+            histogram['count'] += 1
+            histogram['sum'] += seconds
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram['buckets'][index] += 1
+        if self.stats is not None:
+            call_in_reactor(self.record_stage_stats, self.stats, stage, seconds)
+
+    def record_stage_stats(self, stats, stage: str, seconds: float):
+        """把一次阶段耗时写入Scrapy统计（在reactor线程中执行）"""
+        for bound in self.buckets:
+            if seconds <= bound:
+                stats.inc_value(f'jos/stage/{stage}/le_{bound}')
+        stats.inc_value(f'jos/stage/{stage}/count')
+        stats.inc_value(f'jos/stage/{stage}/sum', seconds, start=0.0)
+        stats.max_value(f'jos/stage/{stage}/max', seconds)
+
+    @contextmanager
+    def time(self, stage: str):
+        """记录代码块耗时的上下文管理器（代码块抛出异常时同样记录）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def retry(self, kind: str):
+        """记录一次重试
+
+        Args:
+            kind: 重试类型，如 'click'、'page_load'
+        """
+        with self.lock:
+            self.retries[kind] = self.retries.get(kind, 0) + 1
+        if self.stats is not None:
+            call_in_reactor(self.stats.inc_value, f'jos/retries/{kind}')
+
+    def inc_value(self, key: str, count: int = 1):
+        """累加Scrapy统计中的计数（键名为 jos/<key>）"""
+        if self.stats is not None:
+            call_in_reactor(self.stats.inc_value, f'jos/{key}', count)
+
+    def snapshot(self) -> Tuple[Dict[str, Dict], Dict[str, int]]:
+        """获取直方图和重试计数的副本"""
+        with self.lock:
+            histograms = {
+                stage: {'buckets': list(h['buckets']), 'count': h['count'], 'sum': h['sum']}
+                for stage, h in self.histograms.items()
+            }
+            return histograms, dict(self.retries)
+
+
+def format_prometheus(metrics: StageMetrics, stats: Dict) -> str:
+    """将阶段耗时、重试计数和抓取进度格式化为Prometheus文本格式
+
+    Args:
+        metrics: 阶段耗时数据
+        stats: Scrapy统计信息
+
+    Returns:
+        Prometheus文本格式的指标
+    """
+    histograms, retries = metrics.snapshot()
+    lines = [
+        '# HELP jos_stage_seconds 各阶段耗时',
+        '# TYPE jos_stage_seconds histogram',
+    ]
+    for stage, histogram in sorted(histograms.items()):
+        for bound, count in zip(metrics.buckets, histogram['buckets']):
+            lines.append(f'jos_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+        lines.append(f'jos_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram["count"]}')
+        lines.append(f'jos_stage_seconds_sum{{stage="{stage}"}} {histogram["sum"]:.6f}')
+        lines.append(f'jos_stage_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+
+    lines += ['# HELP jos_retries_total 各类操作的重试次数', '# TYPE jos_retries_total counter']
+    for kind, count in sorted(retries.items()):
+        lines.append(f'jos_retries_total{{kind="{kind}"}} {count}')
+
+    counters = (
+        ('jos_items_scraped_total', '已输出的文章数', 'counter', stats.get('item_scraped_count', 0)),
+        ('jos_items_dropped_total', '被丢弃的文章数', 'counter', stats.get('item_dropped_count', 0)),
+        ('jos_pages_done_total', '已完成输出的结果页数', 'counter', stats.get('jos/pages_done', 0)),
+        ('jos_items_per_second', '平均每秒输出的文章数', 'gauge', stats.get('jos/items_per_second', 0)),
+        ('jos_page_loads_total', '浏览器加载的搜索页数', 'counter', stats.get('jos/page_loads', 0)),
+        ('jos_page_bytes_total', '浏览器加载搜索页传输的字节数', 'counter', stats.get('jos/page_bytes', 0)),
+        ('jos_page_requests_total', '浏览器加载搜索页发出的请求数', 'counter', stats.get('jos/page_requests', 0)),
+    )
+    for name, help_text, metric_type, value in counters:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}', f'{name} {value}']
+
+    # 自适应速率控制：各主机当前的请求速率和并发数（jos/rate/<主机>/<指标>）
+    gauges = (
+        ('requests_per_second', 'jos_rate_requests_per_second', '自适应速率控制当前允许的每秒请求数'),
+        ('concurrency', 'jos_rate_concurrency', '自适应速率控制当前允许的并发请求数'),
+    )
+    for suffix, name, help_text in gauges:
+        values = sorted(
+            (key[len('jos/rate/'):-len(suffix) - 1], value) for key, value in stats.items()
+            if key.startswith('jos/rate/') and key.endswith('/' + suffix)
+        )
+        if values:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+            lines += [f'{name}{{host="{host}"}} {value}' for host, value in values]
+    startup = [(phase, stats[key]) for phase, key in STARTUP_STATS if stats.get(key) is not None]
+    if startup:
+        lines += ['# HELP jos_startup_seconds 启动耗时（process/project: 进程启动/加载项目设置至爬虫开始运行，'
+                  'first_item: 进程启动至输出第一篇文章）', '# TYPE jos_startup_seconds gauge']
+        lines += [f'jos_startup_seconds{{phase="{phase}"}} {value}' for phase, value in startup]
+    lines += [
+        '# HELP jos_rate_backoffs_total 自适应速率控制的退避次数',
+        '# TYPE jos_rate_backoffs_total counter',
+        f'jos_rate_backoffs_total {stats.get("jos/rate/backoffs", 0)}',
+        '# HELP jos_browser_recycles_total 长时间运行后回收（重启）浏览器的次数',
+        '# TYPE jos_browser_recycles_total counter',
+        f'jos_browser_recycles_total {stats.get("jos/browser/recycles", 0)}',
+    ]
+    if stats.get('jos/browser/memory_mb') is not None:
+        lines += [
+            '# HELP jos_browser_memory_mb 最近一次检查到的浏览器内存占用（MB）',
+            '# TYPE jos_browser_memory_mb gauge',
+            f'jos_browser_memory_mb {stats["jos/browser/memory_mb"]}',
+        ]
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """抓取过程中定期把指标写入Prometheus文本格式的文件（可由node_exporter的textfile收集器读取）"""
+
+    def __init__(self, crawler, path: str, interval: float):
+        self.crawler = crawler
+        self.stats = crawler.stats
+        self.metrics = StageMetrics.from_crawler(crawler)
+        self.path = path
+        self.interval = interval
+        self.started_at: Optional[float] = None
+        self.task = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get('METRICS_FILE')
+        if not path:
+            raise NotConfigured('未设置 METRICS_FILE')
+        exporter = cls(crawler, path, crawler.settings.getfloat('METRICS_INTERVAL', 15))
+        crawler.signals.connect(exporter.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(exporter.spider_closed, signal=signals.spider_closed)
+        return exporter
+
+    def spider_opened(self, spider):
+        self.started_at = time.monotonic()
+        self.task = task.LoopingCall(self.dump)
+        self.task.start(self.interval, now=False)
+
+    def spider_closed(self, spider, reason):
+        if self.task and self.task.running:
+            self.task.stop()
+        self.dump()
+
+    def update_rates(self):
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0
+        if elapsed > 0:
+            items = self.stats.get_value('item_scraped_count', 0)
+            self.stats.set_value('jos/items_per_second', round(items / elapsed, 3))
+
+    def dump(self):
+        self.update_rates()
+        text = format_prometheus(self.metrics, self.stats.get_stats())
+        text += f'# 更新时间 {datetime.now(timezone.utc).isoformat(timespec="seconds")}\n'
+        # 先写临时文件再替换，读取方不会读到写了一半的文件
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
@@ -1,76 +1,126 @@
-from scrapy import signals
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+from scrapy.http import HtmlResponse
+from scrapy.utils.defer import maybe_deferred_to_future
+from twisted.internet import threads
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from fake_useragent import UserAgent
+from selenium.common.exceptions import TimeoutException
+from jos_spider.browser import BrowserManager, install_list_observer, wait_for_list_change, report_page_transfer
+from jos_spider.metrics import StageMetrics
+from jos_spider.queries import SearchQuery
+from jos_spider.ratelimit import AdaptiveRateController
+from scrapy.utils.httpobj import urlparse_cached
+import random
 import time
 
+# 内置的User-Agent列表，离线运行或fake-useragent不可用时使用
+BUNDLED_USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14.2; rv:121.0) Gecko/20100101 Firefox/121.0',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0',
+)
+
 class RandomUserAgentMiddleware:
-    def __init__(self):
-        self.ua = UserAgent()
+    """为每个请求随机设置User-Agent
+    
+    USER_AGENT_SOURCE 为 'fake_useragent' 时使用fake-useragent（处理第一个请求时才导入），
+    为 'bundled'、启用 OFFLINE_MODE 或fake-useragent不可用时使用内置列表。
+    """
+
+    def __init__(self, source: str = 'fake_useragent'):
+        if source not in ('fake_useragent', 'bundled'):
+            raise ValueError(f'未知的User-Agent来源: {source}，可选值: fake_useragent, bundled')
+        self.source = source
+        self.ua = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        source = crawler.settings.get('USER_AGENT_SOURCE', 'fake_useragent')
+        if crawler.settings.getbool('OFFLINE_MODE'):
+            source = 'bundled'
+        return cls(source)
+
+    def random_user_agent(self, spider) -> str:
+        if self.source == 'fake_useragent':
+            try:
+                if self.ua is None:
+                    from fake_useragent import UserAgent
+                    self.ua = UserAgent()
+                return self.ua.random
+            except Exception as e:
+                spider.logger.warning(f'fake-useragent 不可用（{str(e)}），改用内置的User-Agent列表')
+                self.source = 'bundled'
+        return random.choice(BUNDLED_USER_AGENTS)
 
     def process_request(self, request, spider):
-        request.headers['User-Agent'] = self.ua.random
+        request.headers['User-Agent'] = self.random_user_agent(spider)
 
 class SeleniumMiddleware:
-    def __init__(self):
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument('--disable-extensions')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--start-maximized')
-        chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
-        # 添加自定义 User-Agent
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-        
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        
-        # 添加更多的反自动化检测绕过
-        self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-            'source': '''
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-                Object.defineProperty(navigator, 'plugins', {
-                    get: () => [1, 2, 3, 4, 5]
-                });
-                window.chrome = {
-                    runtime: {}
-                };
-            '''
-        })
+    def __init__(self, browser: BrowserManager, metrics: StageMetrics = None, rate: AdaptiveRateController = None):
+        # 浏览器由管理器在首次使用时启动，并与爬虫共享
+        self.browser = browser
+        self.metrics = metrics or StageMetrics()
+        # 与HTTP请求共用的自适应速率控制
+        self.rate = rate or AdaptiveRateController(enabled=False)
 
-    def process_request(self, request, spider):
+    @property
+    def driver(self):
+        return self.browser.driver
+
+    async def process_request(self, request, spider):
+        # HTTP直连模式的请求不经过Selenium
+        if request.meta.get('dont_selenium'):
+            return None
         if 'advanced_search' in request.url:
-            max_retries = spider.settings.getint('RETRY_TIMES', 3)  # 增加重试次数
-            retry_count = 0
-            
-            while retry_count < max_retries:
-                try:
-                    spider.logger.info(f'正在尝试加载页面，第 {retry_count + 1} 次尝试')
-                    
-                    # 清除所有 cookies
-                    self.driver.delete_all_cookies()
-                    
-                    # 设置页面加载策略
-                    self.driver.set_page_load_timeout(spider.settings.getint('SELENIUM_PAGE_LOAD_TIMEOUT'))  # 页面加载超时时间
-                    self.driver.set_script_timeout(spider.settings.getint('SELENIUM_SCRIPT_TIMEOUT'))       # 脚本执行超时时间
-                    
+            # 浏览器操作（加载页面、等待渲染、重试间隔）在reactor线程池中执行，
+            # 期间下载器、管道和统计照常工作
+            return await maybe_deferred_to_future(threads.deferToThread(self.render_in_use, request, spider))
+        return None
+
+    def render_in_use(self, request, spider):
+        """渲染期间标记共享浏览器正在使用，关闭爬虫时等待渲染结束"""
+        with self.browser.in_use():
+            return self.render(request, spider)
+        return None
+
+    def render(self, request, spider):
+        """在共享浏览器中加载搜索页并提交查询（在线程池中执行）
+        
+        Returns:
+            渲染后的搜索结果页响应，多次重试仍失败时返回None（由下载器直接下载）
+        """
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+        max_retries = spider.settings.getint('RETRY_TIMES', 3)  # 增加重试次数
+        retry_count = 0
+        host = urlparse_cached(request).hostname
+        
+        while retry_count < max_retries:
+            try:
+                spider.logger.info(f'正在尝试加载页面，第 {retry_count + 1} 次尝试')
+                
+                # 清除所有 cookies
+                self.driver.delete_all_cookies()
+                
+                # 设置页面加载策略
+                self.driver.set_page_load_timeout(spider.settings.getint('SELENIUM_PAGE_LOAD_TIMEOUT'))  # 页面加载超时时间
+                self.driver.set_script_timeout(spider.settings.getint('SELENIUM_SCRIPT_TIMEOUT'))       # 脚本执行超时时间
+                
+                self.rate.wait(host)
+                started = time.perf_counter()
+                with self.metrics.time('middleware_get'):
                     self.driver.get(request.url)
-                    
-                    # 等待页面加载完成的多重检查
+                self.rate.observe(host, time.perf_counter() - started)
+                
+                # 等待页面加载完成的多重检查
+                with self.metrics.time('middleware_render'):
+                    # 'eager'/'none' 加载策略下DOM解析完成即可，不等待图片、样式表等子资源
                     WebDriverWait(self.driver, spider.settings.getint('SELENIUM_PAGE_LOAD_TIMEOUT')).until(
-                        lambda driver: driver.execute_script('return document.readyState') == 'complete'
+                        lambda driver: driver.execute_script('return document.readyState') in self.browser.ready_states
                     )
                     spider.logger.info('页面基础加载完成，等待内容渲染')
                     
@@ -79,74 +129,129 @@ class SeleniumMiddleware:
                         lambda driver: len(driver.find_elements(By.TAG_NAME, 'body')[0].text.strip()) > 100  # 确保页面有足够的内容
                     )
                     spider.logger.info('页面内容已渲染')
+                report_page_transfer(self.driver, self.metrics, spider.logger)
+                
+                # 检查页面URL是否正确
+                current_url = self.driver.current_url
+                if 'data:,' in current_url or current_url == 'about:blank':
+                    raise Exception(f'页面加载失败，URL不正确: {current_url}')
+                spider.logger.info('URL验证通过')
                     
-                    # 检查页面URL是否正确
-                    current_url = self.driver.current_url
-                    if 'data:,' in current_url or current_url == 'about:blank':
-                        raise Exception(f'页面加载失败，URL不正确: {current_url}')
-                    spider.logger.info('URL验证通过')
-                        
-                    # 检查页面标题
-                    WebDriverWait(self.driver, spider.settings.getint('SELENIUM_ELEMENT_TIMEOUT')).until(
-                        lambda driver: bool(driver.title.strip())
-                    )
-                    spider.logger.info('页面标题加载完成')
-                    
-                    # 尝试多种定位方式
-                    selectors = [
-                        (By.CSS_SELECTOR, '[onclick="SearchData(1);"]'),
-                        (By.XPATH, "//button[@onclick='SearchData(1);']"),
-                        (By.CSS_SELECTOR, '.search-btn'),
-                        (By.XPATH, "//button[contains(@class, 'search-btn')]"),
-                    ]
-                    
-                    search_button = None
-                    for by, selector in selectors:
-                        try:
-                            spider.logger.info(f'尝试使用选择器: {selector}')
-                            search_button = WebDriverWait(self.driver, spider.settings.getint('SELENIUM_ELEMENT_TIMEOUT')).until(
-                                EC.element_to_be_clickable((by, selector))
-                            )
-                            if search_button:
-                                break
-                        except Exception as e:
-                            spider.logger.debug(f'使用选择器 {selector} 未找到元素: {str(e)}')
-                            continue
-                    
-                    if not search_button:
-                        raise Exception('无法找到查询按钮')
-                    
-                    # 确保元素可见且可点击
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", search_button)
-                    time.sleep(1)
-                    search_button.click()
-                    
-                    # 等待搜索结果加载（单位：秒）
-                    time.sleep(spider.settings.getint('SELENIUM_SEARCH_RESULT_WAIT'))
-                    
-                    # 获取页面内容
-                    body = self.driver.page_source
-                    spider.logger.info('页面内容获取成功')
-                    return scrapy.http.HtmlResponse(
-                        url=request.url,
-                        body=body.encode('utf-8'),
-                        encoding='utf-8',
-                        request=request
-                    )
-                    
-                except Exception as e:
-                    retry_count += 1
-                    spider.logger.error(f'第 {retry_count} 次尝试失败: {str(e)}')
-                    if retry_count >= max_retries:
-                        spider.logger.error('达到最大重试次数，放弃处理')
-                        return None
-                    time.sleep(spider.settings.getint('SELENIUM_RETRY_INTERVAL'))  # 重试前等待（单位：秒）
+                # 检查页面标题
+                WebDriverWait(self.driver, spider.settings.getint('SELENIUM_ELEMENT_TIMEOUT')).until(
+                    lambda driver: bool(driver.title.strip())
+                )
+                spider.logger.info('页面标题加载完成')
+                
+                # 尝试多种定位方式
+                selectors = [
+                    (By.CSS_SELECTOR, '[onclick="SearchData(1);"]'),
+                    (By.XPATH, "//button[@onclick='SearchData(1);']"),
+                    (By.CSS_SELECTOR, '.search-btn'),
+                    (By.XPATH, "//button[contains(@class, 'search-btn')]"),
+                ]
+                
+                search_button = None
+                for by, selector in selectors:
+                    try:
+                        spider.logger.info(f'尝试使用选择器: {selector}')
+                        search_button = WebDriverWait(self.driver, spider.settings.getint('SELENIUM_ELEMENT_TIMEOUT')).until(
+                            EC.element_to_be_clickable((by, selector))
+                        )
+                        if search_button:
+                            break
+                    except Exception as e:
+                        spider.logger.debug(f'使用选择器 {selector} 未找到元素: {str(e)}')
+                        continue
+                
+                if not search_button:
+                    raise Exception('无法找到查询按钮')
+                
+                # 填写搜索条件，使渲染后的搜索结果可以直接交给爬虫复用
+                query = SearchQuery.from_settings(spider.settings)
+                for field, value in query.form_fields(spider.settings).items():
+                    search_input = self.driver.find_element(By.CSS_SELECTOR, f'[id="{field}"], [name="{field}"]')
+                    search_input.clear()
+                    search_input.send_keys(value)
+                
+                # 确保元素可见且可点击（element_to_be_clickable 已确认可点击，无需固定等待）
+                self.driver.execute_script("arguments[0].scrollIntoView(true);", search_button)
+                list_version = install_list_observer(self.driver)
+                search_button.click()
+                
+                # 等待搜索结果加载：列表一旦变化立即继续，最长等待 SELENIUM_SEARCH_RESULT_WAIT 秒
+                with self.metrics.time('middleware_search'):
+                    search_done = self.wait_for_search_results(list_version, spider)
+                
+                # 获取页面内容
+                body = self.driver.page_source
+                spider.logger.info('页面内容获取成功')
+                if search_done:
+                    # 标记浏览器中已完成搜索，爬虫可直接在当前页面上继续翻页
+                    request.meta['selenium_search_done'] = True
+                else:
+                    # 未等到搜索结果时不标记，由爬虫重新加载页面并提交查询
+                    spider.logger.info('未检测到搜索结果，由爬虫重新搜索')
+                return HtmlResponse(
+                    url=request.url,
+                    body=body.encode('utf-8'),
+                    encoding='utf-8',
+                    request=request
+                )
+                
+            except Exception as e:
+                retry_count += 1
+                spider.logger.error(f'第 {retry_count} 次尝试失败: {str(e)}')
+                self.metrics.retry('middleware_load')
+                if retry_count >= max_retries:
+                    spider.logger.error('达到最大重试次数，放弃处理')
+                    return None
+                # 重试前按自适应速率控制退避（未启用时固定等待 SELENIUM_RETRY_INTERVAL 秒）
+                self.rate.backoff(host)
+
+    def wait_for_search_results(self, list_version, spider) -> bool:
+        """点击查询按钮后等待搜索结果出现
+        
+        Args:
+            list_version: 点击前安装的列表观察器版本号，页面中没有列表容器时为None
+            spider: 当前爬虫
+        
+        Returns:
+            是否在等待时间内检测到搜索结果
+        """
+        timeout = spider.settings.getint('SELENIUM_SEARCH_RESULT_WAIT')
+        if list_version is not None and spider.settings.get('SELENIUM_PAGE_CHANGE_DETECTION', 'observer') == 'observer':
+            self.driver.set_script_timeout(timeout)
+            try:
+                if wait_for_list_change(
+                    self.driver, list_version, spider.settings.getint('SELENIUM_MUTATION_SETTLE_MS', 100)
+                ) is not None:
+                    spider.logger.info('搜索结果已加载')
+                    return True
+            except TimeoutException:
+                spider.logger.warning('等待搜索结果超时')
+                return False
+            finally:
+                self.driver.set_script_timeout(spider.settings.getint('SELENIUM_SCRIPT_TIMEOUT'))
+        
+        # 观察器不可用时，等待文章列表出现
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, '#EtTableArticleList .search_ext_article_list'))
+            )
+            spider.logger.info('搜索结果已加载')
+            return True
+        except TimeoutException:
+            spider.logger.warning('等待搜索结果超时')
+            return False
 
     @classmethod
     def from_crawler(cls, crawler):
-        middleware = cls()
-        crawler.signals.connect(middleware.spider_closed, signals.spider_closed)
-        return middleware
-
-    def spider_closed(self):
-        self.driver.quit()
\ No newline at end of file
+        # 浏览器的关闭由BrowserManager在spider_closed信号中处理
+        return cls(
+            BrowserManager.from_crawler(crawler),
+            StageMetrics.from_crawler(crawler),
+            AdaptiveRateController.from_crawler(crawler)
+        )
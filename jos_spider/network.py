@@ -0,0 +1,94 @@
+import base64
+import json
+import re
+import threading
+import time
+from typing import Optional, List, Dict
+from selenium.common.exceptions import WebDriverException
+
+# 视为搜索结果接口的请求类型
+CAPTURED_RESOURCE_TYPES = ('XHR', 'Fetch')
+
+
+class NetworkCapture:
+    """从浏览器的性能日志（CDP Network事件）中捕获搜索结果接口的响应
+
+    浏览器需要以 goog:loggingPrefs={'performance': 'ALL'} 启动（见 build_chrome_options）。
+    SearchData/SubmitArticleSearch 发出的XHR/fetch请求完成后，直接通过 Network.getResponseBody
+    读取响应内容，无需等待页面渲染文章列表。
+    """
+
+    def __init__(self, driver, url_pattern: str = ''):
+        self.driver = driver
+        # 为空时匹配所有XHR/fetch请求，由响应内容判断是否为搜索结果
+        self.url_pattern = re.compile(url_pattern) if url_pattern else None
+        # requestId -> 响应信息，收到 loadingFinished 后移入 finished
+        self.pending: Dict[str, Dict] = {}
+        self.finished: List[Dict] = []
+        self.lock = threading.Lock()
+
+    def matches(self, response: Dict) -> bool:
+        return self.url_pattern is None or bool(self.url_pattern.search(response.get('url', '')))
+
+    def drain(self):
+        """读取新的性能日志，记录已完成的搜索结果请求"""
+        for entry in self.driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                if params.get('type') in CAPTURED_RESOURCE_TYPES and self.matches(params.get('response', {})):
+                    self.pending[params['requestId']] = {
+                        'request_id': params['requestId'],
+                        'url': params['response'].get('url'),
+                        'status': params['response'].get('status'),
+                    }
+            elif method == 'Network.loadingFinished':
+                response = self.pending.pop(params.get('requestId'), None)
+                if response is not None:
+                    self.finished.append(response)
+            elif method == 'Network.loadingFailed':
+                self.pending.pop(params.get('requestId'), None)
+
+    def read_body(self, response: Dict) -> Optional[str]:
+        """通过CDP读取响应内容，浏览器已释放响应时返回None"""
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': response['request_id']})
+        except WebDriverException:
+            return None
+        body = result.get('body', '')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        return body
+
+    def take_responses(self) -> List[Dict]:
+        """取出已完成的请求（按完成顺序），并读取响应内容"""
+        with self.lock:
+            self.drain()
+            finished, self.finished = self.finished, []
+        for response in finished:
+            response['body'] = self.read_body(response)
+        return [response for response in finished if response['body']]
+
+    def wait_for_responses(self, timeout: float, poll_interval: float = 0.05) -> List[Dict]:
+        """等待至少一个搜索结果请求完成
+
+        Args:
+            timeout: 最长等待时间（秒）
+            poll_interval: 读取性能日志的间隔（秒）
+
+        Returns:
+            已完成请求的列表，超时时为空列表
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            responses = self.take_responses()
+            if responses or time.monotonic() >= deadline:
+                return responses
+            time.sleep(poll_interval)
+
+    def clear(self):
+        """丢弃尚未处理的请求记录（如翻页前遗留的响应）"""
+        with self.lock:
+            self.drain()
+            self.finished = []
@@ -1,44 +1,447 @@
 import json
-import pandas as pd
+import os
+import sqlite3
 from itemadapter import ItemAdapter
+from scrapy.exceptions import NotConfigured, DropItem
+from jos_spider.coordination import Coordinator
+from jos_spider.dedup import FingerprintStore, MemoryFingerprintStore, article_fingerprint
+from jos_spider.index import ArticleIndex
+from jos_spider.metrics import StageMetrics
 
-class JosSpiderPipeline:
-    def __init__(self):
-        self.articles = []
+# Excel中的列顺序
+EXCEL_COLUMNS = ['title', 'authors', 'publish_time', 'keywords', 'abstract', 'url', 'doi', 'pdf_url',
+                 'affiliations', 'journal', 'publication_date', 'volume', 'issue', 'pages', 'query']
+
+# 详情页补充的文本字段
+DETAIL_TEXT_FIELDS = ['url', 'doi', 'pdf_url', 'journal', 'publication_date', 'volume', 'issue', 'pages']
+
+
+def append_output(settings) -> bool:
+    """是否追加到已有的输出文件（断点续爬或增量抓取）"""
+    return settings.getbool('RESUME') or settings.getbool('INCREMENTAL')
+
+
+def clean_article(item) -> dict:
+    """清理文章数据并移除空值字段"""
+    adapter = ItemAdapter(item)
+
+    # 清理数据
+    article = {
+        'title': adapter.get('title', '').strip(),
+        'authors': [author.strip() for author in adapter.get('authors', [])],
+        'publish_time': adapter.get('publish_time', '').strip(),
+        'keywords': [keyword.strip() for keyword in adapter.get('keywords', [])],
+        'abstract': adapter.get('abstract', '').strip(),
+    }
+    # 详情页补充的字段
+    for field in DETAIL_TEXT_FIELDS:
+        article[field] = str(adapter.get(field) or '').strip()
+    article['affiliations'] = [affiliation.strip() for affiliation in adapter.get('affiliations') or []]
+    # 批量检索时找到该文章的检索条件
+    article['query'] = adapter.get('query', '')
+
+    # 移除空值
+    return {k: v for k, v in article.items() if v}
+
+
+class DedupPipeline:
+    """去重管道：丢弃指纹库中已经存在的文章
+
+    启用跨运行去重时使用持久化的指纹库；否则在批量检索（SEARCH_QUERIES_FILE）时只在本次运行内去重，
+    多个检索条件命中的同一篇文章只保留第一次出现的检索条件。
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if crawler.settings.getbool('DEDUP_ENABLED') or crawler.settings.getbool('INCREMENTAL'):
+            return cls(FingerprintStore.from_crawler(crawler))
+        if crawler.settings.get('SEARCH_QUERIES_FILE'):
+            return cls(MemoryFingerprintStore())
+        raise NotConfigured('未启用去重')
+
+    def process_item(self, item, spider):
+        if not self.store.add(article_fingerprint(ItemAdapter(item))):
+            raise DropItem(f'文章已存在: {ItemAdapter(item).get("title", "")}')
+        return item
+
+
+class CoordinatorPipeline:
+    """协同抓取时把文章汇总到任务队列，丢弃其他进程已经输出过的文章"""
+
+    def __init__(self, coordinator: Coordinator):
+        self.coordinator = coordinator
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.get('COORDINATOR_PATH'):
+            raise NotConfigured('未启用协同抓取')
+        return cls(Coordinator.from_crawler(crawler))
 
     def process_item(self, item, spider):
         adapter = ItemAdapter(item)
-        
-        # 清理数据
-        article = {
-            'title': adapter.get('title', '').strip(),
-            'authors': [author.strip() for author in adapter.get('authors', [])],
-            'publish_time': adapter.get('publish_time', '').strip(),
-            'keywords': [keyword.strip() for keyword in adapter.get('keywords', [])],
-            'abstract': adapter.get('abstract', '').strip()
-        }
-        
-        # 移除空值
-        article = {k: v for k, v in article.items() if v}
-        
-        self.articles.append(article)
+        article = clean_article(item)
+        if not self.coordinator.queue.add_article(article_fingerprint(adapter), article.get('query'),
+                                                  self.coordinator.worker, article):
+            self.coordinator.inc_value('articles_duplicate')
+            raise DropItem(f'文章已由其他进程输出: {adapter.get("title", "")}')
+        return item
+
+
+class JosSpiderPipeline:
+    """流式输出管道
+
+    每条数据到达时立即追加到JSONL和TXT文件，并按批次刷新到磁盘；Excel使用openpyxl的
+    只写模式逐行写入（OUTPUT_EXCEL 为False时不输出Excel，也不导入openpyxl）。
+    内存占用不随文章数量增长，进程中途退出时已刷新的数据不会丢失。
+    """
+
+    def __init__(self, output_name: str = 'jos_articles', flush_batch: int = 50, resume: bool = False,
+                 metrics: StageMetrics = None, excel: bool = True):
+        self.output_name = output_name
+        self.flush_batch = flush_batch
+        self.excel = excel
+        # 断点续爬时追加到已有的输出文件
+        self.resume = resume
+        self.pending = 0
+        self.json_file = None
+        self.txt_file = None
+        self.workbook = None
+        self.worksheet = None
+        self.metrics = metrics or StageMetrics()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            output_name=crawler.settings.get('OUTPUT_NAME', 'jos_articles'),
+            flush_batch=crawler.settings.getint('OUTPUT_FLUSH_BATCH', 50),
+            resume=append_output(crawler.settings),
+            metrics=StageMetrics.from_crawler(crawler),
+            excel=crawler.settings.getbool('OUTPUT_EXCEL', True)
+        )
+
+    def open_spider(self, spider):
+        if self.excel:
+            # openpyxl只在输出Excel时导入；只写模式下每行写入后即转存到临时文件，不在内存中保留整张表
+            from openpyxl import Workbook
+            self.workbook = Workbook(write_only=True)
+            self.worksheet = self.workbook.create_sheet()
+            self.worksheet.append(EXCEL_COLUMNS)
+
+        json_path = f'{self.output_name}.jsonl'
+        if self.excel and self.resume and os.path.exists(json_path):
+            # Excel无法追加写入，断点续爬时先逐行写入已有的数据
+            with open(json_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self.append_excel_row(json.loads(line))
+
+        mode = 'a' if self.resume else 'w'
+        self.json_file = open(json_path, mode, encoding='utf-8')
+        self.txt_file = open(f'{self.output_name}.txt', mode, encoding='utf-8')
+
+    def append_excel_row(self, article: dict):
+        if self.worksheet is None:
+            return
+        # 列表字段与原DataFrame导出的格式一致
+        self.worksheet.append([
+            str(article[column]) if column in article else None for column in EXCEL_COLUMNS
+        ])
+
+    def process_item(self, item, spider):
+        with self.metrics.time('pipeline_item'):
+            article = clean_article(item)
+
+            # 保存JSONL格式（每行一篇文章）
+            self.json_file.write(json.dumps(article, ensure_ascii=False) + '\n')
+
+            # 保存TXT格式
+            self.txt_file.write(self.format_text(article))
+
+            # 保存Excel格式
+            self.append_excel_row(article)
+
+            self.pending += 1
+            if self.pending >= self.flush_batch:
+                self.flush()
+        return item
+
+    @staticmethod
+    def format_text(article: dict) -> str:
+        return (
+            '标题: ' + article.get('title', '') + '\n'
+            + '作者: ' + ', '.join(article.get('authors', [])) + '\n'
+            + '发布时间: ' + article.get('publish_time', '') + '\n'
+            + '关键词: ' + ', '.join(article.get('keywords', [])) + '\n'
+            + '摘要: ' + article.get('abstract', '') + '\n'
+            + ('DOI: ' + article['doi'] + '\n' if article.get('doi') else '')
+            + ('作者单位: ' + '; '.join(article['affiliations']) + '\n' if article.get('affiliations') else '')
+            + ('链接: ' + article['url'] + '\n' if article.get('url') else '')
+            + ('PDF: ' + article['pdf_url'] + '\n' if article.get('pdf_url') else '')
+            + ('检索条件: ' + article['query'] + '\n' if article.get('query') else '')
+            + '\n' + '-'*50 + '\n\n'
+        )
+
+    def flush(self):
+        self.json_file.flush()
+        self.txt_file.flush()
+        self.pending = 0
+
+    def close_spider(self, spider):
+        with self.metrics.time('pipeline_close'):
+            self.flush()
+            self.json_file.close()
+            self.txt_file.close()
+            if self.workbook is not None:
+                self.workbook.save(f'{self.output_name}.xlsx')
+
+
+class ParquetExportPipeline:
+    """Parquet导出管道（需要安装pyarrow）
+
+    authors/keywords 保存为列表列，按行组分批写入并压缩。
+    """
+
+    def __init__(self, path: str, compression: str = 'zstd', row_group_size: int = 1000, resume: bool = False):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise NotConfigured('Parquet导出需要安装可选依赖pyarrow（pip install pyarrow）')
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.schema = pa.schema([
+            ('title', pa.string()),
+            ('authors', pa.list_(pa.string())),
+            ('publish_time', pa.string()),
+            ('keywords', pa.list_(pa.string())),
+            ('abstract', pa.string()),
+            ('url', pa.string()),
+            ('doi', pa.string()),
+            ('pdf_url', pa.string()),
+            ('affiliations', pa.list_(pa.string())),
+            ('journal', pa.string()),
+            ('publication_date', pa.string()),
+            ('volume', pa.string()),
+            ('issue', pa.string()),
+            ('pages', pa.string()),
+            ('query', pa.string()),
+        ])
+        self.resume = resume
+        self.rows = []
+        self.writer = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            path=crawler.settings.get('PARQUET_EXPORT_PATH', 'jos_articles.parquet'),
+            compression=crawler.settings.get('PARQUET_COMPRESSION', 'zstd'),
+            row_group_size=crawler.settings.getint('PARQUET_ROW_GROUP_SIZE', 1000),
+            resume=append_output(crawler.settings)
+        )
+
+    @property
+    def tmp_path(self) -> str:
+        return self.path + '.tmp'
+
+    def open_spider(self, spider):
+        # 写入临时文件，结束时再替换目标文件
+        self.writer = self.pq.ParquetWriter(self.tmp_path, self.schema, compression=self.compression)
+        if self.resume and os.path.exists(self.path):
+            # Parquet无法追加写入，断点续爬时按批复制已有的数据
+            for batch in self.pq.ParquetFile(self.path).iter_batches(batch_size=self.row_group_size):
+                table = self.pa.Table.from_batches([batch])
+                for field in self.schema:
+                    if field.name not in table.column_names:
+                        # 旧版本输出的文件没有详情页字段和检索条件列
+                        table = table.append_column(field, self.pa.nulls(table.num_rows, field.type))
+                self.writer.write_table(table.select(self.schema.names).cast(self.schema))
+
+    def process_item(self, item, spider):
+        article = clean_article(item)
+        self.rows.append({
+            'title': article.get('title'),
+            'authors': article.get('authors', []),
+            'publish_time': article.get('publish_time'),
+            'keywords': article.get('keywords', []),
+            'abstract': article.get('abstract'),
+            **{field: article.get(field) for field in DETAIL_TEXT_FIELDS},
+            'affiliations': article.get('affiliations', []),
+            'query': article.get('query'),
+        })
+        if len(self.rows) >= self.row_group_size:
+            self.write_rows()
+        return item
+
+    def write_rows(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close_spider(self, spider):
+        self.write_rows()
+        self.writer.close()
+        os.replace(self.tmp_path, self.path)
+
+
+class SQLiteExportPipeline:
+    """SQLite导出管道
+
+    文章、作者、关键词分表存储，作者和关键词通过关联表与文章关联，并建立索引，
+    便于按作者、关键词查询文章。
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY,
+            title TEXT,
+            publish_time TEXT,
+            abstract TEXT,
+            url TEXT,
+            doi TEXT,
+            pdf_url TEXT,
+            journal TEXT,
+            publication_date TEXT,
+            volume TEXT,
+            issue TEXT,
+            pages TEXT,
+            query TEXT
+        );
+        CREATE TABLE IF NOT EXISTS authors (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS keywords (
+            id INTEGER PRIMARY KEY,
+            word TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS article_authors (
+            article_id INTEGER NOT NULL REFERENCES articles(id),
+            author_id INTEGER NOT NULL REFERENCES authors(id),
+            position INTEGER NOT NULL,
+            PRIMARY KEY (article_id, position)
+        );
+        CREATE TABLE IF NOT EXISTS affiliations (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS article_affiliations (
+            article_id INTEGER NOT NULL REFERENCES articles(id),
+            affiliation_id INTEGER NOT NULL REFERENCES affiliations(id),
+            position INTEGER NOT NULL,
+            PRIMARY KEY (article_id, position)
+        );
+        CREATE TABLE IF NOT EXISTS article_keywords (
+            article_id INTEGER NOT NULL REFERENCES articles(id),
+            keyword_id INTEGER NOT NULL REFERENCES keywords(id),
+            position INTEGER NOT NULL,
+            PRIMARY KEY (article_id, position)
+        );
+        CREATE INDEX IF NOT EXISTS idx_articles_title ON articles(title);
+        CREATE INDEX IF NOT EXISTS idx_articles_publish_time ON articles(publish_time);
+        CREATE INDEX IF NOT EXISTS idx_article_authors_author ON article_authors(author_id);
+        CREATE INDEX IF NOT EXISTS idx_article_keywords_keyword ON article_keywords(keyword_id);
+        CREATE INDEX IF NOT EXISTS idx_article_affiliations_affiliation ON article_affiliations(affiliation_id);
+    '''
+
+    # articles表中的文本列（不含id），旧版本生成的数据库缺少的列在打开时补充
+    ARTICLE_COLUMNS = ['title', 'publish_time', 'abstract', *DETAIL_TEXT_FIELDS, 'query']
+
+    def __init__(self, path: str, commit_batch: int = 50, resume: bool = False):
+        self.path = path
+        self.commit_batch = commit_batch
+        self.resume = resume
+        self.pending = 0
+        self.conn = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            path=crawler.settings.get('SQLITE_EXPORT_PATH', 'jos_articles.sqlite'),
+            commit_batch=crawler.settings.getint('OUTPUT_FLUSH_BATCH', 50),
+            resume=append_output(crawler.settings)
+        )
+
+    def open_spider(self, spider):
+        # 非断点续爬时重新生成数据库，断点续爬时继续追加
+        if not self.resume and os.path.exists(self.path):
+            os.remove(self.path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(self.SCHEMA)
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(articles)')]
+        for column in self.ARTICLE_COLUMNS:
+            if column not in columns:
+                self.conn.execute(f'ALTER TABLE articles ADD COLUMN {column} TEXT')
+
+    def lookup_id(self, table: str, column: str, value: str) -> int:
+        self.conn.execute(f'INSERT OR IGNORE INTO {table} ({column}) VALUES (?)', (value,))
+        return self.conn.execute(f'SELECT id FROM {table} WHERE {column} = ?', (value,)).fetchone()[0]
+
+    def process_item(self, item, spider):
+        article = clean_article(item)
+        cursor = self.conn.execute(
+            f'INSERT INTO articles ({", ".join(self.ARTICLE_COLUMNS)}) '
+            f'VALUES ({", ".join("?" * len(self.ARTICLE_COLUMNS))})',
+            [article.get(column) for column in self.ARTICLE_COLUMNS]
+        )
+        article_id = cursor.lastrowid
+        self.conn.executemany(
+            'INSERT INTO article_authors (article_id, author_id, position) VALUES (?, ?, ?)',
+            [(article_id, self.lookup_id('authors', 'name', name), position)
+             for position, name in enumerate(article.get('authors', []))]
+        )
+        self.conn.executemany(
+            'INSERT INTO article_keywords (article_id, keyword_id, position) VALUES (?, ?, ?)',
+            [(article_id, self.lookup_id('keywords', 'word', word), position)
+             for position, word in enumerate(article.get('keywords', []))]
+        )
+        self.conn.executemany(
+            'INSERT INTO article_affiliations (article_id, affiliation_id, position) VALUES (?, ?, ?)',
+            [(article_id, self.lookup_id('affiliations', 'name', name), position)
+             for position, name in enumerate(article.get('affiliations', []))]
+        )
+
+        self.pending += 1
+        if self.pending >= self.commit_batch:
+            self.conn.commit()
+            self.pending = 0
+        return item
+
+    def close_spider(self, spider):
+        self.conn.commit()
+        self.conn.close()
+
+
+class IndexPipeline:
+    """索引管道（最后一个阶段）
+
+    把每篇文章写入本地索引（INDEX_PATH），索引跨运行保留并随新文章增量更新，
+    抓取过程中即可用 scrapy search 查询。
+    """
+
+    def __init__(self, path: str, commit_batch: int = 50):
+        self.path = path
+        self.commit_batch = commit_batch
+        self.index = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get('INDEX_PATH')
+        if not path:
+            raise NotConfigured('未设置 INDEX_PATH')
+        return cls(path, commit_batch=crawler.settings.getint('OUTPUT_FLUSH_BATCH', 50))
+
+    def open_spider(self, spider):
+        self.index = ArticleIndex(self.path, commit_batch=self.commit_batch)
+
+    def process_item(self, item, spider):
+        self.index.add(clean_article(item))
         return item
 
     def close_spider(self, spider):
-        # 保存JSON格式
-        with open('jos_articles.json', 'w', encoding='utf-8') as f:
-            json.dump(self.articles, f, ensure_ascii=False, indent=2)
-        
-        # 保存Excel格式
-        df = pd.DataFrame(self.articles)
-        df.to_excel('jos_articles.xlsx', index=False, engine='openpyxl')
-        
-        # 保存TXT格式
-        with open('jos_articles.txt', 'w', encoding='utf-8') as f:
-            for article in self.articles:
-                f.write('标题: ' + article.get('title', '') + '\n')
-                f.write('作者: ' + ', '.join(article.get('authors', [])) + '\n')
-                f.write('发布时间: ' + article.get('publish_time', '') + '\n')
-                f.write('关键词: ' + ', '.join(article.get('keywords', [])) + '\n')
-                f.write('摘要: ' + article.get('abstract', '') + '\n')
-                f.write('\n' + '-'*50 + '\n\n')
\ No newline at end of file
+        self.index.close()
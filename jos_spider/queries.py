@@ -0,0 +1,156 @@
+import json
+import threading
+from typing import Optional, List, Dict, NamedTuple, Tuple
+
+
+class SearchQuery(NamedTuple):
+    """一个搜索条件"""
+    key1: str = ''
+    key2: str = ''
+    # 发表年份范围（包含两端），为None时不限制
+    start_year: Optional[int] = None
+    end_year: Optional[int] = None
+    # 输出数据中标记的检索条件名称，为None时由搜索条件生成
+    name: Optional[str] = None
+    # 按年份分区时所属的原检索条件，输出数据标记为原检索条件
+    partition_of: Optional[str] = None
+
+    @classmethod
+    def from_settings(cls, settings) -> 'SearchQuery':
+        """根据 SEARCH_KEY1/SEARCH_KEY2/SEARCH_START_YEAR/SEARCH_END_YEAR 设置生成搜索条件"""
+        return cls(
+            key1=settings.get('SEARCH_KEY1', '') or '',
+            key2=settings.get('SEARCH_KEY2', '') or '',
+            start_year=settings.getint('SEARCH_START_YEAR') or None,
+            end_year=settings.getint('SEARCH_END_YEAR') or None,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SearchQuery':
+        return cls(
+            key1=str(data.get('key1', '') or ''),
+            key2=str(data.get('key2', '') or ''),
+            start_year=int(data['start_year']) if data.get('start_year') else None,
+            end_year=int(data['end_year']) if data.get('end_year') else None,
+            name=data.get('name') or None,
+        )
+
+    def as_dict(self) -> Dict:
+        """检查点中使用的搜索条件（未设置年份范围时与只有关键词的旧检查点一致）"""
+        query = {'key1': self.key1, 'key2': self.key2}
+        if self.start_year:
+            query['start_year'] = self.start_year
+        if self.end_year:
+            query['end_year'] = self.end_year
+        return query
+
+    @property
+    def label(self) -> str:
+        """输出数据中标记的检索条件"""
+        if self.name:
+            return self.name
+        label = ' + '.join(key for key in (self.key1, self.key2) if key)
+        if self.start_year or self.end_year:
+            label += f' ({self.start_year or ""}-{self.end_year or ""})'
+        return label.strip()
+
+    @property
+    def output_label(self) -> str:
+        """输出数据中标记的检索条件（分区的结果合并到原检索条件下）"""
+        return self.partition_of or self.label
+
+    def split_years(self, first_year: int, last_year: int) -> Optional[Tuple['SearchQuery', 'SearchQuery']]:
+        """把发表年份范围平分为两个不相交的分区
+
+        Args:
+            first_year: 未设置起始年份时使用的起始年份
+            last_year: 未设置截止年份时使用的截止年份
+
+        Returns:
+            (前半段, 后半段)，年份范围只有一年时返回None
+        """
+        start = self.start_year or first_year
+        end = self.end_year or last_year
+        if start >= end:
+            return None
+        middle = (start + end) // 2
+        partition_of = self.output_label
+        return (
+            self._replace(start_year=start, end_year=middle, name=None, partition_of=partition_of),
+            self._replace(start_year=middle + 1, end_year=end, name=None, partition_of=partition_of),
+        )
+
+    def form_fields(self, settings) -> Dict[str, str]:
+        """搜索表单中需要填写的字段（字段名 -> 值），未设置的条件不填写
+
+        Args:
+            settings: 爬虫设置，年份字段名由 SEARCH_START_YEAR_FIELD/SEARCH_END_YEAR_FIELD 指定
+        """
+        fields = {}
+        if self.key1:
+            fields['Key1'] = self.key1
+        if self.key2:
+            fields['Key2'] = self.key2
+        if self.start_year:
+            fields[settings.get('SEARCH_START_YEAR_FIELD', 'StartYear')] = str(self.start_year)
+        if self.end_year:
+            fields[settings.get('SEARCH_END_YEAR_FIELD', 'EndYear')] = str(self.end_year)
+        return fields
+
+
+def load_queries(path: str) -> List[SearchQuery]:
+    """读取检索条件文件
+
+    支持JSON数组（.json），或每行一个检索条件：JSON对象（如 {"key1": "软件测试", "start_year": 2015}），
+    或者直接是第一个搜索框的内容。空行和以 # 开头的行被忽略。
+
+    Args:
+        path: 检索条件文件路径
+
+    Returns:
+        去重后的检索条件列表（保持文件中的顺序）
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    if path.endswith('.json'):
+        records = json.loads(content)
+    else:
+        records = []
+        for line in content.splitlines():
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            records.append(json.loads(line) if line.startswith('{') else {'key1': line})
+
+    queries = []
+    for record in records:
+        query = SearchQuery.from_dict(record)
+        if query not in queries:
+            queries.append(query)
+    return queries
+
+
+def queries_from_settings(settings) -> List[SearchQuery]:
+    """本次运行的检索条件：设置了 SEARCH_QUERIES_FILE 时从文件读取，否则使用 SEARCH_KEY1/SEARCH_KEY2"""
+    path = settings.get('SEARCH_QUERIES_FILE')
+    if path:
+        queries = load_queries(path)
+        if not queries:
+            raise ValueError(f'检索条件文件中没有检索条件: {path}')
+        return queries
+    return [SearchQuery.from_settings(settings)]
+
+
+class QueryState:
+    """一个检索条件的抓取状态"""
+
+    def __init__(self, query: SearchQuery):
+        self.query = query
+        # 已访问的页码（浏览器池中的多个浏览器共享，由爬虫加锁访问）
+        self.visited_pages = set()
+        # 总页数
+        self.total_pages: Optional[int] = None
+        # 增量抓取：记录各页是否包含新文章，满足停止条件后通知所有浏览器停止翻页
+        self.page_has_new: Dict[int, bool] = {}
+        self.stop_crawl = threading.Event()
@@ -0,0 +1,285 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.defer import maybe_deferred_to_future
+from scrapy.utils.httpobj import urlparse_cached
+from twisted.internet import task
+from jos_spider.metrics import call_in_reactor
+
+
+class HostBucket:
+    """一个主机的令牌桶和自适应速率状态"""
+
+    def __init__(self, rate: float, concurrency: int, burst: float):
+        # 每秒发放的令牌数（即允许的请求速率）
+        self.rate = rate
+        # 允许的并发请求数
+        self.concurrency = concurrency
+        self.burst = burst
+        # 令牌数可以为负：已预约但尚未发放的令牌
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        # 退避结束时间，在此之前不发放令牌
+        self.blocked_until = 0.0
+        # 连续出错次数，决定退避时长
+        self.errors = 0
+        # 连续的快速正常响应数，达到当前并发数时增加一个并发
+        self.clean = 0
+        # 响应耗时的指数加权平均（秒）
+        self.latency: Optional[float] = None
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class AdaptiveRateController:
+    """按主机自适应调整请求速率和并发数（HTTP下载器和浏览器共用）
+
+    每个主机一个令牌桶：响应快且没有出错时逐步提高速率（加性增加）并增加并发数；
+    响应变慢时降低速率；遇到 RETRY_HTTP_CODES 中的状态码、超时或连接错误时速率和并发数减半，
+    并按指数退避（带随机抖动，遵守Retry-After）暂停该主机的请求。
+
+    min_interval（ADAPTIVE_RATE_MIN_INTERVAL）大于0时作为请求间隔的下限：速率不超过 1/min_interval，且不允许突发请求。
+    未启用时不限制请求速率，出错后固定等待 retry_interval 秒（与原来的重试间隔一致）。
+    同一个crawler中的中间件和爬虫共享同一个实例。
+    """
+
+    def __init__(self, enabled: bool = True, start_rate: float = 1.0, min_rate: float = 0.1, max_rate: float = 8.0,
+                 rate_step: float = 0.1, start_concurrency: int = 2, max_concurrency: int = 8,
+                 target_latency: float = 1.0, backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 retry_interval: float = 2.0, burst: float = 2.0, min_interval: float = 0.0, stats=None):
+        if min_interval > 0:
+            max_rate = min(max_rate, 1 / min_interval)
+            burst = 1.0
+        self.enabled = enabled
+        self.max_rate = max_rate
+        self.start_rate = min(start_rate, max_rate)
+        self.min_rate = min(min_rate, max_rate)
+        self.rate_step = rate_step
+        self.start_concurrency = start_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_interval = retry_interval
+        self.burst = burst
+        self.stats = stats
+        self.buckets: Dict[str, HostBucket] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings) -> 'AdaptiveRateController':
+        return cls(
+            enabled=settings.getbool('ADAPTIVE_RATE_ENABLED', True),
+            start_rate=settings.getfloat('ADAPTIVE_RATE_START', 1.0),
+            min_rate=settings.getfloat('ADAPTIVE_RATE_MIN', 0.1),
+            max_rate=settings.getfloat('ADAPTIVE_RATE_MAX', 8.0),
+            rate_step=settings.getfloat('ADAPTIVE_RATE_STEP', 0.1),
+            start_concurrency=settings.getint('ADAPTIVE_CONCURRENCY_START', 2),
+            max_concurrency=settings.getint('CONCURRENT_REQUESTS_PER_DOMAIN', 8),
+            target_latency=settings.getfloat('ADAPTIVE_TARGET_LATENCY', 1.0),
+            backoff_base=settings.getfloat('ADAPTIVE_BACKOFF_BASE', 1.0),
+            backoff_max=settings.getfloat('ADAPTIVE_BACKOFF_MAX', 60.0),
+            retry_interval=settings.getfloat('SELENIUM_RETRY_INTERVAL', 2),
+            min_interval=settings.getfloat('ADAPTIVE_RATE_MIN_INTERVAL', 0.25),
+        )
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        controller = getattr(crawler, 'rate_controller', None)
+        if controller is None:
+            controller = cls.from_settings(crawler.settings)
+            crawler.rate_controller = controller
+            # 爬虫创建时统计收集器尚未就绪，抓取开始后再关联
+            crawler.signals.connect(controller.spider_opened, signal=signals.spider_opened)
+        return controller
+
+    def spider_opened(self, spider):
+        self.stats = spider.crawler.stats
+
+    def bucket(self, host: str) -> HostBucket:
+        """获取主机的令牌桶（调用方需持有锁）"""
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = HostBucket(self.start_rate, self.start_concurrency, self.burst)
+            self.buckets[host] = bucket
+        return bucket
+
+    def concurrency(self, host: str) -> int:
+        """主机当前允许的并发请求数"""
+        with self.lock:
+            return self.bucket(host).concurrency if self.enabled else self.max_concurrency
+
+    def reserve(self, host: str) -> float:
+        """预约一个令牌
+
+        Args:
+            host: 主机名
+
+        Returns:
+            发出请求前需要等待的秒数
+        """
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.bucket(host)
+            blocked = max(0.0, bucket.blocked_until - now)
+            if not self.enabled:
+                return blocked
+            bucket.refill(now)
+            bucket.tokens -= 1
+            # 令牌不足时按当前速率计算发放时间
+            wait = -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0.0
+            return max(blocked, wait)
+
+    def wait(self, host: str):
+        """等待获取令牌后返回（阻塞当前线程，供浏览器线程使用）"""
+        delay = self.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+
+    def observe(self, host: str, latency: float):
+        """记录一次正常响应的耗时，响应快时提高速率和并发数，响应慢时降低速率"""
+        if not self.enabled:
+            return
+        with self.lock:
+            bucket = self.bucket(host)
+            bucket.errors = 0
+            bucket.latency = latency if bucket.latency is None else 0.7 * bucket.latency + 0.3 * latency
+            if bucket.latency <= self.target_latency:
+                bucket.rate = min(self.max_rate, bucket.rate + self.rate_step)
+                bucket.clean += 1
+                if bucket.clean >= bucket.concurrency:
+                    bucket.concurrency = min(self.max_concurrency, bucket.concurrency + 1)
+                    bucket.clean = 0
+            elif bucket.latency > 2 * self.target_latency:
+                bucket.rate = max(self.min_rate, bucket.rate * 0.9)
+                bucket.concurrency = max(1, bucket.concurrency - 1)
+                bucket.clean = 0
+            self.update_stats(host, bucket)
+
+    def penalize(self, host: str, retry_after: Optional[float] = None) -> float:
+        """记录一次出错（限流状态码、超时等），降低速率和并发数并暂停该主机的请求
+
+        Args:
+            host: 主机名
+            retry_after: 服务器要求的等待秒数（Retry-After）
+
+        Returns:
+            退避的秒数
+        """
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.bucket(host)
+            if self.enabled:
+                bucket.errors += 1
+                bucket.rate = max(self.min_rate, bucket.rate / 2)
+                bucket.concurrency = max(1, bucket.concurrency // 2)
+                bucket.clean = 0
+                # 指数退避，乘以0.5~1.5的随机抖动，避免多个请求同时恢复
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (bucket.errors - 1))
+                delay *= random.uniform(0.5, 1.5)
+            else:
+                delay = self.retry_interval
+            if retry_after:
+                delay = max(delay, min(retry_after, self.backoff_max))
+            bucket.blocked_until = max(bucket.blocked_until, now + delay)
+            if self.stats is not None:
+                call_in_reactor(self.stats.inc_value, 'jos/rate/backoffs')
+            self.update_stats(host, bucket)
+        return delay
+
+    def backoff(self, host: str, retry_after: Optional[float] = None):
+        """记录一次出错并等待退避结束（阻塞当前线程，供浏览器线程的重试使用）"""
+        self.penalize(host, retry_after)
+        self.wait(host)
+
+    def update_stats(self, host: str, bucket: HostBucket):
+        """把主机当前的速率和并发数写入统计（调用方需持有锁，写入在reactor线程中执行）"""
+        if self.stats is not None and self.enabled:
+            call_in_reactor(self.stats.set_value, f'jos/rate/{host}/requests_per_second', round(bucket.rate, 3))
+            call_in_reactor(self.stats.set_value, f'jos/rate/{host}/concurrency', bucket.concurrency)
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """解析Retry-After响应头（秒数或HTTP日期）"""
+    if not value:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode('latin-1')
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateMiddleware:
+    """HTTP请求的自适应速率控制
+
+    发出请求前从主机的令牌桶中获取令牌（不阻塞reactor），根据响应耗时和状态码调整速率，
+    并把下载槽的并发数调整为控制器的当前值（不超过槽原有的并发上限）。请求间隔由令牌桶控制，
+    下载槽的固定延迟（DOWNLOAD_DELAY、DOWNLOAD_SLOTS 中的 delay）置为0：槽有延迟时每次只发出一个请求，提高并发数不起作用。
+    """
+
+    def __init__(self, crawler, controller: AdaptiveRateController):
+        self.crawler = crawler
+        self.controller = controller
+        self.retry_codes = {int(code) for code in crawler.settings.getlist('RETRY_HTTP_CODES')}
+        # 下载槽 -> 原有的并发上限
+        self.slot_caps: Dict[str, int] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('ADAPTIVE_RATE_ENABLED', True):
+            raise NotConfigured('未启用自适应速率控制')
+        return cls(crawler, AdaptiveRateController.from_crawler(crawler))
+
+    async def process_request(self, request, spider):
+        host = urlparse_cached(request).hostname
+        # 下载槽在请求进入下载器时创建，第一个请求之后就不再按固定延迟排队
+        self.adjust_slot(request, host)
+        delay = self.controller.reserve(host)
+        if delay > 0:
+            # 在函数内导入reactor，避免加载爬虫模块时提前安装默认的reactor
+            from twisted.internet import reactor
+            await maybe_deferred_to_future(task.deferLater(reactor, delay, lambda: None))
+        request.meta['adaptive_rate_start'] = time.monotonic()
+        return None
+
+    def process_response(self, request, response, spider):
+        host = urlparse_cached(request).hostname
+        if response.status in self.retry_codes:
+            delay = self.controller.penalize(host, parse_retry_after(response.headers.get('Retry-After')))
+            spider.logger.warning(f'{host} 返回 {response.status}，退避 {delay:.1f} 秒')
+        elif not request.meta.get('selenium_search_done') and 'adaptive_rate_start' in request.meta:
+            # 浏览器渲染的响应包含页面渲染时间，由爬虫另外记录
+            latency = request.meta.get('download_latency', time.monotonic() - request.meta['adaptive_rate_start'])
+            self.controller.observe(host, latency)
+        self.adjust_slot(request, host)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        host = urlparse_cached(request).hostname
+        delay = self.controller.penalize(host)
+        spider.logger.warning(f'{host} 请求出错（{type(exception).__name__}），退避 {delay:.1f} 秒')
+        self.adjust_slot(request, host)
+        return None
+
+    def adjust_slot(self, request, host: str):
+        downloader = self.crawler.engine.downloader
+        get_slot_key = getattr(downloader, 'get_slot_key', None) or downloader._get_slot_key
+        key = get_slot_key(request)
+        slot = downloader.slots.get(key)
+        if slot is None:
+            return
+        cap = self.slot_caps.setdefault(key, slot.concurrency)
+        slot.concurrency = max(1, min(cap, self.controller.concurrency(host)))
+        slot.delay = 0
@@ -4,21 +4,89 @@ BOT_NAME = 'jos_spider'
 
 SPIDER_MODULES = ['jos_spider.spiders']
 NEWSPIDER_MODULE = 'jos_spider.spiders'
+# 项目命令（scrapy re-extract 等）
+COMMANDS_MODULE = 'jos_spider.commands'
 
 # 搜索条件配置
 # 如果不需要使用搜索条件，将对应的值设置为空字符串
 SEARCH_KEY1 = '软件工程'  # 第一个搜索框的内容
 SEARCH_KEY2 = ''  # 第二个搜索框的内容
+SEARCH_START_YEAR = None  # 起始发表年份，为None时不限制
+SEARCH_END_YEAR = None  # 截止发表年份，为None时不限制
+
+# 高级搜索表单中年份范围字段的name
+SEARCH_START_YEAR_FIELD = 'StartYear'
+SEARCH_END_YEAR_FIELD = 'EndYear'
+
+# 批量检索：检索条件文件路径，设置后忽略 SEARCH_KEY1/SEARCH_KEY2/SEARCH_START_YEAR/SEARCH_END_YEAR
+# 每行一个检索条件（JSON对象如 {"key1": "软件测试", "start_year": 2015}，或直接是第一个搜索框的内容），
+# 也可以是 .json 数组；所有检索条件共用浏览器池（BROWSER_POOL_SIZE），输出数据的 query 字段标记检索条件，
+# 多个检索条件命中的同一篇文章只输出一次
+SEARCH_QUERIES_FILE = None
+
+# 按年份分区：检索条件的结果页数超过该值时，按发表年份范围二分为两个分区分别搜索（分区仍超过时继续拆分，
+# 直到不超过该值或只剩一年），缩短深度翻页；各分区由浏览器池（BROWSER_POOL_SIZE）或HTTP下载器并行抓取，
+# 输出数据合并到原检索条件下。为0时不分区
+SEARCH_PARTITION_PAGE_BUDGET = 0
+SEARCH_PARTITION_START_YEAR = 1990  # 检索条件未设置起始年份时分区的起始年份（《软件学报》创刊年份）
+SEARCH_PARTITION_END_YEAR = None  # 检索条件未设置截止年份时分区的截止年份，为None时为当前年份
+
+# 搜索模式
+# 'selenium': 使用浏览器填写搜索表单并逐页点击“下一页”
+# 'http': 直接发送与页面中 SearchData/SubmitArticleSearch 相同的表单请求，由Scrapy下载器并发抓取结果页
+SEARCH_MODE = 'selenium'
+
+# 文章提取器
+# 'lxml': 只解析文章列表片段，使用预编译选择器（默认）
+# 'bs4': 使用BeautifulSoup（html.parser）解析
+# 'js': 在浏览器内执行一次脚本，直接返回当前页的文章数据和页码（仅Selenium模式，HTTP模式下按'lxml'处理）
+# 'network': 实验性，需显式开启。开启浏览器性能日志（CDP Network事件），直接解析 SearchData/SubmitArticleSearch
+#            发出的XHR请求返回的文章列表HTML片段，不等待页面渲染（仅Selenium模式，HTTP模式下按'lxml'处理）；
+#            响应格式无法识别时记录其结构并改为从页面中提取
+ARTICLE_EXTRACTOR = 'lxml'
+
+# 网络捕获模式下搜索结果接口URL的正则表达式，为空时检查所有XHR/fetch响应，由响应内容判断是否为搜索结果
+NETWORK_CAPTURE_URL_PATTERN = ''
+
+# 详情页抓取
+# 启用后为每篇文章请求详情页（普通Scrapy请求，不经过Selenium），从引文元数据中补充
+# DOI、PDF链接、作者单位、卷期页码等字段，文章数据在详情页解析后输出
+# 每篇文章多一次请求，默认关闭，可在命令行中使用 scrapy crawl jos -s DETAIL_PAGES=1 开启
+DETAIL_PAGES = False
+
+# 详情页使用独立的下载槽，并发数和下载延迟与结果页分开限制，详情页抓取与翻页同时进行
+DETAIL_DOWNLOAD_SLOT = 'jos-detail'
+DOWNLOAD_SLOTS = {
+    # concurrency为该槽的并发上限，delay为下载延迟，jitter为延迟的随机浮动比例（±50%）
+    'jos-detail': {'concurrency': 4, 'delay': 1, 'jitter': 0.5},
+}
+
+# HTTP直连模式下的搜索表单ID
+HTTP_SEARCH_FORM_ID = 'article_search_form'
+
+# HTTP直连模式下表单中的页码字段名（SubmitArticleSearch(n) 提交的页码）
+HTTP_SEARCH_PAGE_FIELD = 'currentpage'
+
+# HTTP直连模式校验失败时是否回退到Selenium模式
+HTTP_FALLBACK_TO_SELENIUM = True
 
 # 请求头随机化中间件
 DOWNLOADER_MIDDLEWARES = {
     'jos_spider.middlewares.RandomUserAgentMiddleware': 400,
+    # 位于RetryMiddleware（550）之后，先于重试中间件看到限流响应
+    'jos_spider.ratelimit.AdaptiveRateMiddleware': 560,
     'jos_spider.middlewares.SeleniumMiddleware': 543,
 }
 
 # 启用数据处理管道
+# 可选的分析用导出管道：
+#   'jos_spider.pipelines.ParquetExportPipeline': 310,  # Parquet（列表列 + 压缩，需要安装pyarrow）
+#   'jos_spider.pipelines.SQLiteExportPipeline': 320,   # SQLite（文章/作者/关键词规范化分表 + 索引）
 ITEM_PIPELINES = {
+    'jos_spider.pipelines.DedupPipeline': 200,  # 去重，仅在 DEDUP_ENABLED、INCREMENTAL 或批量检索时生效
+    'jos_spider.pipelines.CoordinatorPipeline': 250,  # 协同抓取时汇总各进程的输出，仅在设置 COORDINATOR_PATH 时生效
     'jos_spider.pipelines.JosSpiderPipeline': 300,
+    'jos_spider.pipelines.IndexPipeline': 900,  # 本地索引（作者、关键词、全文），仅在设置 INDEX_PATH 时生效
 }
 
 # 遵守robots.txt规则
@@ -30,11 +98,30 @@ CONCURRENT_REQUESTS = 16
 # 对同一网站的并发请求数
 CONCURRENT_REQUESTS_PER_DOMAIN = 8
 
-# 下载延迟（秒）
+# 下载延迟（秒），只在关闭自适应速率控制时使用；开启时下载槽不再延迟，由令牌桶控制请求速率
 DOWNLOAD_DELAY = 3
 
-# 随机化下载延迟
-RANDOMIZE_DOWNLOAD_DELAY = True
+# 下载延迟的随机浮动比例（±50%）
+DOWNLOAD_DELAY_JITTER = 0.5
+
+# 自适应速率控制（HTTP请求和浏览器共用，按主机分别控制）
+# 每个主机一个令牌桶：响应耗时低于 ADAPTIVE_TARGET_LATENCY 且没有出错时，速率每次增加 ADAPTIVE_RATE_STEP（请求/秒），
+# 并逐步增加并发数（不超过 CONCURRENT_REQUESTS_PER_DOMAIN 和下载槽的并发上限）；遇到 RETRY_HTTP_CODES、超时或
+# 连接错误时速率和并发数减半，并按指数退避（带随机抖动，遵守Retry-After）暂停该主机的请求。
+# 当前速率和并发数记录在统计信息的 jos/rate/<主机>/requests_per_second、jos/rate/<主机>/concurrency 中。
+# 关闭时（-s ADAPTIVE_RATE_ENABLED=0）使用固定的 DOWNLOAD_DELAY，浏览器重试前固定等待 SELENIUM_RETRY_INTERVAL 秒
+ADAPTIVE_RATE_ENABLED = True
+ADAPTIVE_RATE_START = 1.0
+ADAPTIVE_RATE_MIN = 0.1
+ADAPTIVE_RATE_MAX = 8.0
+ADAPTIVE_RATE_STEP = 0.1
+# 同一主机两次请求的最小间隔（秒），速率不超过 1/ADAPTIVE_RATE_MIN_INTERVAL，为0时只受 ADAPTIVE_RATE_MAX 限制
+ADAPTIVE_RATE_MIN_INTERVAL = 0.25
+ADAPTIVE_CONCURRENCY_START = 2
+ADAPTIVE_TARGET_LATENCY = 1.0
+# 退避时长：ADAPTIVE_BACKOFF_BASE * 2^(连续出错次数-1)，不超过 ADAPTIVE_BACKOFF_MAX（秒）
+ADAPTIVE_BACKOFF_BASE = 1.0
+ADAPTIVE_BACKOFF_MAX = 60.0
 
 # 默认请求头
 DEFAULT_REQUEST_HEADERS = {
@@ -42,19 +129,86 @@ DEFAULT_REQUEST_HEADERS = {
     'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
 }
 
+# 断点续爬
+# 每完成一页即把进度写入检查点文件（按搜索条件区分）
+CHECKPOINT_FILE = 'jos_checkpoints.json'
+
+# 是否从检查点继续抓取：直接跳转到第一个未完成的页面，并追加到已有的输出文件
+# 可在命令行中使用 scrapy crawl jos -s RESUME=1 开启
+RESUME = False
+
+# 跨运行去重
+# 以规范化的标题+作者+发布时间为指纹，已出现过的文章由 DedupPipeline 丢弃
+DEDUP_ENABLED = False
+DEDUP_STORE_PATH = 'jos_fingerprints.sqlite'
+
+# 结果页缓存：按检索条件+页码把每页的文章列表片段（网络捕获模式下为接口响应）压缩保存到SQLite，
+# 修改字段提取逻辑后可用 scrapy re-extract 从缓存重新提取，无需浏览器和网络
+# 默认关闭，可在命令行中使用 scrapy crawl jos -s SNAPSHOT_CACHE_ENABLED=1 开启
+SNAPSHOT_CACHE_ENABLED = False
+SNAPSHOT_CACHE_PATH = 'jos_snapshots.sqlite'
+SNAPSHOT_CACHE_MAX_MB = 512  # 缓存大小上限（MB），超过时删除最早抓取的页面，为0时不限制
+SNAPSHOT_CACHE_MAX_AGE_DAYS = 30  # 抓取时删除超过该天数的页面，为0时不过期
+
+# 增量抓取：启用去重并追加到已有的输出文件，连续 INCREMENTAL_STOP_PAGES 页没有新文章时停止翻页
+# 可在命令行中使用 scrapy crawl jos -s INCREMENTAL=1 开启
+INCREMENTAL = False
+INCREMENTAL_STOP_PAGES = 3
+
+# 多进程/多节点协同抓取：多个 scrapy crawl jos 进程共用 COORDINATOR_PATH 指向的任务队列（SQLite，
+# 多台机器时放在共享存储上），按 (检索条件, 页码段) 领取租约，抓取期间定期续期，进程退出后租约过期由其他进程接手；
+# 各进程的输出按文章指纹汇总到同一个文件（scrapy work-queue export 导出）。为None时不启用
+COORDINATOR_PATH = None
+COORDINATOR_WORKER_ID = None  # 进程标识，默认为 <主机名>-<进程号>
+COORDINATOR_LEASE_PAGES = 10  # 每个租约包含的页数
+COORDINATOR_LEASE_SECONDS = 300  # 租约有效期（秒），每隔三分之一有效期续期一次
+COORDINATOR_MAX_ATTEMPTS = 3  # 同一租约最多领取的次数
+COORDINATOR_LEASES = 2  # HTTP直连模式下每次领取的租约数
+
 # 输出设置
-FEEDS = {
-    'jos_articles.json': {
-        'format': 'json',
-        'encoding': 'utf-8',
-        'indent': 2,
-        'overwrite': True
-    }
+# 由 JosSpiderPipeline 流式写入 <OUTPUT_NAME>.jsonl / .txt / .xlsx
+OUTPUT_NAME = 'jos_articles'
+OUTPUT_EXCEL = True  # 是否输出Excel（为False时不导入openpyxl）
+
+# 每写入多少条数据刷新一次输出文件
+OUTPUT_FLUSH_BATCH = 50
+
+# 本地索引（IndexPipeline）：作者、关键词倒排索引和标题、摘要的中文二元全文索引，
+# 跨运行保留并增量更新，使用 scrapy search 查询。为空时不建立索引（默认），
+# 可在命令行中使用 scrapy crawl jos -s INDEX_PATH=jos_index.sqlite 开启
+INDEX_PATH = ''
+
+# Parquet导出设置（ParquetExportPipeline）
+PARQUET_EXPORT_PATH = 'jos_articles.parquet'
+PARQUET_COMPRESSION = 'zstd'
+PARQUET_ROW_GROUP_SIZE = 1000
+
+# SQLite导出设置（SQLiteExportPipeline）
+SQLITE_EXPORT_PATH = 'jos_articles.sqlite'
+
+# 性能指标
+# 各阶段耗时直方图（jos/stage/<阶段>/...）和重试计数（jos/retries/<类型>）始终记录在Scrapy统计中；
+# 抓取过程中每隔 METRICS_INTERVAL 秒把指标以Prometheus文本格式写入 METRICS_FILE（设为空字符串则不写入）
+EXTENSIONS = {
+    'jos_spider.metrics.MetricsExporter': 500,
 }
+METRICS_FILE = 'jos_metrics.prom'
+METRICS_INTERVAL = 15
+
+# 离线启动（无法访问外网的环境）：不使用webdriver-manager和fake-useragent，
+# 使用 SELENIUM_DRIVER_EXECUTABLE_PATH、缓存的chromedriver路径或PATH中的chromedriver，以及内置的User-Agent列表。
+# 启动耗时记录在统计信息的 jos/startup/* 中
+OFFLINE_MODE = False
+
+# User-Agent来源（RandomUserAgentMiddleware）：'fake_useragent' 或 'bundled'（内置列表）
+USER_AGENT_SOURCE = 'fake_useragent'
 
 # Selenium设置
 SELENIUM_DRIVER_NAME = 'chrome'
-SELENIUM_DRIVER_EXECUTABLE_PATH = None  # 自动下载
+SELENIUM_DRIVER_EXECUTABLE_PATH = None  # chromedriver路径，为None时自动解析
+# webdriver-manager联网解析出的chromedriver路径缓存在该文件中，之后的运行直接使用（设为空字符串则每次都联网解析）；
+# Chrome升级后缓存的chromedriver无法启动浏览器时自动重新解析
+CHROMEDRIVER_CACHE_FILE = '.jos_chromedriver_path'
 SELENIUM_DRIVER_ARGUMENTS = [
     '--headless=new',  # 使用新版无头模式
     '--disable-gpu',
@@ -71,6 +225,19 @@ SELENIUM_DRIVER_ARGUMENTS = [
     '--disable-blink-features=AutomationControlled'  # 禁用自动化检测
 ]  # 优化的无头模式配置
 
+# 是否以无头模式启动浏览器（爬虫与中间件共享同一个浏览器）
+SELENIUM_HEADLESS = True
+
+# 精简浏览器配置
+# 页面加载策略：'normal' 等待所有子资源加载完成；'eager' DOM解析完成即返回；'none' 发出请求后立即返回
+SELENIUM_PAGE_LOAD_STRATEGY = 'eager'
+
+# 是否通过CDP（Network.setBlockedURLs）屏蔽图片、样式表、字体和第三方统计脚本
+SELENIUM_BLOCK_RESOURCES = True
+
+# 屏蔽的URL模式（支持 * 通配符），为空时使用 jos_spider.browser.DEFAULT_BLOCKED_URL_PATTERNS
+SELENIUM_BLOCKED_URL_PATTERNS = []
+
 # Selenium等待设置（所有时间单位均为秒）
 # 页面加载超时时间，控制页面整体加载的最大等待时间
 SELENIUM_PAGE_LOAD_TIMEOUT = 60
@@ -84,12 +251,45 @@ SELENIUM_ELEMENT_TIMEOUT = 15
 # 页面内容渲染等待时间，确保页面有足够内容加载完成
 SELENIUM_CONTENT_RENDER_TIMEOUT = 30
 
-# 搜索结果加载等待时间，点击搜索按钮后等待结果加载的时间
+# 搜索结果加载的最长等待时间，点击搜索按钮后一旦检测到结果列表变化即继续
 SELENIUM_SEARCH_RESULT_WAIT = 5
 
-# 重试间隔时间，每次重试前的等待时间
+# 翻页检测方式
+# 'observer': 在页面中注入MutationObserver，文章列表一变化就继续（事件驱动）
+# 'polling': 轮询比较文章列表内容，间隔从0.1秒开始逐次加倍（最长1秒）
+SELENIUM_PAGE_CHANGE_DETECTION = 'observer'
+
+# 文章列表停止变化多少毫秒后认为更新完成
+SELENIUM_MUTATION_SETTLE_MS = 100
+
+# 重试间隔时间，未启用自适应速率控制时每次重试前的等待时间
 SELENIUM_RETRY_INTERVAL = 2
 
+# reactor线程池大小
+# 中间件和爬虫中的浏览器操作都在该线程池中执行（同时用于DNS解析），不阻塞下载器和管道
+REACTOR_THREADPOOL_MAXSIZE = 10
+
+# 浏览器池大小（Selenium模式）
+# 大于1时，总页数会被划分为多个连续的页码范围，每个范围由一个无头浏览器执行一次搜索后
+# 直接调用页面内的分页函数跳转到起始页并行抓取
+BROWSER_POOL_SIZE = 1
+
+# 流水线解析（Selenium模式）：结果页的文章列表片段交给提取线程池后立即翻页，提取与等待翻页同时进行，
+# 文章数据仍按页码顺序输出。PARSE_WORKERS 为提取线程数，为0时在浏览器线程中直接提取；
+# PARSE_QUEUE_SIZE 为每个浏览器最多积压的未输出页面数，达到后等待最早的页面提取完成再翻页
+PARSE_WORKERS = 2
+PARSE_QUEUE_SIZE = 4
+
+# 浏览器回收（Selenium模式）：长时间运行的浏览器经过大量翻页后内存增长、响应变慢，满足任一条件时
+# 关闭并重启浏览器，重新搜索后跳转回当前页继续抓取。为0时不检查对应条件
+BROWSER_RECYCLE_PAGES = 300  # 每个浏览器最多处理的页数
+BROWSER_RECYCLE_MEMORY_MB = 1536  # chromedriver及浏览器进程的内存占用上限（MB）
+BROWSER_RECYCLE_LATENCY_FACTOR = 3.0  # 翻页耗时超过前几页平均值的倍数
+BROWSER_MEMORY_CHECK_PAGES = 20  # 每隔多少页检查一次内存占用
+
+# 关闭爬虫时等待正在进行的浏览器操作结束的最长时间（秒），超时后直接关闭浏览器
+BROWSER_CLOSE_TIMEOUT = 30
+
 # 重试设置
 RETRY_ENABLED = True
 RETRY_TIMES = 1
@@ -0,0 +1,149 @@
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Iterator, NamedTuple, Optional
+from scrapy import signals
+
+
+class Snapshot(NamedTuple):
+    """缓存的一页搜索结果原始内容"""
+    query_key: str
+    # 检索条件的输出标签（按年份分区时为原检索条件）
+    label: str
+    page: int
+    # 搜索页URL，用于把详情页链接转换为绝对地址
+    url: str
+    # 抓取时间（Unix时间戳）
+    fetched_at: float
+    # 文章列表片段的HTML，或网络捕获模式下搜索结果接口的响应
+    payload: str
+
+
+class SnapshotCache:
+    """结果页原始内容的压缩缓存（SQLite，zlib压缩）
+
+    按检索条件+页码保存每页的文章列表片段及抓取时间，修改字段提取逻辑后可以用
+    `scrapy re-extract` 直接从缓存重新提取，无需重新抓取。
+    缓存超过 max_bytes 时删除最早抓取的页面；抓取时删除超过 max_age 秒的页面。
+    同一个crawler中的爬虫共享同一个实例。
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0, max_age: float = 0, compress_level: int = 6,
+                 commit_batch: int = 50):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress_level = compress_level
+        self.commit_batch = commit_batch
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS snapshots (
+                query_key TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                label TEXT NOT NULL,
+                url TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                payload BLOB NOT NULL,
+                PRIMARY KEY (query_key, page)
+            ) WITHOUT ROWID
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_snapshots_fetched_at ON snapshots (fetched_at)')
+        self.conn.commit()
+        self.total_bytes = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM snapshots').fetchone()[0]
+
+    @classmethod
+    def from_crawler(cls, crawler) -> 'SnapshotCache':
+        cache = getattr(crawler, 'snapshot_cache', None)
+        if cache is None:
+            settings = crawler.settings
+            cache = cls(
+                settings.get('SNAPSHOT_CACHE_PATH', 'jos_snapshots.sqlite'),
+                max_bytes=settings.getint('SNAPSHOT_CACHE_MAX_MB', 0) * 1024 * 1024,
+                max_age=settings.getfloat('SNAPSHOT_CACHE_MAX_AGE_DAYS', 0) * 86400,
+                commit_batch=settings.getint('OUTPUT_FLUSH_BATCH', 50)
+            )
+            crawler.snapshot_cache = cache
+            # 抓取时清除过期的页面，重新提取时保留
+            cache.expire()
+            crawler.signals.connect(cache.close, signals.spider_closed)
+        return cache
+
+    def put(self, query_key: str, label: str, page: int, url: str, payload: str):
+        """保存一页的原始内容（同一检索条件、页码的旧内容被替换）"""
+        data = zlib.compress(payload.encode('utf-8'), self.compress_level)
+        with self.lock:
+            old = self.conn.execute(
+                'SELECT size FROM snapshots WHERE query_key = ? AND page = ?', (query_key, page)
+            ).fetchone()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO snapshots (query_key, page, label, url, fetched_at, size, payload) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (query_key, page, label, url, time.time(), len(data), data)
+            )
+            self.total_bytes += len(data) - (old[0] if old else 0)
+            if self.max_bytes and self.total_bytes > self.max_bytes:
+                self._evict()
+            self.pending += 1
+            if self.pending >= self.commit_batch:
+                self.conn.commit()
+                self.pending = 0
+
+    def _evict(self):
+        """按抓取时间从早到晚删除页面，直到缓存不超过 max_bytes（调用方需持有锁）"""
+        target = self.max_bytes
+        cursor = self.conn.execute('SELECT query_key, page, size FROM snapshots ORDER BY fetched_at')
+        evicted = []
+        for query_key, page, size in cursor:
+            if self.total_bytes <= target:
+                break
+            evicted.append((query_key, page))
+            self.total_bytes -= size
+        self.conn.executemany('DELETE FROM snapshots WHERE query_key = ? AND page = ?', evicted)
+
+    def expire(self) -> int:
+        """删除超过 max_age 秒的页面
+
+        Returns:
+            删除的页面数
+        """
+        if not self.max_age:
+            return 0
+        with self.lock:
+            cursor = self.conn.execute('DELETE FROM snapshots WHERE fetched_at < ?', (time.time() - self.max_age,))
+            self.conn.commit()
+            self.total_bytes = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM snapshots').fetchone()[0]
+            return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM snapshots').fetchone()[0]
+
+    def snapshots(self, label: Optional[str] = None) -> Iterator[Snapshot]:
+        """按检索条件、页码顺序读取缓存的页面
+
+        Args:
+            label: 只读取该检索条件（输出标签）的页面，默认读取全部
+
+        Yields:
+            解压后的页面
+        """
+        sql = 'SELECT query_key, label, page, url, fetched_at, payload FROM snapshots'
+        params = ()
+        if label is not None:
+            sql += ' WHERE label = ?'
+            params = (label,)
+        with self.lock:
+            rows = self.conn.execute(sql + ' ORDER BY label, query_key, page', params).fetchall()
+        for query_key, row_label, page, url, fetched_at, data in rows:
+            yield Snapshot(query_key, row_label, page, url, fetched_at, zlib.decompress(data).decode('utf-8'))
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.commit()
+                self.conn.close()
+                self.conn = None
@@ -1,57 +1,542 @@
 import scrapy
-from scrapy.http import Request
-from bs4 import BeautifulSoup
+from scrapy.http import Request, FormRequest
+from scrapy import signals
+from scrapy.exceptions import CloseSpider, DontCloseSpider
+from scrapy.utils.defer import maybe_deferred_to_future
+# WebDriverWait、expected_conditions 等较重的Selenium模块在浏览器操作中才导入，HTTP直连模式下启动时不加载
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
+import datetime
 import json
 import logging
-from typing import Optional, Union, Tuple
+from urllib.parse import urlparse, urljoin
+from typing import Optional, Union, Tuple, List, Dict, NamedTuple
 import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from twisted.internet import threads
+from jos_spider.browser import BrowserManager, install_list_observer, wait_for_list_change, report_page_transfer
+from jos_spider.extractors import (get_extractor, extract_page_in_browser, extract_result_payload, extract_form,
+                                   describe_payload, extract_article_details, OrderedExtractionPool, SearchForm, CURRENT_PAGE_SCRIPT)
+from jos_spider.checkpoint import CheckpointStore, make_query_key
+from jos_spider.coordination import Coordinator, Lease
+from jos_spider.dedup import FingerprintStore
+from jos_spider.metrics import StageMetrics, call_in_reactor
+from jos_spider.network import NetworkCapture
+from jos_spider.queries import SearchQuery, QueryState, queries_from_settings
+from jos_spider.ratelimit import AdaptiveRateController
+from jos_spider.snapshots import SnapshotCache
+
+class ResultPage(NamedTuple):
+    """浏览器中当前显示的一页搜索结果"""
+    articles: List[Dict]
+    current_page: Optional[int]
+    total_pages: Optional[int]
+    # 文章列表片段的HTML，用于检测翻页后的内容更新；浏览器内提取模式下为None
+    html: Optional[str]
+    # 页面内文章列表观察器的版本号，用于事件驱动地检测翻页；未启用观察器时为None
+    list_version: Optional[int] = None
+    # 网络捕获模式下搜索结果接口的原始响应，保存到结果页缓存
+    payload: Optional[str] = None
+
+
+class QuerySplit(NamedTuple):
+    """批量检索工作线程的结束标记：检索条件已按年份拆分为多个分区，由新的工作线程分别抓取"""
+    states: List[QueryState]
+
+
+class BrowserPool(NamedTuple):
+    """浏览器池的工作线程、空闲浏览器队列和结果汇总队列"""
+    executor: ThreadPoolExecutor
+    # 工作线程从中借用浏览器，用完后归还；None表示尚未启动的浏览器
+    drivers: queue.Queue
+    # 工作线程写入 (检索条件状态, 页码, 文章数据列表)，结束时写入None
+    results: queue.Queue
+
 
 class JosSpider(scrapy.Spider):
     name = 'jos'
     allowed_domains = ['jos.org.cn']
     start_urls = ['https://jos.org.cn/jos/article/advanced_search']
     
-    def __init__(self):
-        super().__init__()
-        self.driver = webdriver.Chrome()
-        # 增加等待时间到30秒
-        self.wait = WebDriverWait(self.driver, 30)
+    def __init__(self, *args, start_url: str = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if start_url:
+            # 指定其他搜索页地址（如本地回放服务器）：scrapy crawl jos -a start_url=http://127.0.0.1:8000/jos/article/advanced_search
+            self.start_urls = [start_url]
+            self.allowed_domains = [urlparse(start_url).hostname]
+        # 浏览器由BrowserManager管理，与SeleniumMiddleware共享，首次使用时才启动
+        self.browser = None
+        # 文章提取器，根据 ARTICLE_EXTRACTOR 设置在首次使用时创建
+        self.extractor = None
         self.max_retries = 3
-        # 添加已访问页面集合用于去重
-        self.visited_pages = set()
-        # 记录总页数
-        self.total_pages = None
+        # 各检索条件的抓取状态（已访问页码、总页数等），按检索条件的顺序排列
+        self.states: Dict[SearchQuery, QueryState] = {}
+        # 浏览器池中多个浏览器共享已访问页面集合，需要加锁
+        self.visited_lock = threading.Lock()
+        # 持久化的抓取进度检查点
+        self.checkpoints = None
+        # 跨运行的文章指纹库（启用去重或增量抓取时使用）
+        self.fingerprints = None
+        # 结果页原始内容的压缩缓存（启用 SNAPSHOT_CACHE_ENABLED 时使用）
+        self.snapshots = None
+        # 多进程协同抓取时的租约管理（设置 COORDINATOR_PATH 时使用），以及HTTP直连模式下复用的搜索表单
+        self.coordinator = None
+        self.search_form = None
+        # HTTP直连模式失败后回退到Selenium模式：已回退的检索条件（整个抓取回退时为None），
+        # 以及等待在浏览器中抓取的检索条件；同一时间只有一个回退抓取在运行（共用爬虫自身的浏览器）
+        self.fallback_queries = set()
+        self.fallback_pending: List[SearchQuery] = []
+        self.fallback_running = False
+        # 各阶段耗时和重试计数，与中间件、管道共享
+        self.metrics = StageMetrics()
+        # 自适应速率控制，与HTTP请求和中间件共享
+        self.rate = AdaptiveRateController(enabled=False)
+        # 网络捕获提取模式：每个浏览器的响应捕获器，以及翻页时已捕获但尚未输出的结果页
+        self.network_captures = {}
+        self.captured_pages = {}
+        # 详情页抓取：(检索条件, 页码) -> 该页尚未完成的详情页请求数，全部完成后才记录该页已完成
+        self.pending_details: Dict[Tuple[SearchQuery, int], int] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.browser = BrowserManager.from_crawler(crawler)
+        spider.metrics = StageMetrics.from_crawler(crawler)
+        spider.rate = AdaptiveRateController.from_crawler(crawler)
+        spider.checkpoints = CheckpointStore.from_settings(crawler.settings)
+        for query in queries_from_settings(crawler.settings):
+            spider.add_state(query)
+        if crawler.settings.getbool('DEDUP_ENABLED') or crawler.settings.getbool('INCREMENTAL'):
+            spider.fingerprints = FingerprintStore.from_crawler(crawler)
+        if crawler.settings.getbool('SNAPSHOT_CACHE_ENABLED'):
+            spider.snapshots = SnapshotCache.from_crawler(crawler)
+        if crawler.settings.get('COORDINATOR_PATH'):
+            spider.coordinator = Coordinator.from_crawler(crawler)
+            for state in spider.states.values():
+                spider.coordinator.queue.add_query(make_query_key(state.query.as_dict()), state.query.output_label)
+            crawler.signals.connect(spider.coordinator_idle, signal=signals.spider_idle)
+        return spider
+
+    def add_state(self, query: SearchQuery) -> QueryState:
+        """登记一个检索条件（或按年份拆分出的分区）的抓取状态
+        
+        Args:
+            query: 搜索条件
+        
+        Returns:
+            该检索条件的抓取状态
+        """
+        state = QueryState(query)
+        if self.settings.getbool('RESUME'):
+            # 断点续爬：已完成输出的页面直接视为已访问，翻页时跳过
+            finished_pages = self.checkpoints.finished_pages(query.as_dict())
+            state.visited_pages.update(finished_pages)
+            self.logger.info(f'[{query.label}] 断点续爬，已完成 {len(finished_pages)} 页')
+        else:
+            # 按年份分区时在浏览器线程中登记，检查点的写入交给reactor线程
+            call_in_reactor(self.checkpoints.reset, query.as_dict())
+        with self.visited_lock:
+            return self.states.setdefault(query, state)
+
+    @property
+    def partition_budget(self) -> int:
+        """按年份分区的页数预算（SEARCH_PARTITION_PAGE_BUDGET），为0时不分区
+        
+        协同抓取时页码已按租约分配给多个进程，不再按年份分区。
+        """
+        if self.coordinator is not None:
+            return 0
+        return self.settings.getint('SEARCH_PARTITION_PAGE_BUDGET', 0)
+
+    @property
+    def states_by_key(self) -> Dict[str, QueryState]:
+        """检查点的键 -> 检索条件的抓取状态（协同抓取时任务队列按该键区分检索条件）"""
+        with self.visited_lock:
+            states = list(self.states.values())
+        return {make_query_key(state.query.as_dict()): state for state in states}
+
+    def lease_state(self, lease: Lease) -> QueryState:
+        """领取租约后准备对应检索条件的抓取状态：之前已完成的页面视为已访问，其余页面重新抓取"""
+        state = self.states_by_key[lease.query_key]
+        with self.visited_lock:
+            state.visited_pages.difference_update(lease.pages)
+            state.visited_pages.update(lease.done_pages)
+        self.logger.info(f'[{state.query.label}] 领取页码 {lease.start_page}-{lease.end_page}'
+                         f'（未完成 {len(lease.pages)} 页）')
+        return state
+
+    def seed_pages(self, state: QueryState):
+        """协同抓取时第1页确定总页数后，把其余页码按段登记到任务队列，由各进程领取"""
+        if state.total_pages and state.total_pages > 1:
+            self.coordinator.queue.add_pages(make_query_key(state.query.as_dict()), state.query.output_label,
+                                             state.total_pages)
+
+    def lease_requests(self):
+        """HTTP直连模式下领取租约，生成租约内各页的搜索请求"""
+        if self.search_form is None:
+            yield Request(url=self.start_urls[0], callback=self.parse_search_form,
+                          meta={'dont_selenium': True}, dont_filter=True)
+            return
+        leases = self.coordinator.acquire(list(self.states_by_key), self.settings.getint('COORDINATOR_LEASES', 2))
+        for lease in leases:
+            state = self.lease_state(lease)
+            for page in lease.pages:
+                request = self.build_search_request(self.search_form, page, state)
+                yield request.replace(priority=-page)
+
+    def coordinator_idle(self):
+        """协同抓取：爬虫空闲时归还未完成的租约并领取新的租约，其他进程仍持有租约时继续等待
+        
+        其他进程抓取第1页后才会登记其余页码，其租约也可能过期后由本进程接手，
+        因此只有任务队列中本进程的检索条件全部结束后才关闭爬虫。
+        """
+        self.coordinator.release_all()
+        remaining = self.coordinator.queue.remaining(list(self.states_by_key))
+        if remaining['available']:
+            if self.settings.get('SEARCH_MODE', 'selenium') == 'http':
+                for request in self.lease_requests():
+                    self.crawler.engine.crawl(request)
+            else:
+                self.crawler.engine.crawl(Request(url=self.start_urls[0], callback=self.parse,
+                                                  meta={'dont_selenium': True}, dont_filter=True))
+        elif not remaining['leased']:
+            self.logger.info(f'任务队列中的检索条件已全部完成：{self.coordinator.queue.status()}')
+            return
+        raise DontCloseSpider
+
+    def partition(self, state: QueryState) -> Optional[List[QueryState]]:
+        """检索条件的结果页数超过分区页数预算时，按发表年份范围拆分为两个分区
+        
+        各分区读取第一页后再次检查页数，超过预算时继续拆分，直到不超过预算或只剩一年。
+        原检索条件不再翻页，由各分区完成抓取。
+        
+        Args:
+            state: 已读取总页数的检索条件抓取状态
+        
+        Returns:
+            两个分区的抓取状态，不需要或无法拆分时返回None
+        """
+        budget = self.partition_budget
+        if not budget or not state.total_pages or state.total_pages <= budget:
+            return None
+        halves = state.query.split_years(
+            self.settings.getint('SEARCH_PARTITION_START_YEAR', 1990),
+            self.settings.getint('SEARCH_PARTITION_END_YEAR') or datetime.date.today().year
+        )
+        if halves is None:
+            self.logger.warning(f'[{state.query.label}] 共 {state.total_pages} 页，超过分区页数预算 {budget}，'
+                                f'但已无法按年份拆分')
+            return None
+        children = [self.add_state(query) for query in halves]
+        state.stop_crawl.set()
+        self.logger.info(f'[{state.query.label}] 共 {state.total_pages} 页，超过分区页数预算 {budget}，'
+                         f'拆分为 {" 和 ".join(child.query.label for child in children)}')
+        self.metrics.inc_value('partitions', len(children))
+        return children
+
+    @property
+    def search_host(self) -> str:
+        """搜索页所在的主机，浏览器中的请求按该主机进行速率控制"""
+        return urlparse(self.start_urls[0]).hostname
+
+    def report_browser_request(self, started: float, ok: bool, driver=None):
+        """把一次浏览器请求（加载页面、翻页）的结果反馈给自适应速率控制
+        
+        Args:
+            started: 发出请求时的 time.perf_counter()
+            ok: 请求是否成功
+            driver: 完成翻页的浏览器实例，传入时同时记录该浏览器的翻页耗时（用于判断是否需要回收）
+        """
+        if ok:
+            latency = time.perf_counter() - started
+            self.rate.observe(self.search_host, latency)
+            if driver is not None:
+                self.browser.record_page(driver, latency)
+        else:
+            self.rate.penalize(self.search_host)
+
+    def recycle_browser(self, driver=None):
+        """浏览器达到回收条件（页数、内存占用、翻页耗时）时关闭并启动新的实例
+        
+        Args:
+            driver: 浏览器实例，默认为爬虫自身的浏览器
+        
+        Returns:
+            新的浏览器实例（需要重新搜索），不需要回收时返回None
+        """
+        driver = driver or self.driver
+        reason = self.browser.recycle_reason(driver)
+        if reason is None:
+            return None
+        self.logger.info(f'回收浏览器：{reason}')
+        self.network_captures.pop(driver, None)
+        self.captured_pages.pop(driver, None)
+        with self.metrics.time('browser_recycle'):
+            return self.browser.recycle(driver)
+
+    @property
+    def state(self) -> QueryState:
+        """第一个（未使用检索条件文件时即唯一的）检索条件的抓取状态"""
+        return next(iter(self.states.values()))
+
+    @property
+    def batch_mode(self) -> bool:
+        """是否从 SEARCH_QUERIES_FILE 批量读取检索条件（此时输出数据标记检索条件）"""
+        return bool(self.settings.get('SEARCH_QUERIES_FILE'))
+
+    @property
+    def query(self) -> Dict:
+        """当前搜索条件，用作检查点的键"""
+        return self.state.query.as_dict()
+
+    def prepare_articles(self, articles: List[Dict], state: QueryState) -> List[Dict]:
+        """将详情页链接转换为绝对地址，批量检索时标记找到文章的检索条件"""
+        prepared = []
+        for article in articles:
+            article = dict(article)
+            if article.get('url'):
+                article['url'] = urljoin(self.start_urls[0], article['url'])
+            if self.batch_mode:
+                article['query'] = state.query.output_label
+            prepared.append(article)
+        return prepared
+
+    def store_snapshot(self, page: int, payload: Optional[str], state: QueryState = None):
+        """把结果页的原始内容（文章列表片段或接口响应）保存到结果页缓存，供 scrapy re-extract 重新提取
+        
+        Args:
+            page: 页码
+            payload: 原始内容，浏览器内提取模式（'js'）下没有原始内容，为None
+            state: 检索条件的抓取状态，默认为第一个检索条件
+        """
+        if self.snapshots is None or not payload:
+            return
+        state = state or self.state
+        try:
+            self.snapshots.put(make_query_key(state.query.as_dict()), state.query.output_label, page,
+                               self.start_urls[0], payload)
+        except Exception as e:
+            # 缓存写入失败不影响抓取
+            self.logger.warning(f'保存第 {page} 页到结果页缓存时出错: {str(e)}')
+
+    def emit_page(self, page: int, articles: List[Dict], state: QueryState = None):
+        """输出一页的文章数据
+        
+        启用 DETAIL_PAGES 时为每篇文章生成详情页请求，文章数据在详情页解析后输出，
+        该页的所有详情页完成后才记录该页已完成（断点续爬时不会丢失尚未输出的文章）。
+        
+        Args:
+            page: 页码
+            articles: 该页的文章数据
+            state: 检索条件的抓取状态，默认为第一个检索条件
+        """
+        state = state or self.state
+        articles = self.prepare_articles(articles, state)
+        if not self.settings.getbool('DETAIL_PAGES'):
+            yield from articles
+            self.page_done(page, state)
+            return
+        
+        requests = []
+        for article in articles:
+            if article.get('url'):
+                requests.append(self.build_detail_request(article, page, state))
+            else:
+                yield article
+        if not requests:
+            self.page_done(page, state)
+            return
+        with self.visited_lock:
+            self.pending_details[(state.query, page)] = len(requests)
+        yield from requests
+
+    def build_detail_request(self, article: Dict, page: int, state: QueryState) -> Request:
+        """构造文章详情页请求
+        
+        详情页为静态页面，直接由Scrapy下载器抓取（不经过Selenium），使用独立的下载槽
+        （DETAIL_DOWNLOAD_SLOT，并发数和延迟由 DOWNLOAD_SLOTS 设置），与结果页翻页同时进行。
+        """
+        return Request(
+            url=article['url'],
+            callback=self.parse_detail,
+            errback=self.detail_failed,
+            cb_kwargs={'article': article, 'page': page, 'query': state.query},
+            meta={'dont_selenium': True, 'download_slot': self.settings.get('DETAIL_DOWNLOAD_SLOT', 'jos-detail')},
+            # 多个检索条件可能命中同一篇文章，每次都需要回调输出对应的文章数据
+            dont_filter=True
+        )
+
+    def parse_detail(self, response, article: Dict, page: int, query: SearchQuery):
+        """解析文章详情页，补充列表页没有的字段（不覆盖列表页已有的字段）"""
+        with self.metrics.time('detail_extract'):
+            details = extract_article_details(response.text)
+        if details.get('pdf_url'):
+            details['pdf_url'] = response.urljoin(details['pdf_url'])
+        merged = dict(article)
+        for field, value in details.items():
+            if not merged.get(field):
+                merged[field] = value
+        yield merged
+        self.detail_finished(page, query)
+        if self.incremental_finished():
+            raise CloseSpider('incremental_no_new_articles')
+
+    def detail_failed(self, failure):
+        """详情页抓取失败时仍输出列表页中的文章数据"""
+        request = failure.request
+        self.logger.warning(f'详情页抓取失败 {request.url}: {failure.getErrorMessage()}')
+        self.metrics.inc_value('detail_failed')
+        yield request.cb_kwargs['article']
+        self.detail_finished(request.cb_kwargs['page'], request.cb_kwargs['query'])
+        if self.incremental_finished():
+            raise CloseSpider('incremental_no_new_articles')
+
+    def incremental_finished(self) -> bool:
+        """增量抓取时所有检索条件都已停止翻页，且已输出的结果页的详情页全部完成（可以提前结束抓取）"""
+        with self.visited_lock:
+            # 按年份分区时浏览器线程会登记新的检索条件
+            states = list(self.states.values())
+        return all(state.stop_crawl.is_set() for state in states) and not self.pending_details
+
+    def detail_finished(self, page: int, query: SearchQuery):
+        """一个详情页请求已完成，该页的详情页全部完成时记录该页已完成"""
+        key = (query, page)
+        with self.visited_lock:
+            self.pending_details[key] -= 1
+            finished = self.pending_details[key] == 0
+            if finished:
+                del self.pending_details[key]
+        if finished:
+            self.page_done(page, self.states[query])
+
+    def page_done(self, page: int, state: QueryState = None):
+        """记录一页已完成输出
+        
+        检查点、任务队列和统计的写入在reactor线程中执行（浏览器线程中完成的页面通过 callFromThread 提交）。
+        
+        Args:
+            page: 页码
+            state: 检索条件的抓取状态，默认为第一个检索条件
+        """
+        state = state or self.state
+        call_in_reactor(self.record_page_done, page, state, state.total_pages)
+
+    def record_page_done(self, page: int, state: QueryState, total_pages: Optional[int]):
+        """把一页已完成写入检查点和任务队列（在reactor线程中执行）"""
+        self.checkpoints.mark_page_done(state.query.as_dict(), page, total_pages)
+        if self.coordinator is not None:
+            self.coordinator.page_done(make_query_key(state.query.as_dict()), page)
+        self.metrics.inc_value('pages_done')
+
+    def check_incremental_stop(self, page: int, articles: List[Dict], state: QueryState = None) -> bool:
+        """增量抓取模式下记录一页中是否有新文章，并判断是否应停止翻页
+        
+        需要在该页文章交给管道（写入指纹库）之前调用。
+        
+        Args:
+            page: 页码
+            articles: 该页的文章数据
+            state: 检索条件的抓取状态，默认为第一个检索条件
+        
+        Returns:
+            是否已有连续 INCREMENTAL_STOP_PAGES 页没有新文章
+        """
+        if not self.settings.getbool('INCREMENTAL'):
+            return False
+        
+        state = state or self.state
+        new_count = self.fingerprints.count_new(articles)
+        self.logger.info(f'第 {page} 页有 {new_count} 篇新文章')
+        with self.visited_lock:
+            state.page_has_new[page] = new_count > 0
+            # 计算包含当前页的连续无新文章页数（页面完成顺序可能不固定）
+            run = 0
+            if not state.page_has_new[page]:
+                run = 1
+                previous_page = page - 1
+                while state.page_has_new.get(previous_page) is False:
+                    run += 1
+                    previous_page -= 1
+                next_page = page + 1
+                while state.page_has_new.get(next_page) is False:
+                    run += 1
+                    next_page += 1
+        
+        stop_pages = self.settings.getint('INCREMENTAL_STOP_PAGES', 3)
+        if run >= stop_pages:
+            self.logger.info(f'[{state.query.label}] 已连续 {run} 页没有新文章，停止翻页')
+            state.stop_crawl.set()
+            return True
+        return False
+
+    def next_unvisited_page(self, after: int, state: QueryState = None) -> Optional[int]:
+        """查找指定页之后第一个未访问的页码
+        
+        Args:
+            after: 起始页码（不包含）
+            state: 检索条件的抓取状态，默认为第一个检索条件
+        
+        Returns:
+            未访问的页码，超出总页数时返回None
+        """
+        state = state or self.state
+        with self.visited_lock:
+            page = after + 1
+            while page in state.visited_pages:
+                page += 1
+        if state.total_pages and page > state.total_pages:
+            return None
+        return page
+
+    @property
+    def driver(self):
+        return self.browser.driver
+
+    @property
+    def network_mode(self) -> bool:
+        """是否从搜索结果接口的响应中提取文章（ARTICLE_EXTRACTOR = 'network'）"""
+        return self.settings.get('ARTICLE_EXTRACTOR', 'lxml') == 'network'
+
+    @property
+    def wait(self):
+        from selenium.webdriver.support.ui import WebDriverWait
+        # 增加等待时间到30秒
+        return WebDriverWait(self.driver, 30)
 
-    def wait_for_element(self, locator: Tuple[By, str], timeout: int = 30, visible: bool = True) -> Optional[webdriver.remote.webelement.WebElement]:
+    def wait_for_element(self, locator: Tuple[By, str], timeout: int = 30, visible: bool = True, driver=None) -> Optional['webdriver.remote.webelement.WebElement']:
         """统一的元素等待和定位方法
         
         Args:
             locator: 元素定位器，格式为(By.XXX, 'selector')
             timeout: 超时时间（秒）
             visible: 是否要求元素可见
+            driver: 使用的浏览器实例，默认为爬虫自身的浏览器
         
         Returns:
             找到的元素对象，如果未找到则返回None
         """
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+        wait = self.wait if driver is None else WebDriverWait(driver, timeout)
         try:
             if visible:
-                return self.wait.until(EC.visibility_of_element_located(locator))
-            return self.wait.until(EC.presence_of_element_located(locator))
+                return wait.until(EC.visibility_of_element_located(locator))
+            return wait.until(EC.presence_of_element_located(locator))
         except TimeoutException:
             self.logger.error(f'等待元素超时: {locator}')
             return None
 
-    def safe_click(self, element: webdriver.remote.webelement.WebElement, retry_count: int = 0) -> bool:
+    def safe_click(self, element: 'webdriver.remote.webelement.WebElement', retry_count: int = 0, driver=None) -> bool:
         """安全的点击操作，处理各种点击异常
         
         Args:
             element: 要点击的元素
             retry_count: 当前重试次数
+            driver: 使用的浏览器实例，默认为爬虫自身的浏览器
         
         Returns:
             点击是否成功
@@ -69,41 +554,284 @@ class JosSpider(scrapy.Spider):
                 element.click()
             except ElementClickInterceptedException:
                 # 如果普通点击失败，尝试使用JavaScript点击
-                self.driver.execute_script("arguments[0].click();", element)
+                (driver or self.driver).execute_script("arguments[0].click();", element)
                 
             return True
             
         except Exception as e:
             self.logger.warning(f'点击操作失败: {str(e)}, 正在重试...')
-            return self.safe_click(element, retry_count + 1)
+            self.metrics.retry('click')
+            return self.safe_click(element, retry_count + 1, driver)
     
+    async def start(self):
+        # Scrapy 2.13+ 使用 start() 生成初始请求，与旧版本共用 start_requests() 的逻辑
+        for request in self.start_requests():
+            yield request
+
     def start_requests(self):
+        if self.settings.get('SEARCH_MODE', 'selenium') == 'http':
+            if self.coordinator is not None:
+                # 协同抓取：读取一次搜索表单后按领取的租约发出搜索请求
+                yield from self.lease_requests()
+                return
+            for url in self.start_urls:
+                for query in self.states:
+                    # 直接请求搜索页（不经过Selenium），用于读取搜索表单；各检索条件由下载器并发抓取
+                    yield Request(
+                        url=url,
+                        callback=self.parse_search_form,
+                        meta={'dont_selenium': True, 'search_query': query},
+                        dont_filter=True
+                    )
+            return
+
+        if self.batch_mode or self.partition_budget or self.coordinator is not None:
+            # 批量检索、按年份分区、协同抓取时所有检索条件都由爬虫在浏览器池中搜索，搜索页不经过中间件
+            for url in self.start_urls:
+                yield Request(url=url, callback=self.parse, meta={'dont_selenium': True})
+            return
+
         for url in self.start_urls:
             yield Request(url=url, callback=self.parse)
+
+    @staticmethod
+    def parse_total_pages(page_text: str) -> Optional[int]:
+        """从分页信息文本（如"共 12 页"）中解析总页数
+        
+        Args:
+            page_text: `.t-pages span` 的文本内容
+        
+        Returns:
+            总页数，如果无法解析则返回None
+        """
+        if not page_text or '共' not in page_text or '页' not in page_text:
+            return None
+        try:
+            return int(page_text.split('共')[1].split('页')[0].strip())
+        except ValueError:
+            return None
+
+    def extract_articles(self, html: str) -> Optional[List[Dict]]:
+        """从搜索结果页面或文章列表片段中提取文章数据
+        
+        Args:
+            html: 搜索结果页面或 `EtTableArticleList` 片段的HTML内容
+        
+        Returns:
+            文章数据列表，如果未找到文章列表容器则返回None
+        """
+        if self.extractor is None:
+            name = self.settings.get('ARTICLE_EXTRACTOR', 'lxml')
+            # 浏览器内提取和网络捕获模式无法直接解析HTML文本（如HTTP直连模式的响应），此时使用lxml提取器
+            if name in ('js', 'network'):
+                name = 'lxml'
+            self.extractor = get_extractor(name, self.logger)
+        with self.metrics.time('extract'):
+            return self.extractor.extract(html)
+
+    def get_article_list_html(self, driver=None) -> Optional[str]:
+        """获取文章列表片段的HTML（只传输 `EtTableArticleList`，不传输整个页面源码）
+        
+        Args:
+            driver: 使用的浏览器实例，默认为爬虫自身的浏览器
+        
+        Returns:
+            文章列表片段的HTML，如果未找到文章列表容器则返回None
+        """
+        article_list = self.wait_for_element((By.ID, 'EtTableArticleList'), driver=driver)
+        if not article_list:
+            return None
+        return article_list.get_attribute('innerHTML')
+
+    def build_search_request(self, form: SearchForm, page: int, state: QueryState = None) -> FormRequest:
+        """按照页面中 SearchData/SubmitArticleSearch 的方式构造搜索表单请求
+        
+        Args:
+            form: 搜索页中的搜索表单
+            page: 要请求的结果页码
+            state: 检索条件的抓取状态，默认为第一个检索条件
+        
+        Returns:
+            提交搜索表单的FormRequest
+        """
+        state = state or self.state
+        formdata = {
+            self.settings.get('HTTP_SEARCH_PAGE_FIELD', 'currentpage'): str(page),
+        }
+        formdata.update(state.query.form_fields(self.settings))
+        # 表单中的其他字段保持页面中的默认值
+        fields = [(name, value) for name, value in form.fields if name not in formdata]
+        
+        return FormRequest(
+            url=form.url,
+            method=form.method,
+            formdata=fields + list(formdata.items()),
+            callback=self.parse_http_results,
+            errback=self.http_search_failed,
+            meta={'dont_selenium': True, 'page': page, 'search_form': form, 'search_query': state.query},
+            dont_filter=True
+        )
+
+    def fallback_to_selenium(self, reason: str, query: SearchQuery = None):
+        """HTTP直连模式校验失败时回退到Selenium模式
+        
+        批量检索、按年份分区时只在浏览器中重新抓取失败的检索条件：第一个失败的检索条件调度一个回退请求，
+        回退抓取运行期间失败的检索条件由该抓取依次完成；其他模式下整个抓取只回退一次。
+        
+        Args:
+            reason: 回退原因，用于日志记录
+            query: 失败的检索条件
+        
+        Returns:
+            回退使用的请求列表（未启用回退、已在回退时为空）
+        """
+        if not self.settings.getbool('HTTP_FALLBACK_TO_SELENIUM', True):
+            self.logger.error(f'HTTP直连模式失败（{reason}），未启用Selenium回退')
+            return []
+        per_query = (self.batch_mode or self.partition_budget) and query is not None
+        if not per_query:
+            query = None
+        with self.visited_lock:
+            if query in self.fallback_queries or None in self.fallback_queries:
+                self.logger.warning(f'HTTP直连模式失败（{reason}），已在Selenium模式中重新抓取')
+                return []
+            self.fallback_queries.add(query)
+            if per_query:
+                self.fallback_pending.append(query)
+                if self.fallback_running:
+                    self.logger.warning(f'HTTP直连模式失败（{reason}），加入正在进行的Selenium回退抓取')
+                    return []
+                self.fallback_running = True
+        self.logger.warning(f'HTTP直连模式失败（{reason}），回退到Selenium模式')
+        if per_query:
+            return [Request(url=self.start_urls[0], callback=self.parse,
+                            meta={'dont_selenium': True, 'selenium_fallback': True}, dont_filter=True)]
+        # 与 start_requests 中的Selenium模式一致：批量检索、分区和协同抓取时搜索页不经过中间件
+        meta = {'dont_selenium': True} if self.batch_mode or self.partition_budget or self.coordinator else {}
+        return [Request(url=url, callback=self.parse, meta=meta, dont_filter=True) for url in self.start_urls]
+
+    def take_fallback_states(self) -> List[QueryState]:
+        """取出等待在浏览器中抓取的回退检索条件，没有时结束回退抓取"""
+        with self.visited_lock:
+            queries, self.fallback_pending = self.fallback_pending, []
+            if not queries:
+                self.fallback_running = False
+            return [self.states[query] for query in queries]
+
+    def query_state(self, meta: Dict) -> QueryState:
+        """请求对应的检索条件的抓取状态"""
+        query = meta.get('search_query')
+        return self.states[query] if query is not None else self.state
+
+    def parse_search_form(self, response):
+        """解析搜索页并提交第一页的搜索请求（HTTP直连模式）"""
+        form_id = self.settings.get('HTTP_SEARCH_FORM_ID', 'article_search_form')
+        form = extract_form(response.text, response.url, form_id)
+        state = self.query_state(response.meta)
+        if form is None:
+            yield from self.fallback_to_selenium(f'未找到搜索表单 {form_id}', state.query)
+            return
+        if self.coordinator is not None:
+            # 所有检索条件共用同一个搜索表单
+            self.search_form = form
+            yield from self.lease_requests()
+            return
+        yield self.build_search_request(form, 1, state)
+
+    def http_search_failed(self, failure):
+        """HTTP直连模式请求失败的回调"""
+        request = failure.request
+        if request.meta.get('page') == 1:
+            yield from self.fallback_to_selenium(f'第一页请求失败: {failure.getErrorMessage()}',
+                                                 request.meta.get('search_query'))
+        else:
+            self.logger.error(f'第 {request.meta.get("page")} 页请求失败: {failure.getErrorMessage()}')
+
+    def parse_http_results(self, response):
+        """解析HTTP直连模式返回的搜索结果页"""
+        page = response.meta['page']
+        state = self.query_state(response.meta)
+        if state.stop_crawl.is_set():
+            # 增量抓取时该检索条件已停止翻页
+            return
+        # 只解析文章列表片段
+        article_list_html = response.css('#EtTableArticleList').get()
+        articles = self.extract_articles(article_list_html or response.text)
+        
+        # 校验：结果页必须包含文章列表容器，且当前页码与请求页码一致
+        current_page = response.css("a.active[href*='SubmitArticleSearch']::text").get()
+        valid = articles is not None and (current_page is None or current_page.strip() == str(page))
+        if not valid:
+            if page == 1:
+                yield from self.fallback_to_selenium('搜索结果页校验失败', state.query)
+            else:
+                self.logger.error(f'第 {page} 页校验失败，跳过')
+            return
+        
+        if page == 1:
+            state.total_pages = self.parse_total_pages(
+                ' '.join(response.css('.t-pages span::text').getall())
+            )
+            self.logger.info(f'[{state.query.label}] 总页数：{state.total_pages}')
+            if self.coordinator is not None:
+                self.seed_pages(state)
+            children = self.partition(state)
+            if children:
+                # 各分区分别提交搜索，由下载器并发抓取
+                for child in children:
+                    yield self.build_search_request(response.meta['search_form'], 1, child)
+                return
+        
+        if self.claim_page(page, state):
+            self.logger.info(f'当前处理第 {page} 页，找到 {len(articles)} 篇文章')
+            self.store_snapshot(page, article_list_html or response.text, state)
+            should_stop = self.check_incremental_stop(page, articles, state)
+            yield from self.emit_page(page, articles, state)
+            if should_stop:
+                if self.incremental_finished():
+                    raise CloseSpider('incremental_no_new_articles')
+                return
+        else:
+            self.logger.info(f'页面 {page} 已完成，跳过')
+        
+        if page == 1 and self.coordinator is not None:
+            # 协同抓取：其余页码已登记到任务队列，立即领取租约，不等待爬虫空闲
+            yield from self.lease_requests()
+        elif page == 1:
+            # 第一页确定总页数后，一次性调度其余未完成的结果页，由下载器并发抓取
+            # 页码越小优先级越高，增量抓取时可以尽早发现没有新文章的页面
+            for next_page in range(2, (state.total_pages or 1) + 1):
+                if next_page not in state.visited_pages:
+                    request = self.build_search_request(response.meta['search_form'], next_page, state)
+                    yield request.replace(priority=-next_page)
     
-    def wait_for_page_load(self, form_id: str = 'article_search_form') -> bool:
+    def wait_for_page_load(self, form_id: str = 'article_search_form', driver=None) -> bool:
         """统一的页面加载等待方法
         
         Args:
             form_id: 用于验证页面加载完成的表单ID
+            driver: 使用的浏览器实例，默认为爬虫自身的浏览器
         
         Returns:
             页面是否成功加载
         """
+        from selenium.webdriver.support.ui import WebDriverWait
+        driver = driver or self.driver
+        wait = WebDriverWait(driver, 30)
         retry_count = 0
         while retry_count < self.max_retries:
             try:
-                # 等待页面完全加载
-                self.wait.until(lambda driver: driver.execute_script('return document.readyState') == 'complete')
+                # 等待页面加载（'eager'/'none' 加载策略下DOM解析完成即可）
+                wait.until(lambda d: d.execute_script('return document.readyState') in self.browser.ready_states)
                 self.logger.info('页面基础DOM加载完成')
                 
                 # 等待页面可见性
-                self.wait.until(lambda driver: driver.execute_script('return document.visibilityState') == 'visible')
+                wait.until(lambda d: d.execute_script('return document.visibilityState') == 'visible')
                 self.logger.info('页面可见性状态确认')
                 
                 # 等待指定表单加载并可见
                 if form_id:
-                    form = self.wait_for_element((By.ID, form_id))
+                    form = self.wait_for_element((By.ID, form_id), driver=driver)
                     if not form:
                         raise TimeoutException(f'表单 {form_id} 加载失败')
                     self.logger.info(f'表单 {form_id} 加载完成且可见')
@@ -113,29 +841,36 @@ class JosSpider(scrapy.Spider):
             except TimeoutException as e:
                 retry_count += 1
                 self.logger.warning(f'页面加载重试 {retry_count}/{self.max_retries}: {str(e)}')
+                self.metrics.retry('page_load')
                 if retry_count >= self.max_retries:
                     self.logger.error('页面加载失败，超过最大重试次数')
                     return False
-                self.driver.refresh()
+                self.rate.backoff(self.search_host)
+                driver.refresh()
         return False
 
-    def wait_for_article_list_update(self, old_content: str = None) -> bool:
+    def wait_for_article_list_update(self, old_content: str = None, driver=None) -> bool:
         """等待文章列表更新
         
         Args:
             old_content: 更新前的文章列表内容
+            driver: 使用的浏览器实例，默认为爬虫自身的浏览器
             
         Returns:
             是否成功检测到更新
         """
         retry_count = 0
+        # 比较列表内容的轮询间隔从0.1秒开始逐次加倍（最长1秒），总等待时间不超过 max_retries 秒
+        poll_interval = 0.1
+        deadline = time.monotonic() + self.max_retries
         while retry_count < self.max_retries:
             try:
                 # 等待文章列表容器可见
                 article_list = self.wait_for_element(
                     (By.ID, 'EtTableArticleList'),
                     timeout=30,
-                    visible=True
+                    visible=True,
+                    driver=driver
                 )
                 if not article_list:
                     raise TimeoutException('文章列表容器未找到')
@@ -147,8 +882,11 @@ class JosSpider(scrapy.Spider):
                         self.logger.info('文章列表内容已更新')
                         return True
                     
-                    retry_count += 1
-                    time.sleep(1)  # 等待一秒后重试
+                    if time.monotonic() >= deadline:
+                        break
+                    self.metrics.retry('list_update_poll')
+                    time.sleep(poll_interval)
+                    poll_interval = min(1.0, poll_interval * 2)
                     continue
                     
                 return True
@@ -158,152 +896,791 @@ class JosSpider(scrapy.Spider):
                 if retry_count >= self.max_retries:
                     self.logger.error('等待文章列表更新超时')
                     return False
-                time.sleep(1)
+                self.rate.backoff(self.search_host)
         return False
 
-    def parse(self, response):
-        try:
-            # 使用Selenium加载页面
-            self.driver.get(response.url)
-            
-            # 等待页面加载完成
-            if not self.wait_for_page_load():
-                self.logger.error('页面加载失败，超过最大重试次数')
-                return
-            
-            # 从settings获取搜索条件
-            search_key1 = self.settings.get('SEARCH_KEY1', '')
-            search_key2 = self.settings.get('SEARCH_KEY2', '')
+    def submit_search(self, driver=None, query: SearchQuery = None) -> bool:
+        """在已加载的搜索页中填写搜索条件并提交查询
+        
+        Args:
+            driver: 使用的浏览器实例，默认为爬虫自身的浏览器
+            query: 搜索条件，默认为第一个检索条件
+        
+        Returns:
+            是否成功提交查询并加载出文章列表
+        """
+        driver = driver or self.driver
+        query = query or self.state.query
+        
+        # 依次填写搜索框（Key1/Key2）和年份范围
+        for field, value in query.form_fields(self.settings).items():
+            search_input = self.wait_for_element(
+                (By.CSS_SELECTOR, f'[id="{field}"], [name="{field}"]'),
+                driver=driver
+            )
+            if not search_input:
+                return False
+            self.logger.info(f'找到搜索输入框 {field}')
+            search_input.clear()
+            search_input.send_keys(value)
+        
+        # 等待页面响应输入
+        driver.implicitly_wait(2)
+        
+        # 使用更精确的XPath选择器定位查询按钮
+        submit_button = self.wait_for_element(
+            (By.XPATH, "//button[contains(@onclick, 'SearchData') and normalize-space(text())='查 询']"),
+            driver=driver
+        )
+        if not submit_button:
+            self.logger.error('未找到查询按钮')
+            return False
             
-            # 处理第一个搜索框
-            if search_key1:
-                search_input1 = self.wait_for_element((By.ID, 'Key1'))
-                if not search_input1:
-                    return
-                self.logger.info('找到第一个搜索输入框')
-                search_input1.clear()
-                search_input1.send_keys(search_key1)
+        self.logger.info('找到查询按钮，按钮文本：%s', submit_button.text)
+        self.rate.wait(self.search_host)
+        if not self.safe_click(submit_button, driver=driver):
+            self.logger.error('点击查询按钮失败')
+            return False
+        self.logger.info('成功点击查询按钮')
+        
+        # 等待文章列表容器加载
+        with self.metrics.time('list_update'):
+            list_updated = self.wait_for_article_list_update(driver=driver)
+        if not list_updated:
+            return False
+        self.logger.info('文章列表容器加载完成')
+        return True
+
+    def open_search(self, url: str, driver=None, query: SearchQuery = None) -> bool:
+        """加载搜索页并提交查询
+        
+        Args:
+            url: 搜索页URL
+            driver: 使用的浏览器实例，默认为爬虫自身的浏览器
+            query: 搜索条件，默认为第一个检索条件
+        
+        Returns:
+            是否成功加载出搜索结果
+        """
+        driver = driver or self.driver
+        self.rate.wait(self.search_host)
+        started = time.perf_counter()
+        with self.metrics.time('page_load'):
+            driver.get(url)
             
-            # 处理第二个搜索框
-            if search_key2:
-                search_input2 = self.wait_for_element((By.ID, 'Key2'))
-                if not search_input2:
-                    return
-                self.logger.info('找到第二个搜索输入框')
-                search_input2.clear()
-                search_input2.send_keys(search_key2)
+            # 等待页面加载完成
+            page_loaded = self.wait_for_page_load(driver=driver)
+        self.report_browser_request(started, page_loaded)
+        if not page_loaded:
+            self.logger.error('页面加载失败，超过最大重试次数')
+            return False
+        report_page_transfer(driver, self.metrics, self.logger)
+        with self.metrics.time('submit_search'):
+            return self.submit_search(driver, query)
+
+    def read_page_numbers(self, driver=None) -> Tuple[Optional[int], Optional[int]]:
+        """读取当前页码和总页数
+        
+        Args:
+            driver: 使用的浏览器实例，默认为爬虫自身的浏览器
+        
+        Returns:
+            (当前页码, 总页数)，无法获取的值为None
+        """
+        total_pages = None
+        page_info = self.wait_for_element((By.CSS_SELECTOR, ".t-pages span"), driver=driver)
+        if page_info:
+            total_pages = self.parse_total_pages(page_info.text)
+        
+        current_page = self.wait_for_element(
+            (By.CSS_SELECTOR, "a.active[href*='SubmitArticleSearch']"),
+            driver=driver
+        )
+        current_page_num = int(current_page.text) if current_page else None
+        return current_page_num, total_pages
+
+    def network_capture(self, driver) -> NetworkCapture:
+        """获取浏览器对应的响应捕获器"""
+        with self.visited_lock:
+            if driver not in self.network_captures:
+                self.network_captures[driver] = NetworkCapture(
+                    driver, self.settings.get('NETWORK_CAPTURE_URL_PATTERN', '')
+                )
+            return self.network_captures[driver]
+
+    def read_network_result(self, driver, timeout: float) -> Optional[ResultPage]:
+        """从浏览器捕获的搜索结果接口响应中解析结果页（不等待页面渲染）
+        
+        Args:
+            driver: 使用的浏览器实例
+            timeout: 等待响应的最长时间（秒）
+        
+        Returns:
+            最近一次搜索结果响应对应的结果页，未捕获到时返回None
+        """
+        with self.metrics.time('network_capture'):
+            responses = self.network_capture(driver).wait_for_responses(timeout)
+        
+        result = None
+        payload = None
+        for response in responses:
+            with self.metrics.time('extract'):
+                page = extract_result_payload(response['body'], self.extractor or get_extractor('lxml', self.logger))
+            if page is not None:
+                # 同时捕获到多个响应时以最后一个为准
+                result = page
+                payload = response['body']
+                self.logger.debug(f'捕获到搜索结果响应: {response["url"]}')
+        if result is None:
+            for response in responses:
+                self.logger.warning(
+                    f'搜索结果接口的响应格式无法识别: {response["url"]} {describe_payload(response["body"])}'
+                )
+            return None
+        
+        current_page_num, total_pages = result['current_page'], result['total_pages']
+        if current_page_num is None or total_pages is None:
+            # 响应中没有分页信息时从页面中读取
+            page_numbers = self.read_page_numbers(driver)
+            current_page_num = current_page_num or page_numbers[0]
+            total_pages = total_pages or page_numbers[1]
+        return ResultPage(result['articles'], current_page_num, total_pages, None, payload=payload)
+
+    def read_result_page(self, driver=None, extract: bool = True) -> Optional[ResultPage]:
+        """读取当前结果页的文章数据和页码信息
+        
+        ARTICLE_EXTRACTOR 为 'network' 时直接解析浏览器捕获的搜索结果接口响应；为 'js' 时只执行一次
+        浏览器内脚本，直接返回文章数据和页码；其他提取器先获取文章列表片段，再在Python中解析。
+        
+        Args:
+            driver: 使用的浏览器实例，默认为爬虫自身的浏览器
+            extract: 是否解析文章列表片段；为False时结果页的 articles 为None，由调用方交给提取线程池解析
+        
+        Returns:
+            当前结果页，如果未找到文章列表容器则返回None
+        """
+        driver = driver or self.driver
+        if self.network_mode:
+            # 翻页时已捕获的结果页，或搜索请求的响应
+            result_page = self.captured_pages.pop(driver, None) or self.read_network_result(
+                driver, self.settings.getint('SELENIUM_SEARCH_RESULT_WAIT', 5)
+            )
+            if result_page is not None:
+                return result_page
+            self.logger.info('未捕获到搜索结果接口的响应，改为从页面中提取')
+        
+        if self.settings.get('ARTICLE_EXTRACTOR', 'lxml') == 'js':
+            with self.metrics.time('extract'):
+                page = extract_page_in_browser(driver)
+            if page is None:
+                return None
+            result_page = ResultPage(page['articles'], page['current_page'], page['total_pages'], None)
+        else:
+            with self.metrics.time('fetch_list_html'):
+                html = self.get_article_list_html(driver)
+            if html is None:
+                return None
+            articles = None
+            if extract:
+                articles = self.extract_articles(html)
+                if articles is None:
+                    return None
+            with self.metrics.time('read_page_numbers'):
+                current_page_num, total_pages = self.read_page_numbers(driver)
+            result_page = ResultPage(articles, current_page_num, total_pages, html)
+        
+        if self.settings.get('SELENIUM_PAGE_CHANGE_DETECTION', 'observer') == 'observer':
+            # 记录翻页前的列表版本号，翻页后由页面内的观察器通知列表变化
+            result_page = result_page._replace(list_version=install_list_observer(driver))
+        return result_page
+
+    def read_current_page_number(self, driver=None) -> Optional[int]:
+        """读取当前页码
+        
+        Args:
+            driver: 使用的浏览器实例，默认为爬虫自身的浏览器
+        
+        Returns:
+            当前页码，无法获取时返回None
+        """
+        driver = driver or self.driver
+        if self.settings.get('ARTICLE_EXTRACTOR', 'lxml') == 'js':
+            return driver.execute_script(CURRENT_PAGE_SCRIPT)
+        current_page_num, _ = self.read_page_numbers(driver)
+        return current_page_num
+
+    def wait_for_page_turn(self, previous: ResultPage, driver=None) -> Optional[int]:
+        """等待翻页完成
+        
+        Args:
+            previous: 翻页前的结果页
+            driver: 使用的浏览器实例，默认为爬虫自身的浏览器
+        
+        Returns:
+            翻页后的当前页码，如果等待失败则返回None
+        """
+        driver = driver or self.driver
+        if self.network_mode:
+            # 直接等待翻页请求的响应，不等待页面渲染
+            result_page = self.read_network_result(driver, 30)
+            if result_page is not None and result_page.current_page != previous.current_page:
+                self.captured_pages[driver] = result_page
+                return result_page.current_page
+            self.logger.info('未捕获到翻页请求的响应，改为检测页面变化')
+        
+        version = previous.list_version
+        while version is not None:
+            # 由页面内的MutationObserver通知列表变化，不再轮询列表内容
+            try:
+                version = wait_for_list_change(
+                    driver,
+                    version,
+                    self.settings.getint('SELENIUM_MUTATION_SETTLE_MS', 100)
+                )
+            except TimeoutException:
+                self.logger.error('等待文章列表更新超时')
+                return None
+            if version is None:
+                self.logger.info('列表观察器不可用，改为轮询检测翻页')
+                break
             
-            # 等待页面响应输入
-            self.driver.implicitly_wait(2)
+            current_page_num = self.read_current_page_number(driver)
+            if current_page_num and current_page_num != previous.current_page:
+                return current_page_num
+            # 列表已变化但页码未更新（如先显示加载提示），继续等待下一次变化
+        
+        if previous.html is not None:
+            # 通过比较文章列表内容确认更新
+            if not self.wait_for_article_list_update(previous.html, driver=driver):
+                return None
+            current_page_num, _ = self.read_page_numbers(driver)
+            return current_page_num
+        
+        # 浏览器内提取模式下没有列表内容，直接等待页码变化
+        from selenium.webdriver.support.ui import WebDriverWait
+        
+        def page_changed(d):
+            page = d.execute_script(CURRENT_PAGE_SCRIPT)
+            return page if page and page != previous.current_page else False
+        
+        try:
+            return WebDriverWait(driver, 30).until(page_changed)
+        except TimeoutException:
+            self.logger.error('等待页码更新超时')
+            return None
+
+    def claim_page(self, page: int, state: QueryState = None) -> bool:
+        """将页面标记为已访问（浏览器池中的多个浏览器共享）
+        
+        Args:
+            page: 页码
+            state: 检索条件的抓取状态，默认为第一个检索条件
+        
+        Returns:
+            页面此前是否未被访问
+        """
+        state = state or self.state
+        with self.visited_lock:
+            if page in state.visited_pages:
+                return False
+            state.visited_pages.add(page)
+            return True
+
+    def goto_page(self, page: int, previous: ResultPage, driver=None) -> bool:
+        """调用页面内的分页函数直接跳转到指定页
+        
+        Args:
+            page: 目标页码
+            previous: 跳转前的结果页
+            driver: 使用的浏览器实例，默认为爬虫自身的浏览器
+        
+        Returns:
+            是否成功跳转到目标页
+        """
+        driver = driver or self.driver
+        if self.network_mode:
+            # 丢弃跳转前遗留的响应，避免误认为是目标页的结果
+            self.network_capture(driver).clear()
+            self.captured_pages.pop(driver, None)
+        self.rate.wait(self.search_host)
+        started = time.perf_counter()
+        driver.execute_script('SubmitArticleSearch(arguments[0]);', page)
+        with self.metrics.time('page_turn'):
+            current_page_num = self.wait_for_page_turn(previous, driver)
+        self.report_browser_request(started, current_page_num is not None, driver)
+        if current_page_num is None:
+            self.logger.error(f'跳转到第 {page} 页后文章列表未更新')
+            return False
+        if current_page_num != page:
+            self.logger.error(f'页码未正确跳转：期望 {page}，实际 {current_page_num}')
+            return False
+        return True
+
+    def page_parser(self) -> OrderedExtractionPool:
+        """创建结果页的提取线程池（PARSE_WORKERS 为0时在浏览器线程中直接提取）"""
+        return OrderedExtractionPool(
+            self.extract_articles,
+            workers=self.settings.getint('PARSE_WORKERS', 2),
+            max_pending=self.settings.getint('PARSE_QUEUE_SIZE', 4)
+        )
+
+    def read_for_parser(self, parser: OrderedExtractionPool, driver=None) -> Optional[ResultPage]:
+        """读取当前结果页，使用提取线程池时只读取文章列表片段和页码，不在浏览器线程中解析"""
+        return self.read_result_page(driver, extract=not parser.pipelined)
+
+    def emit_parsed(self, parsed: List[Tuple[int, Optional[List[Dict]]]], state: QueryState = None):
+        """按页码顺序输出提取完成的结果页
+        
+        Args:
+            parsed: 提取线程池返回的 (页码, 文章数据列表)
+            state: 检索条件的抓取状态，默认为第一个检索条件
+        
+        Returns:
+            增量抓取时是否应停止翻页
+        """
+        should_stop = False
+        for page, articles in parsed:
+            if articles is None:
+                self.logger.error(f'第 {page} 页未找到文章列表容器')
+                continue
+            self.logger.info(f'当前处理第 {page} 页，找到 {len(articles)} 篇文章')
+            if self.check_incremental_stop(page, articles, state):
+                should_stop = True
+            yield from self.emit_page(page, articles, state)
+        return should_stop
+
+    def crawl_page_range(self, url: str, pages: List[int], results: queue.Queue, driver=None,
+                         state: QueryState = None, own_driver: bool = None, notify_done: bool = True):
+        """在一个浏览器中抓取指定的一组结果页（浏览器池工作线程）
+        
+        Args:
+            url: 搜索页URL
+            pages: 要抓取的页码列表（升序）
+            results: 用于汇总 (检索条件状态, 页码, 文章数据列表) 的队列
+            driver: 已完成搜索的浏览器实例；为None时启动新的无头浏览器并执行一次搜索
+            state: 检索条件的抓取状态，默认为第一个检索条件
+            own_driver: 结束时是否关闭浏览器，默认在自行启动浏览器时关闭
+            notify_done: 结束时是否向队列写入结束标记（协同抓取时由领取租约的工作线程写入）
+        
+        Returns:
+            最终使用的浏览器实例（浏览器被回收时为新的实例）
+        """
+        state = state or self.state
+        if own_driver is None:
+            own_driver = driver is None
+        parser = self.page_parser()
+        try:
+            if driver is None:
+                driver = self.browser.new_driver()
+                if not self.open_search(url, driver, state.query):
+                    self.logger.error(f'页码 {pages[0]}-{pages[-1]} 的浏览器搜索失败')
+                    return driver
             
-            # 使用更精确的XPath选择器定位查询按钮
-            submit_button = self.wait_for_element(
-                (By.XPATH, "//button[contains(@onclick, 'SearchData') and normalize-space(text())='查 询']")
-            )
-            if not submit_button:
-                self.logger.error('未找到查询按钮')
-                return
+            for page in pages:
+                if state.stop_crawl.is_set():
+                    return driver
+                recycled = self.recycle_browser(driver)
+                if recycled is not None:
+                    # 新的浏览器重新搜索后停留在第1页，下面跳转回当前页
+                    driver = recycled
+                    if not self.open_search(url, driver, state.query):
+                        self.logger.error(f'回收浏览器后重新搜索失败，页码 {page}-{pages[-1]} 未完成')
+                        return driver
+                result_page = self.read_for_parser(parser, driver)
+                if result_page is None:
+                    self.logger.error(f'第 {page} 页未找到文章列表容器')
+                    return driver
+                if result_page.current_page != page:
+                    if not self.goto_page(page, result_page, driver):
+                        return driver
+                    result_page = self.read_for_parser(parser, driver)
+                    if result_page is None:
+                        self.logger.error(f'第 {page} 页未找到文章列表容器')
+                        return driver
+                if not self.claim_page(page, state):
+                    self.logger.warning(f'页面 {page} 已访问过，跳过')
+                    continue
+                self.store_snapshot(page, result_page.html or result_page.payload, state)
                 
-            self.logger.info('找到查询按钮，按钮文本：%s', submit_button.text)
-            if not self.safe_click(submit_button):
-                self.logger.error('点击查询按钮失败')
+                # 文章列表片段交给提取线程池后立即跳转到下一页，提取完成的页面按页码顺序汇总
+                for parsed_page, articles in parser.submit(page, result_page.html, result_page.articles):
+                    self.put_parsed(results, state, parsed_page, articles)
+        except Exception as e:
+            self.logger.error(f'抓取页码 {pages[0]}-{pages[-1]} 时出错: {str(e)}')
+        finally:
+            try:
+                for parsed_page, articles in parser.drain():
+                    self.put_parsed(results, state, parsed_page, articles)
+            except Exception as e:
+                self.logger.error(f'提取页码 {pages[0]}-{pages[-1]} 时出错: {str(e)}')
+            parser.close()
+            if own_driver and driver is not None:
+                driver.quit()
+            # 通知主线程该工作线程已结束
+            if notify_done:
+                results.put(None)
+        return driver
+
+    def put_parsed(self, results: queue.Queue, state: QueryState, page: int, articles: Optional[List[Dict]]):
+        """把提取完成的结果页写入浏览器池的汇总队列"""
+        if articles is None:
+            self.logger.error(f'第 {page} 页未找到文章列表容器')
+            return
+        self.logger.info(f'第 {page} 页找到 {len(articles)} 篇文章')
+        results.put((state, page, articles))
+
+    def drain_results(self, results: queue.Queue, workers: int, on_split=None):
+        """输出浏览器池工作线程汇总到队列中的文章数据，直到所有工作线程结束
+        
+        Args:
+            results: 工作线程写入 (检索条件状态, 页码, 文章数据列表) 的队列，每个工作线程结束时写入None，
+                检索条件被拆分为分区时写入 QuerySplit
+            workers: 工作线程数量
+            on_split: 为各分区启动工作线程的回调，参数为分区的抓取状态列表
+        """
+        finished = 0
+        while finished < workers:
+            result = results.get()
+            if result is None:
+                finished += 1
+                continue
+            if isinstance(result, QuerySplit):
+                # 拆分出的每个分区由一个新的工作线程抓取，结束时同样写入结束标记
+                finished += 1
+                workers += len(result.states)
+                on_split(result.states)
+                continue
+            state, page, articles = result
+            self.check_incremental_stop(page, articles, state)
+            yield from self.emit_page(page, articles, state)
+
+    @contextmanager
+    def browser_pool(self, pool_size: int):
+        """启动浏览器池
+        
+        爬虫自身的浏览器和 pool_size-1 个新的无头浏览器（首次借用时才启动）组成浏览器池，
+        退出时关闭池中新启动的浏览器，爬虫自身的浏览器由BrowserManager关闭。
+        
+        Args:
+            pool_size: 浏览器数量（同时也是工作线程数量）
+        """
+        drivers = queue.Queue()
+        drivers.put(self.driver)
+        for _ in range(pool_size - 1):
+            drivers.put(None)
+        try:
+            with ThreadPoolExecutor(max_workers=pool_size) as executor:
+                yield BrowserPool(executor, drivers, queue.Queue())
+        finally:
+            while not drivers.empty():
+                driver = drivers.get()
+                if driver is not None and driver is not self.driver:
+                    driver.quit()
+
+    def crawl_with_pool(self, url: str, pool_size: int):
+        """使用浏览器池并行抓取所有未完成的结果页
+        
+        未完成的页码被划分为多个连续的分片，每个分片由浏览器池中的一个浏览器负责，
+        所有浏览器抓取到的文章数据汇总到同一个队列中输出。
+        
+        Args:
+            url: 搜索页URL
+            pool_size: 浏览器数量
+        """
+        state = self.state
+        pending_pages = [page for page in range(1, state.total_pages + 1) if page not in state.visited_pages]
+        if not pending_pages:
+            self.logger.info('所有页面均已完成')
+            return
+        pool_size = min(pool_size, len(pending_pages))
+        chunk = -(-len(pending_pages) // pool_size)
+        shards = [pending_pages[i:i + chunk] for i in range(0, len(pending_pages), chunk)]
+        self.logger.info(f'使用 {len(shards)} 个浏览器并行抓取，页码范围：'
+                         f'{[(shard[0], shard[-1]) for shard in shards]}')
+        
+        with self.browser_pool(len(shards)) as pool:
+            for shard in shards:
+                pool.executor.submit(self.crawl_shard, url, shard, state, pool)
+            yield from self.drain_results(pool.results, len(shards))
+
+    def crawl_shard(self, url: str, pages: List[int], state: QueryState, pool: BrowserPool):
+        """在浏览器池中借用一个浏览器，抓取一个分片的结果页（浏览器池工作线程）
+        
+        Args:
+            url: 搜索页URL
+            pages: 分片中的页码列表（升序）
+            state: 检索条件的抓取状态
+            pool: 浏览器池
+        """
+        driver = pool.drivers.get()
+        try:
+            # 新启动的浏览器由 crawl_page_range 执行搜索，爬虫自身的浏览器已停留在搜索结果页
+            driver = self.crawl_page_range(url, pages, pool.results, driver, state, own_driver=False)
+        finally:
+            pool.drivers.put(driver)
+
+    def crawl_query(self, url: str, state: QueryState, pool: BrowserPool):
+        """在浏览器池中借用一个浏览器，完成一个检索条件的搜索和全部翻页（批量检索工作线程）
+        
+        Args:
+            url: 搜索页URL
+            state: 检索条件的抓取状态
+            pool: 浏览器池
+        """
+        results = pool.results
+        driver = pool.drivers.get()
+        try:
+            if driver is None:
+                # 池中的浏览器首次使用时才启动
+                driver = self.browser.new_driver()
+            else:
+                # 浏览器已完成其他检索条件，达到回收条件时换成新的实例再搜索
+                driver = self.recycle_browser(driver) or driver
+            label = state.query.label
+            if not self.open_search(url, driver, state.query):
+                self.logger.error(f'[{label}] 搜索失败')
+                results.put(None)
+                return
+            # 这里只需要总页数，文章数据由 crawl_page_range 读取
+            first_page = self.read_result_page(driver, extract=False)
+            state.total_pages = (first_page.total_pages if first_page else None) or 1
+            self.logger.info(f'[{label}] 总页数：{state.total_pages}')
+            children = self.partition(state)
+            if children:
+                results.put(QuerySplit(children))
+                return
+            pending_pages = [page for page in range(1, state.total_pages + 1) if page not in state.visited_pages]
+            if not pending_pages:
+                self.logger.info(f'[{label}] 所有页面均已完成')
+                results.put(None)
                 return
-            self.logger.info('成功点击查询按钮')
+            # crawl_page_range 结束时写入该检索条件的结束标记，浏览器（可能已被回收替换）由本方法归还
+            driver = self.crawl_page_range(url, pending_pages, results, driver, state, own_driver=False)
+        except Exception as e:
+            self.logger.error(f'[{state.query.label}] 抓取时出错: {str(e)}')
+            results.put(None)
+        finally:
+            pool.drivers.put(driver)
+
+    def crawl_queries(self, url: str, pool_size: int, states: List[QueryState] = None):
+        """批量检索：所有检索条件共用一个浏览器池，每个浏览器依次完成分配到的检索条件
+        
+        爬虫自身的浏览器和 BROWSER_POOL_SIZE-1 个新的无头浏览器组成浏览器池，多个检索条件命中的
+        同一篇文章由 DedupPipeline 在本次运行内去重。按年份分区时拆分出的分区也加入浏览器池抓取。
+        
+        Args:
+            url: 搜索页URL
+            pool_size: 浏览器数量
+            states: 要抓取的检索条件，默认为全部检索条件
+        """
+        states = states if states is not None else list(self.states.values())
+        if not self.partition_budget:
+            pool_size = min(pool_size, len(states))
+        pool_size = max(1, pool_size)
+        self.logger.info(f'批量检索 {len(states)} 个检索条件，使用 {pool_size} 个浏览器')
+        
+        with self.browser_pool(pool_size) as pool:
+            def crawl_partitions(children: List[QueryState]):
+                for child in children:
+                    pool.executor.submit(self.crawl_query, url, child, pool)
             
-            # 等待文章列表容器加载
-            if not self.wait_for_article_list_update():
+            for state in states:
+                pool.executor.submit(self.crawl_query, url, state, pool)
+            yield from self.drain_results(pool.results, len(states), crawl_partitions)
+
+    def crawl_leases(self, url: str, pool_size: int):
+        """协同抓取：浏览器池中的每个浏览器依次领取任务队列中的租约并抓取租约内的页面
+        
+        Args:
+            url: 搜索页URL
+            pool_size: 浏览器数量
+        """
+        pool_size = max(1, pool_size)
+        self.logger.info(f'协同抓取（{self.coordinator.worker}），使用 {pool_size} 个浏览器')
+        with self.browser_pool(pool_size) as pool:
+            for _ in range(pool_size):
+                pool.executor.submit(self.crawl_lease_worker, url, pool)
+            yield from self.drain_results(pool.results, pool_size)
+
+    def crawl_lease_worker(self, url: str, pool: BrowserPool):
+        """在浏览器池中借用一个浏览器，领取租约直到没有可领取的任务（协同抓取工作线程）
+        
+        抓取失败的租约在爬虫空闲时归还，由本进程或其他进程重新领取。
+        
+        Args:
+            url: 搜索页URL
+            pool: 浏览器池
+        """
+        results = pool.results
+        driver = pool.drivers.get()
+        try:
+            while True:
+                leases = self.coordinator.acquire(list(self.states_by_key))
+                if not leases:
+                    return
+                state = self.lease_state(leases[0])
+                if driver is None:
+                    driver = self.browser.new_driver()
+                else:
+                    driver = self.recycle_browser(driver) or driver
+                if not self.open_search(url, driver, state.query):
+                    self.logger.error(f'[{state.query.label}] 搜索失败')
+                    continue
+                if leases[0].start_page == 1:
+                    first_page = self.read_result_page(driver, extract=False)
+                    state.total_pages = (first_page.total_pages if first_page else None) or 1
+                    self.logger.info(f'[{state.query.label}] 总页数：{state.total_pages}')
+                    self.seed_pages(state)
+                driver = self.crawl_page_range(url, leases[0].pages, results, driver, state,
+                                               own_driver=False, notify_done=False)
+        except Exception as e:
+            self.logger.error(f'协同抓取时出错: {str(e)}')
+        finally:
+            pool.drivers.put(driver)
+            results.put(None)
+
+    @staticmethod
+    async def iterate_in_thread(generator, guard=nullcontext):
+        """在reactor线程池中逐个取出同步生成器的输出
+        
+        生成器中的浏览器操作（加载页面、等待翻页、重试间隔等）都在线程池中执行，
+        reactor线程在此期间继续处理其他下载、管道和统计。提前结束（CloseSpider、引擎关闭、取消）时
+        在线程池中关闭生成器，执行其中关闭浏览器池、提取线程池的 finally。
+        
+        Args:
+            generator: 同步生成器
+            guard: 每次在线程中执行生成器时进入的上下文（如 BrowserManager.in_use）
+        """
+        done = object()
+        # 取消等待时线程中的 next() 可能仍在执行，关闭生成器需要等它返回
+        lock = threading.Lock()
+        
+        def step():
+            with lock, guard():
+                return next(generator, done)
+        
+        def close():
+            with lock, guard():
+                generator.close()
+        
+        finished = False
+        try:
+            while True:
+                output = await maybe_deferred_to_future(threads.deferToThread(step))
+                if output is done:
+                    finished = True
+                    return
+                yield output
+        finally:
+            if not finished:
+                await maybe_deferred_to_future(threads.deferToThread(close))
+
+    async def parse(self, response):
+        """在浏览器中抓取搜索结果（浏览器操作不阻塞reactor）"""
+        async for output in self.iterate_in_thread(self.crawl_search_results(response), self.browser.in_use):
+            yield output
+
+    def crawl_search_results(self, response):
+        """在浏览器中完成搜索和翻页，逐个生成文章数据和详情页请求（在线程池中执行）"""
+        if response.meta.get('selenium_fallback'):
+            # HTTP直连模式失败的检索条件，抓取期间又有检索条件失败时继续抓取
+            while True:
+                states = self.take_fallback_states()
+                if not states:
+                    return
+                yield from self.crawl_queries(response.url, self.settings.getint('BROWSER_POOL_SIZE', 1), states)
+        if self.coordinator is not None:
+            yield from self.crawl_leases(response.url, self.settings.getint('BROWSER_POOL_SIZE', 1))
+            return
+        if self.batch_mode or self.partition_budget:
+            yield from self.crawl_queries(response.url, self.settings.getint('BROWSER_POOL_SIZE', 1))
+            return
+        with self.page_parser() as parser:
+            yield from self.crawl_single_query(response, parser)
+            # 翻页已结束，输出仍在提取中的结果页
+            try:
+                yield from self.emit_parsed(parser.drain())
+            except Exception as e:
+                self.logger.error(f'提取结果页时出错: {str(e)}')
+
+    def crawl_single_query(self, response, parser: OrderedExtractionPool):
+        """在爬虫自身的浏览器中逐页抓取单个检索条件的结果
+        
+        每页的文章列表片段交给提取线程池后立即翻页，提取完成的页面按页码顺序输出。
+        
+        Args:
+            response: 搜索页响应
+            parser: 结果页的提取线程池
+        """
+        try:
+            if response.meta.get('selenium_search_done'):
+                # SeleniumMiddleware已在共享浏览器中完成搜索，直接复用渲染后的页面
+                self.logger.info('复用中间件渲染的搜索结果页')
+                with self.metrics.time('list_update'):
+                    list_updated = self.wait_for_article_list_update()
+                if not list_updated:
+                    return
+            elif not self.open_search(response.url):
+                # 使用Selenium加载页面并提交查询
                 return
-            self.logger.info('文章列表容器加载完成')
+            
+            pool_size = self.settings.getint('BROWSER_POOL_SIZE', 1)
+            if pool_size > 1:
+                first_page = self.read_result_page(extract=False)
+                self.state.total_pages = first_page.total_pages if first_page else None
+                if self.state.total_pages and self.state.total_pages > 1:
+                    self.logger.info(f'总页数：{self.state.total_pages}')
+                    yield from self.crawl_with_pool(response.url, pool_size)
+                    return
             
             while True:
-                # 获取当前文章列表内容（用于后续验证更新）
-                article_list = self.wait_for_element((By.ID, 'EtTableArticleList'))
-                if not article_list:
+                # 浏览器达到回收条件时换成新的实例并重新搜索，已完成的页面在下面跳过，直接跳转回下一个未完成的页面
+                if self.recycle_browser() is not None and not self.open_search(response.url):
+                    self.logger.error('回收浏览器后重新搜索失败')
                     return
-                old_content = article_list.get_attribute('innerHTML')
-                
-                # 使用BeautifulSoup解析页面内容
-                soup = BeautifulSoup(self.driver.page_source, 'html.parser')
                 
-                # 获取文章列表容器
-                article_list_container = soup.select_one('.search_ext_article_list')
-                if not article_list_container:
+                # 读取当前页面的所有文章数据及页码信息（文章列表内容同时用于后续验证更新）
+                result_page = self.read_for_parser(parser)
+                if result_page is None:
                     self.logger.error('未找到文章列表容器')
                     return
                 
-                # 获取文章列表
-                articles = article_list_container.select('li')
-                self.logger.info(f'找到 {len(articles)} 篇文章')
-                
-                # 提取当前页面的所有文章数据
-                for article in articles:
-                    try:
-                        # 提取文章信息
-                        title_elem = article.select_one('.search_ext_article_title a')
-                        title = title_elem.get_text(strip=True) if title_elem else ''
-                        
-                        # 提取作者列表
-                        authors = [author.get_text(strip=True) 
-                                  for author in article.select('.search_ext_article_author a')]
-                        
-                        # 提取发布时间（不包含DOI）
-                        publish_time_elem = article.select_one('.search_ext_article_position')
-                        publish_time = publish_time_elem.get_text().split('DOI:')[0].strip() if publish_time_elem else ''
-                        
-                        # 提取关键词
-                        keyword_elem = article.select_one('.search_ext_article_keyword a')
-                        keywords = keyword_elem.get_text().split(',') if keyword_elem else []
-                        keywords = [k.strip() for k in keywords]
-                        
-                        # 提取摘要
-                        abstract_elem = article.select_one('.search_ext_article_abstract p')
-                        abstract = abstract_elem.get_text().replace('摘要:', '').strip() if abstract_elem else ''
-                        
-                        # 创建文章数据项
-                        yield {
-                            'title': title,
-                            'authors': authors,
-                            'publish_time': publish_time,
-                            'keywords': keywords,
-                            'abstract': abstract
-                        }
-                    except Exception as e:
-                        self.logger.error(f'解析文章时出错: {str(e)}')
-                        continue
-                
                 try:
                     # 获取页面信息
-                    page_info = self.wait_for_element((By.CSS_SELECTOR, ".t-pages span"))
-                    if page_info:
-                        page_text = page_info.text
-                        if '共' in page_text and '页' in page_text:
-                            self.total_pages = int(page_text.split('共')[1].split('页')[0].strip())
-                            self.logger.info(f'总页数：{self.total_pages}')
+                    current_page_num, total_pages = result_page.current_page, result_page.total_pages
+                    if total_pages:
+                        self.state.total_pages = total_pages
+                        self.logger.info(f'总页数：{self.state.total_pages}')
                     
                     # 获取当前页码
-                    current_page = self.wait_for_element(
-                        (By.CSS_SELECTOR, "a.active[href*='SubmitArticleSearch']")
-                    )
-                    if not current_page:
+                    if current_page_num is None:
                         self.logger.error('无法获取当前页码')
                         return
-                        
-                    current_page_num = int(current_page.text)
-                    
-                    # 检查页面是否已访问
-                    if current_page_num in self.visited_pages:
-                        self.logger.warning(f'页面 {current_page_num} 已访问过，跳过')
-                        return
                     
-                    # 标记当前页面为已访问
-                    self.visited_pages.add(current_page_num)
-                    self.logger.info(f'当前处理第 {current_page_num} 页')
+                    # 标记当前页面为已访问并输出；断点续爬时已完成的页面不重复输出
+                    if self.claim_page(current_page_num):
+                        self.store_snapshot(current_page_num, result_page.html or result_page.payload)
+                        parsed = parser.submit(current_page_num, result_page.html, result_page.articles)
+                        should_stop = yield from self.emit_parsed(parsed)
+                        if should_stop:
+                            return
+                    else:
+                        self.logger.info(f'页面 {current_page_num} 已完成，跳过')
                     
                     # 检查是否达到最大页数
-                    if self.total_pages and current_page_num >= self.total_pages:
+                    next_page_num = self.next_unvisited_page(current_page_num)
+                    if next_page_num is None:
                         self.logger.info('已到达最后一页')
                         return
                     
+                    if next_page_num != current_page_num + 1 or self.network_mode:
+                        # 中间的页面已完成（断点续爬），直接跳转到下一个未完成的页面；
+                        # 网络捕获模式下页面可能尚未渲染，也直接调用分页函数而不点击“下一页”
+                        self.logger.info(f'跳转到第 {next_page_num} 页')
+                        if not self.goto_page(next_page_num, result_page):
+                            return
+                        continue
+                    
                     # 处理分页
                     next_button = self.wait_for_element(
                         (By.CSS_SELECTOR, "a.next"),
@@ -319,36 +1696,28 @@ class JosSpider(scrapy.Spider):
                         self.logger.info('已到达最后一页，停止爬取')
                         return
                             
+                    self.rate.wait(self.search_host)
+                    started = time.perf_counter()
                     if not self.safe_click(next_button):
                         self.logger.error('点击下一页按钮失败')
                         return
                     self.logger.info('点击下一页')
                     
                     # 等待新页面加载完成并确保文章列表已更新
-                    if not self.wait_for_article_list_update(old_content):
-                        self.logger.error('新页面文章列表加载失败或未更新')
+                    with self.metrics.time('page_turn'):
+                        new_page_num = self.wait_for_page_turn(result_page)
+                    self.report_browser_request(started, new_page_num is not None, self.driver)
+                    if new_page_num is None:
+                        self.logger.error('新页面文章列表加载失败或未更新，或无法获取新的页码')
                         return
                         
                     # 验证页码是否正确更新
-                    new_current_page = self.wait_for_element(
-                        (By.CSS_SELECTOR, "a.active[href*='SubmitArticleSearch']")
-                    )
-                    if not new_current_page:
-                        self.logger.error('无法获取新的页码')
-                        return
-                    
-                    new_page_num = int(new_current_page.text)
                     if new_page_num <= current_page_num:
                         self.logger.error(f'页码未正确更新：当前页码 {new_page_num} 小于或等于上一页码 {current_page_num}')
                         return
                 except Exception as e:
                     self.logger.error(f'处理分页时出错: {str(e)}')
                     return
-                finally:
-                    pass
         except Exception as e:
             self.logger.error(f'爬取过程中出错: {str(e)}')
             return
-        finally:
-            # 清理资源或执行其他必要的操作
-            pass
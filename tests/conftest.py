@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 测试使用 benchmarks 中的本地回放服务器渲染结果页
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from jos_spider.browser import BrowserManager
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_at = None
+
+    def quit(self):
+        self.quit_at = time.monotonic()
+
+
+def test_close_waits_for_browser_work():
+    manager = BrowserManager()
+    driver = FakeDriver()
+    manager._driver = driver
+    entered = threading.Event()
+    finished = []
+
+    def work():
+        with manager.in_use():
+            entered.set()
+            time.sleep(0.3)
+            finished.append(time.monotonic())
+
+    worker = threading.Thread(target=work)
+    worker.start()
+    entered.wait(5)
+    manager.close()
+    worker.join()
+    assert driver.quit_at >= finished[0]
+    assert not manager.started
+
+
+def test_close_timeout():
+    manager = BrowserManager(close_timeout=0.1)
+    driver = FakeDriver()
+    manager._driver = driver
+    with manager.in_use():
+        manager.close()
+        # 超时后不再等待，直接关闭浏览器
+        assert driver.quit_at is not None
+
+
+def test_startup_does_not_block_health(monkeypatch):
+    manager = BrowserManager()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_new_driver():
+        started.set()
+        release.wait(5)
+        return FakeDriver()
+
+    monkeypatch.setattr(manager, 'new_driver', slow_new_driver)
+    drivers = []
+    starter = threading.Thread(target=lambda: drivers.append(manager.driver))
+    starter.start()
+    started.wait(5)
+    # 启动共享浏览器期间仍可以查询其他浏览器的运行状况
+    assert manager.driver_health(object()).pages == 0
+    release.set()
+    starter.join()
+    assert manager.driver is drivers[0]
@@ -0,0 +1,43 @@
+import json
+
+from jos_spider.checkpoint import CheckpointStore, make_query_key
+
+
+def test_make_query_key_ignores_field_order():
+    assert make_query_key({'key1': '软件', 'key2': ''}) == make_query_key({'key2': '', 'key1': '软件'})
+    assert make_query_key({'key1': '软件'}) != make_query_key({'key1': '软件', 'start_year': 2020})
+
+
+def test_checkpoint_mark_page_done(tmp_path):
+    store = CheckpointStore(str(tmp_path / 'checkpoints.json'))
+    query = {'key1': '软件工程', 'key2': ''}
+    for page in (1, 2, 4, 6):
+        store.mark_page_done(query, page, total_pages=6)
+    checkpoint = store.get(query)
+    assert checkpoint['last_page'] == 2
+    assert checkpoint['completed'] == [4, 6]
+    assert checkpoint['total_pages'] == 6
+
+    store.mark_page_done(query, 3)
+    checkpoint = store.get(query)
+    assert checkpoint['last_page'] == 4
+    assert checkpoint['completed'] == [6]
+    assert checkpoint['total_pages'] == 6
+
+
+def test_checkpoint_resume(tmp_path):
+    path = str(tmp_path / 'checkpoints.json')
+    query = {'key1': '软件工程', 'key2': ''}
+    other = {'key1': '形式化', 'key2': ''}
+    store = CheckpointStore(path)
+    for page in (1, 2, 5):
+        store.mark_page_done(query, page, total_pages=8)
+    store.mark_page_done(other, 1)
+
+    resumed = CheckpointStore(path)
+    assert resumed.finished_pages(query) == {1, 2, 5}
+    assert resumed.finished_pages({'key1': '未抓取'}) == set()
+    resumed.reset(other)
+    assert CheckpointStore(path).finished_pages(other) == set()
+    with open(path, 'r', encoding='utf-8') as f:
+        assert list(json.load(f)) == [make_query_key(query)]
@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from jos_spider.coordination import WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.sqlite'), lease_seconds=300, lease_pages=3, max_attempts=2)
+    queue.add_query('q', '软件工程')
+    yield queue
+    queue.close()
+
+
+def expire_leases(queue):
+    with queue.transaction() as conn:
+        conn.execute("UPDATE leases SET expires_at = ? WHERE status = 'leased'", (time.time() - 1,))
+
+
+def test_acquire_first_page_then_ranges(queue):
+    [lease] = queue.acquire('a', ['q'])
+    assert (lease.start_page, lease.end_page, lease.pages) == (1, 1, [1])
+    assert queue.acquire('b', ['q']) == []
+    queue.add_pages('q', '软件工程', 8)
+    queue.add_pages('q', '软件工程', 8)
+    leases = queue.acquire('b', ['q'], limit=5)
+    assert [(lease.start_page, lease.end_page) for lease in leases] == [(2, 4), (5, 7), (8, 8)]
+    assert queue.acquire('c', ['q']) == []
+    assert queue.acquire('c', ['other']) == []
+
+
+def test_complete(queue):
+    [lease] = queue.acquire('a', ['q'])
+    queue.complete('b', lease.id)
+    assert queue.status().get('done') is None
+    queue.complete('a', lease.id)
+    assert queue.status()['done'] == 1
+    assert queue.remaining(['q']) == {'available': 0, 'leased': 0}
+
+
+def test_release(queue):
+    [lease] = queue.acquire('a', ['q'])
+    assert queue.remaining(['q']) == {'available': 0, 'leased': 1}
+    queue.release('a', lease.id)
+    assert queue.remaining(['q']) == {'available': 1, 'leased': 0}
+    [lease] = queue.acquire('b', ['q'])
+    # 达到最大领取次数后归还的任务标记为失败
+    queue.release('b', lease.id)
+    assert queue.status()['failed'] == 1
+    assert queue.acquire('c', ['q']) == []
+
+
+def test_lease_expiry_keeps_done_pages(queue):
+    queue.add_pages('q', '软件工程', 4)
+    queue.acquire('a', ['q'])
+    [lease] = queue.acquire('a', ['q'])
+    assert lease.pages == [2, 3, 4]
+    queue.page_done('a', lease.id, 2)
+    assert queue.acquire('b', ['q']) == []
+
+    expire_leases(queue)
+    assert queue.remaining(['q'])['available'] == 2
+    taken = queue.acquire('b', ['q'], limit=2)
+    assert [(lease.start_page, lease.pages) for lease in taken] == [(1, [1]), (2, [3, 4])]
+    # 原持有者已失去租约，不能再结束任务
+    queue.complete('a', taken[1].id)
+    assert queue.status().get('done') is None
+
+
+def test_lease_expiry_max_attempts(queue):
+    queue.acquire('a', ['q'])
+    expire_leases(queue)
+    queue.acquire('b', ['q'])
+    expire_leases(queue)
+    assert queue.remaining(['q']) == {'available': 0, 'leased': 0}
+    assert queue.acquire('c', ['q']) == []
+    assert queue.status()['failed'] == 1
+
+
+def test_heartbeat_extends_lease(queue):
+    [lease] = queue.acquire('a', ['q'])
+    expire_leases(queue)
+    queue.heartbeat('a', [lease.id])
+    assert queue.acquire('b', ['q']) == []
+
+
+def test_add_article(queue):
+    assert queue.add_article('f1', '软件工程', 'a', {'title': '一'})
+    assert not queue.add_article('f1', '软件工程', 'b', {'title': '一'})
+    assert queue.add_article('f2', None, 'b', {'title': '二'})
+    assert [article['title'] for article in queue.articles()] == ['一', '二']
+    assert queue.status()['articles'] == 2
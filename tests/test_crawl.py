@@ -0,0 +1,65 @@
+"""在本地回放服务器上运行HTTP直连模式的完整抓取（不需要浏览器）"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from fixture_server import FixtureServer, FixtureSite
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def scrapy(*args, cwd=PROJECT_DIR):
+    return subprocess.run([sys.executable, '-m', 'scrapy', *args], cwd=cwd, capture_output=True, text=True,
+                          encoding='utf-8', timeout=120)
+
+
+@pytest.fixture(scope='module')
+def crawl(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp('crawl')
+    server = FixtureServer(FixtureSite(total_pages=3, per_page=5, asset_kb=1)).start()
+    settings = {
+        'SEARCH_MODE': 'http',
+        'HTTP_FALLBACK_TO_SELENIUM': False,
+        'OUTPUT_NAME': workdir / 'jos_articles',
+        'OUTPUT_EXCEL': False,
+        'CHECKPOINT_FILE': workdir / 'jos_checkpoints.json',
+        'PARQUET_EXPORT_PATH': '',
+        'SQLITE_EXPORT_PATH': '',
+        'INDEX_PATH': workdir / 'jos_index.sqlite',
+        'METRICS_FILE': '',
+        'DOWNLOAD_DELAY': 0,
+        'LOG_LEVEL': 'WARNING',
+    }
+    try:
+        options = [f'-s{name}={value}' for name, value in settings.items()]
+        result = scrapy('crawl', 'jos', '-a', f'start_url={server.search_url}', *options)
+    finally:
+        server.stop()
+    assert result.returncode == 0, result.stderr
+    return workdir
+
+
+def test_crawl_outputs_all_pages(crawl):
+    with open(crawl / 'jos_articles.jsonl', 'r', encoding='utf-8') as f:
+        articles = [json.loads(line) for line in f]
+    assert len(articles) == 15
+    assert len({article['url'] for article in articles}) == 15
+    assert all(article['title'] and article['authors'] and article['url'].startswith('http://127.0.0.1')
+               for article in articles)
+
+
+def test_crawl_checkpoint(crawl):
+    with open(crawl / 'jos_checkpoints.json', 'r', encoding='utf-8') as f:
+        [checkpoint] = json.load(f).values()
+    assert (checkpoint['last_page'], checkpoint['completed'], checkpoint['total_pages']) == (3, [], 3)
+
+
+def test_search_command(crawl):
+    result = scrapy('search', '--index', str(crawl / 'jos_index.sqlite'), '--text', '形式化验证', '--json')
+    assert result.returncode == 0, result.stderr
+    articles = [json.loads(line) for line in result.stdout.splitlines() if line.startswith('{')]
+    assert len(articles) == 15
+    assert all('形式化验证' in article['title'] for article in articles)
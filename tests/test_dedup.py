@@ -0,0 +1,25 @@
+from jos_spider.dedup import article_fingerprint, normalize_text
+
+
+def test_normalize_text():
+    assert normalize_text(' Ｓｏｆｔｗａｒｅ　Engineering \n') == 'softwareengineering'
+    assert normalize_text('软件工程（第２版）') == '软件工程(第2版)'
+    assert normalize_text(None) == ''
+
+
+def test_article_fingerprint():
+    article = {'title': '软件工程支撑环境', 'authors': ['杨芙清', '邵维忠'], 'publish_time': '1991, 2(2):1-8.'}
+    same = {'title': ' 软件工程 支撑环境', 'authors': ['杨芙清 ', '邵维忠'], 'publish_time': '1991，2（2）：1-8．',
+            'abstract': '摘要不参与指纹', 'query': '软件工程'}
+    assert article_fingerprint(article) == article_fingerprint(same)
+    assert len(article_fingerprint(article)) == 40
+
+
+def test_article_fingerprint_distinguishes_articles():
+    article = {'title': '软件工程支撑环境', 'authors': ['杨芙清', '邵维忠'], 'publish_time': '1991, 2(2):1-8.'}
+    assert article_fingerprint(article) != article_fingerprint({**article, 'authors': ['邵维忠', '杨芙清']})
+    assert article_fingerprint(article) != article_fingerprint({**article, 'publish_time': '1992, 3(1):1-8.'})
+    # 作者之间有分隔符，不会与拼接后相同的作者列表混淆
+    assert article_fingerprint({'title': 't', 'authors': ['ab', 'c']}) != \
+        article_fingerprint({'title': 't', 'authors': ['a', 'bc']})
+    assert article_fingerprint({}) == article_fingerprint({'title': '', 'authors': [], 'publish_time': ''})
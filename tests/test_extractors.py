@@ -0,0 +1,190 @@
+import threading
+import time
+
+import pytest
+
+from fixture_server import FixtureSite, render_article
+from jos_spider.extractors import (BeautifulSoupExtractor, LxmlExtractor, OrderedExtractionPool, extract_form,
+                                   extract_result_payload, describe_payload)
+
+
+def article_list(*items: str) -> str:
+    return f'<ul class="search_ext_article_list">{"".join(items)}</ul>'
+
+
+# LxmlExtractor需要与原有解析方式（BeautifulSoupExtractor：html.parser + select('li')）给出相同结果的页面片段
+FRAGMENTS = {
+    'nested_list': article_list(
+        '<li><div class="search_ext_article_title"><a href="/jos/article/abstract/1">标题</a></div>'
+        '<div class="search_ext_article_author"><ul><li><a>甲</a></li><li><a>乙</a></li></ul></div></li>'
+    ),
+    'unclosed_tags': article_list(
+        '<li><div class="search_ext_article_title"><a href="/1">第一篇</a></div>'
+        '<div class="search_ext_article_abstract"><p>摘要:one<p>two</div>'
+        '<li><div class="search_ext_article_title"><a href="/2">第二篇</a></div>'
+    ),
+    'unclosed_nested_list': article_list(
+        '<li><div class="search_ext_article_author"><ul><li><a>甲</a><li><a>乙</a></ul></div>'
+        '<div class="search_ext_article_title"><a href="/1">第一篇</a></div></li>'
+        '<li><div class="search_ext_article_title"><a href="/2">第二篇</a></div></li>'
+    ),
+    'misnested_tags': article_list(
+        '<li><div class="search_ext_article_title"><a href="/1"><b>粗<i>斜</b>体</i></a></div>'
+        '<div class="search_ext_article_abstract"><p>摘要:段落<div>块</div>尾</p></div></li>'
+        '<li><div class="search_ext_article_title"><a href="/2">第二篇</a></div><div/></li>'
+    ),
+    'comments': article_list(
+        '<li><div class="search_ext_article_title"><a href="/1">标<!-- 注释 -->题</a></div>'
+        '<!-- <div class="search_ext_article_author"><a>注释中的作者</a></div> -->'
+        '<div class="search_ext_article_keyword"><a>软件工程,<!-- x -->形式化</a></div></li>'
+    ),
+    'entities': article_list(
+        '<li><div class="search_ext_article_title"><a href=" /1?a=1&amp;b=2 ">A &amp; B &lt;C&gt; &#x4e2d;&#25991;</a></div>'
+        '<div class="search_ext_article_keyword"><a>k1,&nbsp;k2</a></div>'
+        '<div class="search_ext_article_abstract"><p>摘要:&quot;引文&quot;&nbsp;</p></div></li>'
+    ),
+    'line_breaks': article_list(
+        '<li><div class="search_ext_article_title"><a href="/1">第一行<br>第二行</a></div>'
+        '<div class="search_ext_article_position">1991, 2(2):1-8.<br/> DOI:10.13328/j.cnki.jos.000001</div>'
+        '<div class="search_ext_article_abstract"><p>摘要:前<br>后</p></div></li>'
+    ),
+    'scripts': article_list(
+        '<li><div class="search_ext_article_title"><a href="/1">标题<script>var s = "</li>";</script></a></div>'
+        '<div class="search_ext_article_position">2020, 31(1):1-2 <script>document.write("DOI:")</script>'
+        '<style>.x { color: red; }</style>DOI:10.1/x</div>'
+        '<div class="search_ext_article_abstract"><p>摘要:正文<template>模板</template></p></div></li>'
+    ),
+    'missing_fields': article_list('<li></li>', '<li><div class="search_ext_article_title"><a>无链接</a></div></li>'),
+    'full_page': FixtureSite(total_pages=2, per_page=5).search_page(
+        FixtureSite(total_pages=2, per_page=5).fragment(2)
+    ),
+}
+
+
+@pytest.mark.parametrize('name', sorted(FRAGMENTS))
+def test_lxml_matches_reference(name):
+    html = FRAGMENTS[name]
+    assert LxmlExtractor().extract(html) == BeautifulSoupExtractor().extract(html)
+
+
+def test_nested_list_items():
+    # 与原有解析方式一致：列表中的所有 li（包括作者列表中嵌套的 li）都按文章提取
+    articles = LxmlExtractor().extract(FRAGMENTS['nested_list'])
+    assert [article['title'] for article in articles] == ['标题', '', '']
+    assert [article['authors'] for article in articles] == [['甲', '乙'], ['甲'], ['乙']]
+
+
+def test_well_nested_pages_use_lxml(monkeypatch):
+    extractor = LxmlExtractor()
+    monkeypatch.setattr(extractor.reference, 'extract', lambda html: pytest.fail('不应交给BeautifulSoup提取'))
+    assert len(extractor.extract(FRAGMENTS['full_page'])) == 5
+    assert len(extractor.extract(FRAGMENTS['nested_list'])) == 3
+
+
+def test_fixture_article_fields():
+    article = {
+        'title': '软件工程 & 形式化方法',
+        'authors': ['张三', '李四'],
+        'publish_time': '1991, 2(2):1-8.',
+        'keywords': ['软件工程', '形式化'],
+        'abstract': '摘要内容',
+    }
+    html = article_list(render_article(article, 7))
+    for extractor in (LxmlExtractor(), BeautifulSoupExtractor()):
+        assert extractor.extract(html) == [{
+            **article,
+            'url': '/jos/article/abstract/7',
+        }]
+
+
+def test_missing_container():
+    assert LxmlExtractor().extract('<div>没有结果</div>') is None
+    assert BeautifulSoupExtractor().extract('<div>没有结果</div>') is None
+
+
+SEARCH_PAGE = '''
+<form id="other" action="/other"><input name="x" value="1"></form>
+<form id="article_search_form" action="search" method="post">
+  <input type="hidden" name="currentpage" value="1">
+  <input name="keyword" value="">
+  <select name="order"><option value="year" selected>年份</option><option value="title">标题</option></select>
+  <input type="checkbox" name="unchecked" value="1">
+  <input type="submit" name="submit" value="检索">
+</form>
+'''
+
+
+def test_extract_form():
+    form = extract_form(SEARCH_PAGE, 'http://example.com/jos/article/advanced_search', 'article_search_form')
+    assert form.url == 'http://example.com/jos/article/search'
+    assert form.method == 'POST'
+    # 按钮和未选中的复选框不提交
+    assert form.fields == [('currentpage', '1'), ('keyword', ''), ('order', 'year')]
+
+
+def test_extract_missing_form():
+    assert extract_form(SEARCH_PAGE, 'http://example.com/', 'missing') is None
+    assert extract_form('', 'http://example.com/', 'article_search_form') is None
+
+
+def test_result_payload_fragment():
+    site = FixtureSite(total_pages=3, per_page=2)
+    result = extract_result_payload(site.fragment(2), LxmlExtractor())
+    assert len(result['articles']) == 2
+    assert (result['current_page'], result['total_pages']) == (2, 3)
+
+
+def test_result_payload_unrecognized():
+    assert extract_result_payload('{"rows": [{"title": "t"}]}', LxmlExtractor()) is None
+    assert describe_payload('{"rows": [], "total": 0}') == 'JSON对象，顶层键: rows, total'
+    assert describe_payload('[1, 2]') == 'JSON数组，长度 2，元素类型 int'
+    assert describe_payload('<p>  请登录 </p>') == '文本(13字符): <p> 请登录 </p>'
+
+
+class BlockingExtract:
+    """每页的提取在对应的事件被设置后才完成"""
+
+    def __init__(self):
+        self.events = {}
+
+    def release(self, html: str):
+        self.events.setdefault(html, threading.Event()).set()
+
+    def __call__(self, html: str):
+        self.events.setdefault(html, threading.Event()).wait(5)
+        return [{'title': html}]
+
+
+def test_pool_keeps_submission_order():
+    extract = BlockingExtract()
+    with OrderedExtractionPool(extract, workers=2, max_pending=4) as pool:
+        assert pool.submit(1, 'a') == []
+        assert pool.submit(2, 'b') == []
+        extract.release('b')
+        time.sleep(0.05)
+        # 第2页先完成，但要等第1页输出后才能输出
+        assert pool.submit(3, html=None, articles=[]) == []
+        extract.release('a')
+        assert pool.drain() == [(1, [{'title': 'a'}]), (2, [{'title': 'b'}]), (3, [])]
+
+
+def test_pool_backpressure():
+    extract = BlockingExtract()
+    with OrderedExtractionPool(extract, workers=2, max_pending=2) as pool:
+        pool.submit(1, 'a')
+        pool.submit(2, 'b')
+        threading.Timer(0.2, extract.release, ('a',)).start()
+        started = time.perf_counter()
+        # 积压达到 max_pending 页，等待最早的一页提取完成
+        assert pool.submit(3, 'c') == [(1, [{'title': 'a'}])]
+        assert time.perf_counter() - started >= 0.15
+        extract.release('b')
+        extract.release('c')
+        assert pool.drain() == [(2, [{'title': 'b'}]), (3, [{'title': 'c'}])]
+
+
+def test_pool_without_workers_extracts_inline():
+    with OrderedExtractionPool(lambda html: [{'title': html}], workers=0) as pool:
+        assert not pool.pipelined
+        assert pool.submit(1, 'a') == [(1, [{'title': 'a'}])]
+        assert pool.drain() == []
@@ -0,0 +1,81 @@
+import pytest
+
+from jos_spider.index import ArticleIndex, Citation, parse_publish_time, text_terms
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1991, 2(2):1-8.', Citation(1991, 2, 2, '1-8')),
+    ('2023,34(5): 2001-2020', Citation(2023, 34, 5, '2001-2020')),
+    ('２０１５，２６（３）：４５６–４７８', Citation(2015, 26, 3, '456-478')),
+    ('2020, 31', Citation(2020, 31, None, None)),
+    ('在线出版', Citation(None, None, None, None)),
+    ('', Citation(None, None, None, None)),
+])
+def test_parse_publish_time(text, expected):
+    assert parse_publish_time(text) == expected
+
+
+def test_text_terms():
+    assert text_terms('形式化验证 of models') == {'形式', '式化', '化验', '验证'}
+    assert text_terms('基于 UML 的建模') == {'基于', '的建', '建模'}
+    assert text_terms('图 3 和表') == {'图', '和表'}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ArticleIndex(str(tmp_path / 'index.sqlite'))
+    articles = [
+        {'title': '软件工程支撑环境的集成化', 'authors': ['杨芙清', '邵维忠'], 'publish_time': '1991, 2(2):1-8.',
+         'keywords': ['软件工程', '集成化'], 'abstract': '讨论集成化问题'},
+        {'title': '面向对象的形式化验证', 'authors': ['张三'], 'publish_time': '2015, 26(3):456-478',
+         'keywords': ['形式化验证'], 'abstract': 'Verifying large language models with UML'},
+        {'title': '模型检测方法', 'authors': ['李四', '张三'], 'publish_time': '2020, 31(1):1-20',
+         'keywords': ['模型检测'], 'abstract': 'A model checking approach'},
+    ]
+    for article in articles:
+        index.add(article)
+    yield index
+    index.close()
+
+
+def titles(result):
+    total, articles = result
+    return total, [article['title'] for article in articles]
+
+
+def test_search_author_and_keyword(index):
+    assert titles(index.search(author='张三')) == (2, ['模型检测方法', '面向对象的形式化验证'])
+    assert titles(index.search(author=' 杨芙清 ')) == (1, ['软件工程支撑环境的集成化'])
+    assert titles(index.search(keyword='形式化验证')) == (1, ['面向对象的形式化验证'])
+    assert index.search(author='张三', keyword='软件工程')[0] == 0
+
+
+def test_search_text(index):
+    assert titles(index.search(text='形式化验证')) == (1, ['面向对象的形式化验证'])
+    assert titles(index.search(text='集成化')) == (1, ['软件工程支撑环境的集成化'])
+    # 二元词项都出现，但不包含整个查询文本
+    assert index.search(text='验证形式')[0] == 0
+    # 单字查询
+    assert index.search(text='化')[0] == 2
+
+
+def test_search_latin_substring(index):
+    assert titles(index.search(text='model')) == (2, ['模型检测方法', '面向对象的形式化验证'])
+    assert titles(index.search(text='Models')) == (1, ['面向对象的形式化验证'])
+    assert titles(index.search(text='uml 形式化')) == (0, [])
+    assert titles(index.search(text='形式化验证 UML')) == (0, [])
+    assert titles(index.search(text='language model')) == (1, ['面向对象的形式化验证'])
+
+
+def test_search_citation(index):
+    assert titles(index.search(years=(2015, None))) == (2, ['模型检测方法', '面向对象的形式化验证'])
+    assert titles(index.search(years=(None, 2015), volume=26, issue=3)) == (1, ['面向对象的形式化验证'])
+    assert titles(index.search(author='张三', years=(2016, 2020), limit=1)) == (1, ['模型检测方法'])
+
+
+def test_add_updates_existing_article(index):
+    index.add({'title': '模型检测方法', 'authors': ['李四', '张三'], 'publish_time': '2020, 31(1):1-20',
+               'keywords': ['模型检测', '时序逻辑'], 'abstract': 'temporal logic'})
+    assert len(index) == 3
+    assert titles(index.search(keyword='时序逻辑')) == (1, ['模型检测方法'])
+    assert index.search(text='checking')[0] == 0
@@ -0,0 +1,70 @@
+from scrapy.utils.test import get_crawler
+
+from jos_spider.metrics import StageMetrics, format_prometheus
+
+
+def metric_lines(text):
+    return [line for line in text.splitlines() if not line.startswith('#')]
+
+
+def test_stage_metrics_write_stats():
+    stats = get_crawler().stats
+    metrics = StageMetrics(stats, buckets=(0.1, 1))
+    metrics.observe('page_load', 0.05)
+    metrics.observe('page_load', 0.5)
+    metrics.retry('click')
+    metrics.inc_value('pages_done', 2)
+    assert stats.get_value('jos/stage/page_load/le_0.1') == 1
+    assert stats.get_value('jos/stage/page_load/le_1') == 2
+    assert stats.get_value('jos/stage/page_load/count') == 2
+    assert stats.get_value('jos/stage/page_load/max') == 0.5
+    assert stats.get_value('jos/retries/click') == 1
+    assert stats.get_value('jos/pages_done') == 2
+
+
+def test_format_prometheus():
+    metrics = StageMetrics(buckets=(0.1, 1))
+    metrics.observe('page_load', 0.05)
+    metrics.observe('page_load', 0.5)
+    metrics.observe('page_load', 3)
+    metrics.retry('click')
+    stats = {
+        'item_scraped_count': 40,
+        'jos/pages_done': 2,
+        'jos/rate/jos.org.cn/requests_per_second': 1.5,
+        'jos/rate/jos.org.cn/concurrency': 2,
+        'jos/rate/backoffs': 3,
+        'jos/startup/process_seconds': 1.2,
+    }
+    lines = metric_lines(format_prometheus(metrics, stats))
+    assert lines[:5] == [
+        'jos_stage_seconds_bucket{stage="page_load",le="0.1"} 1',
+        'jos_stage_seconds_bucket{stage="page_load",le="1"} 2',
+        'jos_stage_seconds_bucket{stage="page_load",le="+Inf"} 3',
+        'jos_stage_seconds_sum{stage="page_load"} 3.550000',
+        'jos_stage_seconds_count{stage="page_load"} 3',
+    ]
+    for line in (
+        'jos_retries_total{kind="click"} 1',
+        'jos_items_scraped_total 40',
+        'jos_items_dropped_total 0',
+        'jos_pages_done_total 2',
+        'jos_rate_requests_per_second{host="jos.org.cn"} 1.5',
+        'jos_rate_concurrency{host="jos.org.cn"} 2',
+        'jos_rate_backoffs_total 3',
+        'jos_startup_seconds{phase="process"} 1.2',
+        'jos_browser_recycles_total 0',
+    ):
+        assert line in lines
+    assert not any(line.startswith('jos_browser_memory_mb') for line in lines)
+
+
+def test_format_prometheus_help_and_type():
+    text = format_prometheus(StageMetrics(), {'jos/browser/memory_mb': 512.0})
+    assert text.endswith('\n')
+    assert '# TYPE jos_stage_seconds histogram' in text
+    assert '# TYPE jos_browser_memory_mb gauge\njos_browser_memory_mb 512.0' in text
+    # 每个指标都有类型说明
+    names = {line.split('{')[0].split()[0] for line in metric_lines(text)}
+    types = {line.split()[2] for line in text.splitlines() if line.startswith('# TYPE')}
+    assert {name.replace('_bucket', '').replace('_sum', '').replace('_count', '') for name in names} <= types
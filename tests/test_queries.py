@@ -0,0 +1,31 @@
+from jos_spider.checkpoint import make_query_key
+from jos_spider.queries import SearchQuery, load_queries
+
+
+def test_load_queries(tmp_path):
+    path = tmp_path / 'queries.txt'
+    path.write_text('# 注释\n软件工程\n\n{"key1": "形式化", "start_year": 2015}\n软件工程\n', encoding='utf-8')
+    assert load_queries(str(path)) == [SearchQuery('软件工程'), SearchQuery('形式化', start_year=2015)]
+
+
+def test_query_key_matches_single_query_checkpoints():
+    assert make_query_key(SearchQuery('软件').as_dict()) == make_query_key({'key1': '软件', 'key2': ''})
+
+
+def test_split_years():
+    first, second = SearchQuery('软件工程', start_year=2000, end_year=2009).split_years(1990, 2024)
+    assert (first.start_year, first.end_year) == (2000, 2004)
+    assert (second.start_year, second.end_year) == (2005, 2009)
+    assert first.output_label == second.output_label == '软件工程 (2000-2009)'
+
+
+def test_split_years_uses_default_range():
+    first, second = SearchQuery('软件工程', name='SE').split_years(1990, 2024)
+    assert (first.start_year, first.end_year, second.start_year, second.end_year) == (1990, 2007, 2008, 2024)
+    # 分区的输出标签是原检索条件，继续拆分时保持不变
+    assert first.label == '软件工程 (1990-2007)'
+    assert {query.output_label for query in first.split_years(1990, 2024)} == {'SE'}
+
+
+def test_split_years_single_year():
+    assert SearchQuery('软件工程', start_year=2020, end_year=2020).split_years(1990, 2024) is None
@@ -0,0 +1,112 @@
+import random
+import time
+from email.utils import formatdate
+
+import pytest
+from scrapy.core.downloader import Slot
+from scrapy.http import Request, Response
+from scrapy.settings import Settings
+from scrapy.utils.test import get_crawler
+
+from jos_spider import settings as project_settings
+from jos_spider.ratelimit import AdaptiveRateController, AdaptiveRateMiddleware, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(b'1.5') == 1.5
+    assert parse_retry_after('-3') == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('') is None
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(formatdate(time.time() + 60, usegmt=True)) == pytest.approx(60, abs=2)
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(random, 'uniform', lambda low, high: 1.0)
+
+
+def test_backoff_is_exponential_and_capped():
+    controller = AdaptiveRateController(start_rate=4.0, start_concurrency=8, backoff_base=1.0, backoff_max=5.0)
+    delays = [controller.penalize('h') for _ in range(4)]
+    assert delays == [1.0, 2.0, 4.0, 5.0]
+    bucket = controller.buckets['h']
+    assert bucket.rate == 4.0 / 2 ** 4
+    assert bucket.concurrency == 1
+    assert controller.reserve('h') == pytest.approx(5.0, abs=0.1)
+
+
+def test_backoff_respects_retry_after():
+    controller = AdaptiveRateController(backoff_max=30.0)
+    assert controller.penalize('h', retry_after=10) == 10
+    assert controller.penalize('h', retry_after=3600) == 30.0
+
+
+def test_success_resets_backoff_and_increases_rate():
+    controller = AdaptiveRateController(start_rate=1.0, rate_step=0.5, start_concurrency=1, target_latency=1.0)
+    controller.penalize('h')
+    controller.observe('h', 0.1)
+    assert controller.penalize('h') == 1.0
+    for _ in range(3):
+        controller.observe('h', 0.1)
+    bucket = controller.buckets['h']
+    # 1.0 -> 0.5 -> 1.0 -> 0.5 -> 2.0
+    assert bucket.rate == pytest.approx(2.0)
+    # 并发数在连续快速响应数达到当前并发数时加一
+    assert bucket.concurrency == 3
+
+
+def test_disabled_uses_fixed_retry_interval():
+    controller = AdaptiveRateController(enabled=False, retry_interval=2.0)
+    assert controller.penalize('h') == 2.0
+    assert controller.penalize('h') == 2.0
+    assert controller.reserve('other') == 0.0
+    assert controller.concurrency('h') == controller.max_concurrency
+
+
+def test_min_interval_is_a_floor():
+    controller = AdaptiveRateController(start_rate=2.0, max_rate=8.0, min_interval=2.0)
+    assert controller.max_rate == 0.5
+    assert [round(controller.reserve('h'), 1) for _ in range(3)] == [0.0, 2.0, 4.0]
+    for _ in range(20):
+        controller.observe('h', 0.01)
+    assert controller.buckets['h'].rate == 0.5
+
+
+def test_rate_rises_above_fixed_delay():
+    settings = Settings()
+    settings.setmodule(project_settings)
+    controller = AdaptiveRateController.from_settings(settings)
+    fixed_rate = 1 / settings.getfloat('DOWNLOAD_DELAY')
+    for _ in range(50):
+        controller.observe('h', 0.05)
+    bucket = controller.buckets['h']
+    assert bucket.rate > fixed_rate
+    assert bucket.rate == pytest.approx(1 / settings.getfloat('ADAPTIVE_RATE_MIN_INTERVAL'))
+    assert bucket.concurrency > settings.getint('ADAPTIVE_CONCURRENCY_START')
+    # 令牌按当前速率发放，连续请求的间隔远小于固定的下载延迟
+    waits = [controller.reserve('h') for _ in range(5)]
+    assert waits[-1] < 5 / fixed_rate / 4
+
+
+class FakeDownloader:
+    def __init__(self, slot: Slot):
+        self.slots = {'h': slot}
+
+    def get_slot_key(self, request):
+        return 'h'
+
+
+def test_middleware_owns_slot_pacing():
+    crawler = get_crawler(settings_dict={'DOWNLOAD_DELAY': 3, 'CONCURRENT_REQUESTS_PER_DOMAIN': 8})
+    slot = Slot(concurrency=8, delay=3, jitter=0.5)
+    crawler.engine = type('Engine', (), {'downloader': FakeDownloader(slot)})()
+    middleware = AdaptiveRateMiddleware.from_crawler(crawler)
+    request = Request('http://h/page', meta={'adaptive_rate_start': time.monotonic(), 'download_latency': 0.05})
+    for _ in range(10):
+        middleware.process_response(request, Response(request.url, status=200), None)
+    assert slot.delay == 0
+    assert slot.download_delay() == 0
+    assert slot.concurrency > 2